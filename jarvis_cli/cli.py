@@ -1,3 +1,7 @@
+import time
+# Taken before any other import so --profile can report import time
+_IMPORT_STARTED = time.perf_counter()
+
 import argparse
 import os
 import sys
@@ -6,7 +10,9 @@ from collections import OrderedDict
 from rich.console import Console
 from rich.table import Table
 
-from . import orchestrator
+from . import orchestrator, pool, remote, sync, completion, exporter, guard, jobs
+
+_IMPORTS_DONE = time.perf_counter()
 
 console = Console()
 __version__ = "1.0.0"
@@ -39,18 +45,46 @@ def display_commands() -> None:
     commands = OrderedDict([
         ("start", "Start Jarvis CLI with welcome banner"),
         ("exit", "Exit Jarvis CLI with goodbye message"),
-        ("list", "List all your instances"),
+        ("list", "List your instances (--where, --sort, --columns, --group-by, --count)"),
         ("balance", "Check your account balance"),
         ("templates", "List available framework templates"),
         ("fs list", "List all filesystems"),
-        ("fs create <name> <storage>", "Create a new filesystem with name and storage size in GB"),
-        ("fs delete <fs_id>", "Delete a filesystem with the specified ID"),
-        ("pause <instance_id>", "Pause a running instance"),
-        ("resume <instance_id>", "Resume a paused instance"),
-        ("destroy [instance_id]", "Destroy an instance (optional instance_id)"),
-        ("create", "Create a new instance with options"),
+        ("fs create <name>... <storage>", "Create filesystems with storage size in GB (--wait for Ready)"),
+        ("fs delete <fs_id|name|glob>...", "Delete filesystems that are not attached to an instance"),
+        ("pause <instance>", "Pause a running instance (by ID, name, prefix or close match)"),
+        ("resume <instance>", "Resume a paused instance (by ID, name, prefix or close match)"),
+        ("destroy [instance]", "Destroy an instance (optional ID, name, prefix or close match)"),
+        ("create", "Create a new instance with options (--ready ssh|http waits until it is reachable)"),
+        ("wait <selector>", "Wait until instances are Running and reachable (--ready api|ssh|http)"),
         ("cmd", "Show this command list"),
-        ("rename", "Rename an instance")
+        ("rename", "Rename an instance"),
+        ("scripts list", "List your uploaded startup scripts"),
+        ("scripts upload <path>", "Upload a startup script (skipped if unchanged)"),
+        ("scripts show <script_id>", "Show the details of a startup script"),
+        ("pool set <spec> <size>", "Keep <size> paused instances warm for a spec"),
+        ("pool status", "Show warm pools and their members"),
+        ("pool fill [spec]", "Provision paused instances up to each pool's target"),
+        ("pool acquire <spec>", "Resume a warm instance from a pool"),
+        ("pool release <instance>", "Pause an instance back into its pool"),
+        ("pool remove <spec>", "Stop tracking a pool"),
+        ("exec <selector> -- <command>", "Run a command over SSH on many instances in parallel"),
+        ("completion <shell>", "Print a bash, zsh or fish completion script"),
+        ("push <selector> <local> <remote>", "Copy changed files to instances over SSH"),
+        ("pull <selector> <remote> <local>", "Copy changed files from an instance over SSH"),
+        ("exporter", "Serve fleet and client metrics for Prometheus"),
+        ("stats", "Show p50/p90/p99 durations of past operations"),
+        ("ops [--watch]", "Check on operations submitted with --no-wait"),
+        ("guard <selector>", "Resume or recreate spot instances when they are preempted"),
+        ("endpoint", "Show the backend endpoint and pool settings (--probe to measure candidates)"),
+        ("account add <name>", "Save another account's API token under a name"),
+        ("--account a,b list", "List instances (or balance, fs list) of several accounts at once"),
+        ("jobs submit <script> [-- args]", "Queue a script to run on a GPU worker (--gpus, --gpu-type)"),
+        ("jobs run", "Schedule queued jobs onto workers, adding and pausing workers as needed"),
+        ("jobs list [--all]", "Show queued, running and finished jobs"),
+        ("jobs logs <job>", "Show the output of a job"),
+        ("jobs cancel <job>", "Cancel a queued or running job"),
+        ("jobs stats", "Show jobs per hour and jobs per dollar by GPU type"),
+        ("history <instance>", "Show recorded state changes (--usage, --at, --enable)")
     ])
     
     for cmd, desc in commands.items():
@@ -73,7 +107,10 @@ def display_commands() -> None:
         ("--name", "Name for the instance", "My-Jarvis-Instance"),
         ("--template", "Framework template", "pytorch"),
         ("--spot", "Request spot instance (cheaper but can be terminated)", "False"),
-        ("--fs-id", "Attach a filesystem by ID", "None")
+        ("--fs-id", "Attach a filesystem by ID", "None"),
+        ("--script", "Startup script to run (uploaded only if new)", "None"),
+        ("--script-args", "Arguments passed to the startup script", "None"),
+        ("--no-wait", "Return once the request is accepted (track with 'jarvis ops')", "False")
     ]
     
     for option, desc, default in create_options:
@@ -86,14 +123,20 @@ def display_commands() -> None:
     console.print("\nFor detailed options:")
     console.print(create_table)
 
-def main() -> int:
-    """Command-line interface entry point."""
+def build_parser() -> argparse.ArgumentParser:
+    """Builds the argument parser for every command."""
     parser = argparse.ArgumentParser(description="A CLI tool to manage Jarvislabs.ai instances.")
     parser.add_argument(
         "--token",
         help="Your Jarvislabs API token. Can also be set via JARVISLABS_TOKEN environment variable.",
         default=os.environ.get("JARVISLABS_TOKEN"),
     )
+    parser.add_argument("--endpoint", type=str, help="Backend URL, a comma-separated list to pick the fastest from, or 'auto'. Can also be set via JARVIS_ENDPOINT.")
+    parser.add_argument("--account", type=str, help="Comma-separated saved accounts, or 'all', to query at once with list, balance and fs list.")
+    parser.add_argument("--profile", action="store_true", help="Profile this run and print where the time went.")
+    parser.add_argument("--profile-out", type=str, help="Base path for the profile files (default: ~/.jarvislabs/profiles/<command>-<time>).")
+    parser.add_argument("--profile-top", type=int, default=15, help="Number of functions to show in the profile summary.")
+    parser.add_argument("--profile-sample", action="store_true", help="Sample the stack instead of tracing every call; better for long waits.")
     
     subparsers = parser.add_subparsers(dest="command", required=True, help="Available commands")
 
@@ -104,7 +147,13 @@ def main() -> int:
     subparsers.add_parser("exit", help="Exit Jarvis CLI with goodbye message.")
 
     # List command
-    subparsers.add_parser("list", help="List all your instances.")
+    list_parser = subparsers.add_parser("list", help="List all your instances.")
+    list_parser.add_argument("--where", type=str, help="Filter expression, e.g. \"status=Running and gpu_type in (A100,A6000)\".")
+    list_parser.add_argument("--sort", type=str, help="Comma-separated fields to sort by; prefix a field with '-' for descending (e.g. --sort=-storage,name).")
+    list_parser.add_argument("--columns", type=str, help="Comma-separated fields to show, e.g. id,name,ssh.")
+    list_parser.add_argument("--group-by", type=str, help="Show instance, GPU and storage totals per value of a field.")
+    list_parser.add_argument("--count", action="store_true", help="Only print the number of matching instances.")
+    list_parser.add_argument("--plain", action="store_true", help="Print plain aligned text instead of a table.")
 
     # Balance command
     subparsers.add_parser("balance", help="Check your account balance.")
@@ -119,27 +168,46 @@ def main() -> int:
     fs_parser = subparsers.add_parser("fs", help="Manage filesystems.").add_subparsers(dest="fs_command", required=True)
     fs_parser.add_parser("list", help="List all filesystems.")
     create_fs_parser = fs_parser.add_parser("create", help="Create a new filesystem.")
-    create_fs_parser.add_argument("name", type=str, help="Name for the new filesystem.")
+    create_fs_parser.add_argument("names", nargs="+", type=str, help="Name(s) for the new filesystem(s); several names create them concurrently.")
     create_fs_parser.add_argument("storage", type=int, help="Storage size in GB.")
-    delete_fs_parser = fs_parser.add_parser("delete", help="Delete a filesystem.")
-    delete_fs_parser.add_argument("fs_id", type=str, help="The ID of the filesystem to delete.")
+    create_fs_wait = create_fs_parser.add_mutually_exclusive_group()
+    create_fs_wait.add_argument("--wait", action="store_true", help="Wait until every new filesystem is Ready.")
+    create_fs_wait.add_argument("--no-wait", action="store_true", help="Return once the requests are accepted and track them with 'jarvis ops'.")
+    create_fs_parser.add_argument("--timeout", type=int, default=300, help="Seconds to wait with --wait.")
+    create_fs_parser.add_argument("--parallel", type=int, default=8, help="Maximum number of concurrent requests.")
+    delete_fs_parser = fs_parser.add_parser("delete", help="Delete one or more filesystems.")
+    delete_fs_parser.add_argument("fs_ids", nargs="+", type=str, help="Filesystem IDs, names or name globs (comma-separated lists are accepted).")
+    delete_fs_parser.add_argument("--parallel", type=int, default=8, help="Maximum number of concurrent requests.")
+    delete_fs_parser.add_argument("--no-wait", action="store_true", help="Return once the requests are accepted and track them with 'jarvis ops'.")
+
+    # Scripts command group
+    scripts_parser = subparsers.add_parser("scripts", help="Manage startup scripts.").add_subparsers(dest="scripts_command", required=True)
+    scripts_parser.add_parser("list", help="List your uploaded startup scripts.")
+    upload_script_parser = scripts_parser.add_parser("upload", help="Upload a startup script.")
+    upload_script_parser.add_argument("path", type=str, help="Path to the script.")
+    upload_script_parser.add_argument("--name", type=str, help="Name for the script (defaults to the file name).")
+    upload_script_parser.add_argument("--force", action="store_true", help="Upload even if the same content was uploaded before.")
+    show_script_parser = scripts_parser.add_parser("show", help="Show the details of a startup script.")
+    show_script_parser.add_argument("script_id", type=str, help="The ID of the script.")
 
     # Pause command
     pause_parser = subparsers.add_parser("pause", help="Pause a running instance.")
-    pause_parser.add_argument("instance_id", type=int, nargs="?", default=None, help="The machine ID of the instance to pause (optional).")
+    pause_parser.add_argument("instance_id", type=str, nargs="?", default=None, help="The instance to pause: Machine ID, name, ID prefix or a close match of the name (optional).")
 
     # Resume command
     resume_parser = subparsers.add_parser("resume", help="Resume a paused instance.")
-    resume_parser.add_argument("instance_id", type=int, nargs="?", default=None, help="The machine ID of the instance to resume (optional).")
+    resume_parser.add_argument("instance_id", type=str, nargs="?", default=None, help="The instance to resume: Machine ID, name, ID prefix or a close match of the name (optional).")
     resume_parser.add_argument("--gpu-type", type=str, help="New GPU type to switch to.")
     resume_parser.add_argument("--num-gpus", type=int, help="New number of GPUs.")
     resume_parser.add_argument("--num-cpus", type=int, help="New number of CPUs.")
     resume_parser.add_argument("--storage", type=int, help="New storage size in GB.")
     resume_parser.add_argument("--fs-id", type=str, help="Filesystem ID to attach.")
+    resume_parser.add_argument("--script", type=str, help="Path to a startup script to run on resume.")
+    resume_parser.add_argument("--script-args", type=str, help="Arguments passed to the startup script.")
 
     # Destroy command
     destroy_parser = subparsers.add_parser("destroy", help="Destroy an instance.")
-    destroy_parser.add_argument("instance_id", type=int, nargs="?", default=None, help="The machine ID of the instance to destroy (optional).")
+    destroy_parser.add_argument("instance_id", type=str, nargs="?", default=None, help="The instance to destroy: Machine ID, name, ID prefix or a close match of the name (optional).")
 
     # Create command
     create_parser = subparsers.add_parser("create", help="Create a new instance.")
@@ -152,16 +220,276 @@ def main() -> int:
     create_parser.add_argument("--num-cpus", type=int, default=1, help="Number of CPUs (if instance-type is cpu).")
     create_parser.add_argument("--spot", action="store_true", help="Request a spot instance instead of on-demand.")
     create_parser.add_argument("--fs-id", type=str, help="Filesystem ID to attach.")
+    create_parser.add_argument("--script", type=str, help="Path to a startup script to run on the new instance.")
+    create_parser.add_argument("--script-args", type=str, help="Arguments passed to the startup script.")
+    for mutation_parser in (pause_parser, resume_parser, destroy_parser, create_parser):
+        mutation_parser.add_argument("--no-wait", action="store_true", help="Return once the request is accepted and track it with 'jarvis ops'.")
+
+    # Wait command
+    wait_parser = subparsers.add_parser("wait", help="Wait until instances are Running and reachable.")
+    wait_parser.add_argument("selector", type=str, help="Machine IDs, names, name globs or a query expression.")
+    wait_parser.add_argument("--timeout", type=int, default=600, help="Seconds to wait before giving up.")
+    wait_parser.add_argument("--interval", type=int, default=5, help="Seconds between status checks.")
+    for ready_parser in (resume_parser, create_parser, wait_parser):
+        ready_parser.add_argument("--ready", choices=["api", "ssh", "http"], default="api",
+                                  help="What counts as ready: the API status (api), an SSH banner (ssh) or the HTTP url and endpoints (http).")
+    for ready_parser in (resume_parser, create_parser):
+        ready_parser.add_argument("--ready-timeout", type=int, default=300, help="Seconds to wait for --ready ssh or http.")
 
     # Rename command
     rename_parser = subparsers.add_parser("rename", help="Rename an instance.")
-    rename_parser.add_argument("instance_id", type=int, nargs="?", default=None, help="The machine ID of the instance to rename (optional).")
+    rename_parser.add_argument("instance_id", type=str, nargs="?", default=None, help="The instance to rename: Machine ID, name, ID prefix or a close match of the name (optional).")
     rename_parser.add_argument("name", type=str, nargs="?", default=None, help="The new name for the instance. If not provided, you'll be prompted.")
 
-    args = parser.parse_args()
+    # Warm pool command group
+    pool_parser = subparsers.add_parser("pool", help="Manage warm pools of paused instances.").add_subparsers(dest="pool_command", required=True)
+    pool_parser.add_parser("status", help="Show warm pools and their members.")
+    set_pool_parser = pool_parser.add_parser("set", help="Set the target size of a pool.")
+    set_pool_parser.add_argument("spec", type=str, help="Pool spec, e.g. 'A100' or 'gpu=A100,gpus=2,template=pytorch,storage=50,fs=<fs_id>'.")
+    set_pool_parser.add_argument("size", type=int, help="Number of paused instances to keep.")
+    remove_pool_parser = pool_parser.add_parser("remove", help="Stop tracking a pool (instances are kept).")
+    remove_pool_parser.add_argument("spec", type=str, help="Pool spec or key.")
+    fill_pool_parser = pool_parser.add_parser("fill", help="Provision paused instances up to each pool's target.")
+    fill_pool_parser.add_argument("spec", type=str, nargs="?", default=None, help="Only fill this pool (optional).")
+    fill_pool_parser.add_argument("--watch", action="store_true", help="Keep replenishing the pools until interrupted.")
+    fill_pool_parser.add_argument("--interval", type=int, default=60, help="Seconds between replenish rounds with --watch.")
+    acquire_pool_parser = pool_parser.add_parser("acquire", help="Resume a warm instance from a pool.")
+    acquire_pool_parser.add_argument("spec", type=str, help="Pool spec or key.")
+    acquire_pool_parser.add_argument("--name", type=str, help="Name for the acquired instance.")
+    acquire_pool_parser.add_argument("--no-replenish", action="store_true", help="Don't start a background refill after acquiring.")
+    release_pool_parser = pool_parser.add_parser("release", help="Pause an instance back into its pool.")
+    release_pool_parser.add_argument("instance_id", type=str, help="The instance to release: Machine ID, name, ID prefix or a close match of the name.")
+    release_pool_parser.add_argument("--spec", type=str, help="Pool to release into (defaults to the pool matching the instance).")
+
+    # Exec command
+    exec_parser = subparsers.add_parser("exec", help="Run a command over SSH on many instances in parallel.")
+    exec_parser.add_argument("selector", type=str, help="Comma-separated machine IDs, names or name globs, 'all', or a query expression.")
+    exec_parser.add_argument("--parallel", type=int, default=16, help="Maximum number of concurrent SSH sessions.")
+    exec_parser.add_argument("--timeout", type=float, default=None, help="Kill the command on a host after this many seconds.")
+    exec_parser.add_argument("--connect-timeout", type=int, default=10, help="SSH connection timeout in seconds.")
+    exec_parser.add_argument("-o", "--ssh-option", dest="ssh_options", action="append", default=[], help="Extra ssh -o option (repeatable).")
+    exec_parser.add_argument("remote_command", nargs="*", help="Command to run, after '--'.")
+
+    # Push and pull commands
+    push_parser = subparsers.add_parser("push", help="Copy changed files to instances over SSH.")
+    push_parser.add_argument("selector", type=str, help="Comma-separated machine IDs, names or name globs, 'all', or a query expression.")
+    push_parser.add_argument("local_path", type=str, help="Local file or directory to push.")
+    push_parser.add_argument("remote_path", type=str, help="Remote directory to push into.")
+    pull_parser = subparsers.add_parser("pull", help="Copy changed files from an instance over SSH.")
+    pull_parser.add_argument("selector", type=str, help="Machine ID or name of a single instance.")
+    pull_parser.add_argument("remote_path", type=str, help="Remote directory to pull.")
+    pull_parser.add_argument("local_path", type=str, help="Local directory to pull into.")
+    for sync_parser in (push_parser, pull_parser):
+        sync_parser.add_argument("--streams", type=int, default=4, help="Number of parallel transfer streams.")
+        sync_parser.add_argument("--no-compress", action="store_true", help="Don't gzip data in flight.")
+        sync_parser.add_argument("-o", "--ssh-option", dest="ssh_options", action="append", default=[], help="Extra ssh -o option (repeatable).")
+
+    # Exporter command
+    exporter_parser = subparsers.add_parser("exporter", help="Serve fleet and client metrics for Prometheus.")
+    exporter_parser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on.")
+    exporter_parser.add_argument("--port", type=int, default=9464, help="Port to listen on.")
+    exporter_parser.add_argument("--interval", type=float, default=60, help="Seconds between backend refreshes.")
+
+    # Guard command
+    guard_parser = subparsers.add_parser("guard", help="Resume or recreate spot instances when they are preempted.")
+    guard_parser.add_argument("selector", type=str, nargs="?", help="Comma-separated machine IDs, names or name globs, 'all', or a query expression.")
+    guard_parser.add_argument("--interval", type=int, default=30, help="Seconds between checks.")
+    guard_parser.add_argument("--once", action="store_true", help="Check once and exit, e.g. from cron.")
+    guard_parser.add_argument("--fallback-on-demand", action="store_true", help="Recover as on-demand after --max-spot-attempts failed spot attempts.")
+    guard_parser.add_argument("--max-spot-attempts", type=int, default=3, help="Spot recovery attempts before falling back to on-demand.")
+    guard_parser.add_argument("--report", action="store_true", help="Show past recoveries and their downtime instead of guarding.")
+
+    # History command
+    history_parser = subparsers.add_parser("history", help="Query the local history of instance states.")
+    history_parser.add_argument("instance_id", type=str, nargs="?", default=None, help="Show the transitions of one instance, by machine ID or custom name.")
+    history_action = history_parser.add_mutually_exclusive_group()
+    history_action.add_argument("--enable", action="store_true", help="Start recording instance state changes.")
+    history_action.add_argument("--disable", action="store_true", help="Stop recording (recorded history is kept).")
+    history_action.add_argument("--usage", action="store_true", help="Show running hours per GPU type per day.")
+    history_action.add_argument("--at", type=str, help="Show what existed at a time, e.g. 03:00 or '2025-01-31 03:00'.")
+    history_action.add_argument("--record", action="store_true", help="Fetch instances now so their state is recorded.")
+    history_action.add_argument("--compact", action="store_true", help="Drop history older than --keep days.")
+    history_parser.add_argument("--days", type=int, default=7, help="How many days back to show.")
+    history_parser.add_argument("--watch", action="store_true", help="With --record, keep recording every --interval seconds.")
+    history_parser.add_argument("--interval", type=int, default=300, help="Seconds between recordings with --watch.")
+    history_parser.add_argument("--keep", type=int, default=400, help="Days of history kept by --compact.")
+
+    # Ops command
+    ops_parser = subparsers.add_parser("ops", help="Check on operations submitted with --no-wait.")
+    ops_parser.add_argument("--watch", action="store_true", help="Keep checking until no operation is pending.")
+    ops_parser.add_argument("--interval", type=int, default=10, help="Seconds between checks with --watch.")
+    ops_parser.add_argument("--clear", action="store_true", help="Remove finished operations from the ledger.")
+
+    # Stats command
+    stats_parser = subparsers.add_parser("stats", help="Show latency percentiles of past operations.")
+    stats_parser.add_argument("--window", type=str, default="7d", help="Comma-separated time windows, e.g. 24h,7d,all.")
+    stats_parser.add_argument("--phase", choices=["request", "provision", "ready"], help="Report one phase instead of the whole operation.")
+    stats_parser.add_argument("--no-gpu", action="store_true", help="Don't break results down by GPU type.")
+
+    # Account command group
+    account_parser = subparsers.add_parser("account", help="Save API tokens of other accounts under a name.").add_subparsers(dest="account_command", required=True)
+    add_account_parser = account_parser.add_parser("add", help="Save an account's token (prompted for unless --current).")
+    add_account_parser.add_argument("name", type=str, help="Name for the account.")
+    add_account_parser.add_argument("--current", action="store_true", help="Save the token from --token or JARVISLABS_TOKEN.")
+    account_parser.add_parser("list", help="Show saved accounts.")
+    remove_account_parser = account_parser.add_parser("remove", help="Forget a saved account.")
+    remove_account_parser.add_argument("name", type=str, help="Name of the account.")
+
+    # Jobs command group
+    jobs_parser = subparsers.add_parser("jobs", help="Queue scripts and run them on GPU worker instances.").add_subparsers(dest="jobs_command", required=True)
+    submit_jobs_parser = jobs_parser.add_parser("submit", help="Queue a script; arguments for it go after '--'.")
+    submit_jobs_parser.add_argument("script", type=str, help="Local script to run with bash on a worker.")
+    submit_jobs_parser.add_argument("--gpus", type=int, default=1, help="Number of GPUs the job needs.")
+    submit_jobs_parser.add_argument("--gpu-type", type=str, default="A100", help="GPU type of the worker.")
+    submit_jobs_parser.add_argument("--template", type=str, default="pytorch", help="Template of the worker.")
+    submit_jobs_parser.add_argument("--name", type=str, help="Name shown for the job (defaults to the script name).")
+    run_jobs_parser = jobs_parser.add_parser("run", help="Schedule queued jobs onto worker instances.")
+    run_jobs_parser.add_argument("--interval", type=int, default=15, help="Seconds between scheduling passes.")
+    run_jobs_parser.add_argument("--once", action="store_true", help="Run one scheduling pass and exit, e.g. from cron.")
+    run_jobs_parser.add_argument("--max-workers", type=int, default=4, help="Most worker instances to keep, paused ones included.")
+    run_jobs_parser.add_argument("--gpus-per-worker", type=int, default=1, help="GPUs of a new worker, if more than the largest queued job needs.")
+    run_jobs_parser.add_argument("--idle-pause", type=int, default=600, help="Pause a worker after this many idle seconds.")
+    run_jobs_parser.add_argument("--storage", type=int, default=20, help="Storage of new workers in GB.")
+    list_jobs_parser = jobs_parser.add_parser("list", help="Show queued and running jobs.")
+    list_jobs_parser.add_argument("--all", action="store_true", help="Include finished jobs.")
+    logs_jobs_parser = jobs_parser.add_parser("logs", help="Show the output of a job.")
+    logs_jobs_parser.add_argument("job_id", type=str, help="Job ID or a prefix of it.")
+    cancel_jobs_parser = jobs_parser.add_parser("cancel", help="Cancel queued or running jobs.")
+    cancel_jobs_parser.add_argument("job_ids", type=str, nargs="+", help="Job IDs or prefixes.")
+    jobs_parser.add_parser("stats", help="Show jobs per hour and jobs per dollar by GPU type.")
+    price_jobs_parser = jobs_parser.add_parser("price", help="Set hourly prices per GPU, used for jobs per dollar.")
+    price_jobs_parser.add_argument("prices", type=str, nargs="+", help="GPU=PRICE per GPU-hour, e.g. A100=1.29.")
+
+    # Endpoint command
+    endpoint_parser = subparsers.add_parser("endpoint", help="Show the backend endpoint and connection pool settings.")
+    endpoint_parser.add_argument("--probe", action="store_true", help="Measure the latency of every candidate endpoint and cache the fastest.")
+
+    # Completion command
+
+    completion_parser = subparsers.add_parser("completion", help="Print a shell completion script.")
+    completion_parser.add_argument("shell", choices=["bash", "zsh", "fish"], help="Shell to generate the completion script for.")
+
+    return parser
+
+# Subcommands whose arguments after '--' are passed through to a remote command or job script
+PASSTHROUGH_COMMANDS = (("exec",), ("jobs", "submit"))
 
-    # Set the token for the client to use
-    orchestrator.set_token(args.token)
+def command_path(parser: argparse.ArgumentParser, argv: list) -> tuple:
+    """Returns the subcommand names in argv, e.g. ('jobs', 'submit'), without parsing their arguments."""
+    path = []
+    tokens = iter(argv)
+    for token in tokens:
+        if token.startswith("-"):
+            action = parser._option_string_actions.get(token.split("=", 1)[0])
+            # Skip an option's value so it is never mistaken for a subcommand
+            if action is not None and action.nargs != 0 and "=" not in token:
+                next(tokens, None)
+            continue
+        subparsers = [a for a in parser._actions if isinstance(a, argparse._SubParsersAction)]
+        if not subparsers or token not in subparsers[0].choices:
+            break
+        path.append(token)
+        parser = subparsers[0].choices[token]
+    return tuple(path)
+
+def main() -> int:
+    """Command-line interface entry point."""
+    parse_started = time.perf_counter()
+    parser = build_parser()
+
+    # For exec and jobs submit, everything after '--' is a remote command; split it off so argparse doesn't
+    # try to parse it. Other commands leave '--' to argparse, where it just ends the options
+    argv = sys.argv[1:]
+    passthrough = []
+    if "--" in argv:
+        split = argv.index("--")
+        if command_path(parser, argv[:split]) in PASSTHROUGH_COMMANDS:
+            argv, passthrough = argv[:split], argv[split + 1:]
+
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        from . import profiling
+        return profiling.profile_run(
+            lambda: run(parser, args, passthrough),
+            command=args.command,
+            imports_seconds=_IMPORTS_DONE - _IMPORT_STARTED,
+            parse_seconds=time.perf_counter() - parse_started,
+            out=args.profile_out,
+            top=args.profile_top,
+            sample=args.profile_sample
+        )
+    return run(parser, args, passthrough)
+
+def run(parser: argparse.ArgumentParser, args: argparse.Namespace, passthrough: list) -> int:
+    """Runs a parsed command."""
+    # Completion scripts are generated offline and need no token
+    if args.command == "completion":
+        print(completion.generate(parser, args.shell))
+        return 0
+
+    # Stats only read the local journal
+    if args.command == "stats":
+        return orchestrator.show_stats(args.window, phase=args.phase, by_gpu=not args.no_gpu)
+
+    # History queries are answered locally; only --record needs the API
+    if args.command == "history" and not args.record:
+        if args.enable or args.disable:
+            orchestrator.set_history(args.enable)
+        elif args.usage:
+            orchestrator.show_usage(args.days)
+        elif args.at:
+            return orchestrator.show_state_at(args.at)
+        elif args.compact:
+            orchestrator.compact_history(args.keep)
+        elif args.instance_id is not None:
+            return orchestrator.show_history(args.instance_id, days=args.days)
+        else:
+            console.print("[bold red]Error: Give an instance ID or one of --usage, --at, --record, --enable, --disable or --compact.[/]")
+            return 1
+        return 0
+
+    # Endpoint selection only needs the network for latency probes, not the token
+    if args.command == "endpoint":
+        return orchestrator.show_endpoint(args.endpoint, probe=args.probe)
+
+    # The job queue is local; only the scheduler and live logs talk to the API
+    if args.command == "jobs":
+        if args.jobs_command == "submit":
+            return jobs.submit(args.script, passthrough, gpus=args.gpus, gpu_type=args.gpu_type,
+                               template=args.template, name=args.name)
+        elif args.jobs_command == "list":
+            jobs.list_jobs(show_all=args.all)
+            return 0
+        elif args.jobs_command == "cancel":
+            return jobs.cancel(args.job_ids)
+        elif args.jobs_command == "stats":
+            jobs.stats()
+            return 0
+        elif args.jobs_command == "price":
+            return jobs.set_prices(args.prices)
+
+    # Saved accounts are local; --current saves the token this run would use
+    if args.command == "account":
+        if args.account_command == "add":
+            if args.current and not args.token:
+                console.print("[bold red]Error: No current token. Pass --token or set JARVISLABS_TOKEN.[/]")
+                return 1
+            return orchestrator.add_account(args.name, token=args.token if args.current else None)
+        elif args.account_command == "remove":
+            return orchestrator.remove_account(args.name)
+        orchestrator.list_accounts()
+        return 0
+
+    fans_out = args.command in ("list", "balance") or (args.command == "fs" and args.fs_command == "list")
+    if args.account and not fans_out:
+        console.print("[bold red]Error: --account works with list, balance and fs list.[/]")
+        return 1
+
+    # Set the token for the client to use; with --account every request uses a saved account's token instead
+    if not args.account:
+        orchestrator.set_token(args.token)
+    orchestrator.set_endpoint(args.endpoint)
 
     # Only show the banner for the start command
     if args.command == "start":
@@ -176,35 +504,56 @@ def main() -> int:
 
     # Execute the command
     if args.command == "list":
-        orchestrator.list_instances()
+        return orchestrator.list_instances(
+            where=args.where,
+            sort=args.sort,
+            columns=args.columns,
+            group_by=args.group_by,
+            count=args.count,
+            plain=args.plain,
+            account=args.account
+        ) or 0
     elif args.command == "balance":
-        orchestrator.get_balance()
+        return orchestrator.get_balance(account=args.account) or 0
     elif args.command == "templates":
         orchestrator.list_templates()
     elif args.command == "cmd":
         display_commands()
     elif args.command == "fs":
         if args.fs_command == "list":
-            orchestrator.list_filesystems()
+            return orchestrator.list_filesystems(account=args.account) or 0
         elif args.fs_command == "create":
-            orchestrator.create_filesystem(args.name, args.storage)
+            return orchestrator.create_filesystem(args.names, args.storage, wait=args.wait, timeout=args.timeout,
+                                                  parallel=args.parallel, no_wait=args.no_wait)
         elif args.fs_command == "delete":
-            orchestrator.delete_filesystem(args.fs_id)
+            return orchestrator.delete_filesystem(args.fs_ids, parallel=args.parallel, no_wait=args.no_wait)
+    elif args.command == "scripts":
+        if args.scripts_command == "list":
+            orchestrator.list_scripts()
+        elif args.scripts_command == "upload":
+            orchestrator.upload_script(args.path, name=args.name, force=args.force)
+        elif args.scripts_command == "show":
+            orchestrator.show_script(args.script_id)
     elif args.command == "pause":
-        orchestrator.pause_instance(args.instance_id)
+        orchestrator.pause_instance(args.instance_id, wait=not args.no_wait)
     elif args.command == "resume":
-        orchestrator.resume_instance(
+        return orchestrator.resume_instance(
             args.instance_id,
             gpu_type=args.gpu_type,
             num_gpus=args.num_gpus,
             num_cpus=args.num_cpus,
             storage=args.storage,
-            fs_id=args.fs_id
+            fs_id=args.fs_id,
+            script=args.script,
+            script_args=args.script_args,
+            wait=not args.no_wait,
+            ready=args.ready,
+            ready_timeout=args.ready_timeout
         )
     elif args.command == "destroy":
-        orchestrator.destroy_instance(args.instance_id)
+        orchestrator.destroy_instance(args.instance_id, wait=not args.no_wait)
     elif args.command == "create":
-        orchestrator.create_instance(
+        return orchestrator.create_instance(
             instance_type=args.instance_type,
             name=args.name,
             storage=args.storage,
@@ -213,10 +562,66 @@ def main() -> int:
             num_gpus=args.num_gpus,
             num_cpus=args.num_cpus,
             is_reserved=not args.spot,
-            fs_id=args.fs_id
+            fs_id=args.fs_id,
+            script=args.script,
+            script_args=args.script_args,
+            wait=not args.no_wait,
+            ready=args.ready,
+            ready_timeout=args.ready_timeout
         )
+    elif args.command == "wait":
+        return orchestrator.wait_for_instances(args.selector, ready=args.ready, timeout=args.timeout, interval=args.interval)
     elif args.command == "rename":
         orchestrator.rename_instance(args.instance_id, args.name)
+    elif args.command == "pool":
+        if args.pool_command == "status":
+            pool.pool_status()
+        elif args.pool_command == "set":
+            pool.set_pool(args.spec, args.size)
+        elif args.pool_command == "remove":
+            pool.remove_pool(args.spec)
+        elif args.pool_command == "fill":
+            pool.fill_pools(args.spec, watch=args.watch, interval=args.interval)
+        elif args.pool_command == "acquire":
+            pool.acquire(args.spec, name=args.name, replenish_after=not args.no_replenish)
+        elif args.pool_command == "release":
+            pool.release(args.instance_id, spec=args.spec)
+    elif args.command == "exec":
+        return remote.exec_command(
+            args.selector,
+            args.remote_command + passthrough,
+            parallel=args.parallel,
+            timeout=args.timeout,
+            connect_timeout=args.connect_timeout,
+            options=args.ssh_options
+        )
+    elif args.command == "push":
+        return sync.push(args.selector, args.local_path, args.remote_path, streams=args.streams,
+                         compress=not args.no_compress, options=args.ssh_options)
+    elif args.command == "pull":
+        return sync.pull(args.selector, args.remote_path, args.local_path, streams=args.streams,
+                         compress=not args.no_compress, options=args.ssh_options)
+    elif args.command == "exporter":
+        exporter.serve(host=args.host, port=args.port, interval=args.interval)
+    elif args.command == "guard":
+        if args.report:
+            guard.report()
+        elif not args.selector:
+            console.print("[bold red]Error: Specify which instances to guard, e.g. 'jarvis guard \"trainer-*\"'.[/]")
+            return 1
+        else:
+            return guard.guard(args.selector, interval=args.interval, once=args.once,
+                               fallback_on_demand=args.fallback_on_demand, max_spot_attempts=args.max_spot_attempts)
+    elif args.command == "history":
+        return orchestrator.record_history(watch=args.watch, interval=args.interval)
+    elif args.command == "ops":
+        return orchestrator.show_ops(watch=args.watch, interval=args.interval, clear=args.clear)
+    elif args.command == "jobs":
+        if args.jobs_command == "run":
+            return jobs.run(interval=args.interval, once=args.once, max_workers=args.max_workers,
+                            gpus_per_worker=args.gpus_per_worker, idle_pause=args.idle_pause, storage=args.storage)
+        elif args.jobs_command == "logs":
+            return jobs.logs(args.job_id)
 
     return 0
 
@@ -0,0 +1,218 @@
+import argparse
+
+from .jlclient.completion_index import COMPLETION_DIR
+
+# Argument destinations completed from the local index written by normal commands
+INDEXED_DESTS = {
+    "instance_id": "machines",
+    "selector": "machines",
+    "gpu_type": "gpu_types",
+    "template": "templates",
+    "fs_id": "fs_ids",
+    "fs_ids": "fs_ids",
+    "script_id": "script_ids",
+}
+# Argument destinations completed with local file names
+FILE_DESTS = {"path", "local_path", "script"}
+
+def _walk(parser, path=()):
+    """Yields (path, subcommands, options, positionals) for every parser in the command tree."""
+    subcommands = {}
+    options = []
+    positionals = []
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            helps = {a.dest: a.help for a in action._choices_actions}
+            for name, subparser in action.choices.items():
+                subcommands[name] = (subparser, helps.get(name) or "")
+        elif action.option_strings:
+            options.append(action)
+        else:
+            positionals.append(action)
+    yield path, subcommands, options, positionals
+    for name, (subparser, _) in subcommands.items():
+        yield from _walk(subparser, path + (name,))
+
+def _source(action):
+    """Returns how values of an argument are completed: ('words', [...]), ('index', kind), ('files',) or None."""
+    if action.choices:
+        return ("words", [str(c) for c in action.choices])
+    if action.dest in INDEXED_DESTS:
+        return ("index", INDEXED_DESTS[action.dest])
+    if action.dest in FILE_DESTS:
+        return ("files",)
+    return None
+
+def _key(path):
+    return "_".join(path)
+
+def _takes_value(action):
+    return action.nargs != 0
+
+def _bash_reply(source):
+    if source is None:
+        return "return 0"
+    if source[0] == "words":
+        return f'COMPREPLY=($(compgen -W "{" ".join(source[1])}" -- "$cur"))'
+    if source[0] == "index":
+        return f'local IFS=$\'\\n\'; COMPREPLY=($(compgen -W "$(_jarvis_index {source[1]})" -- "$cur"))'
+    return 'COMPREPLY=($(compgen -f -- "$cur"))'
+
+def generate_bash(parser) -> str:
+    """Generates a bash completion script that reads dynamic values from the local index only."""
+    transitions = []
+    value_options = []
+    value_cases = []
+    option_cases = []
+    positional_cases = []
+    for path, subcommands, options, positionals in _walk(parser):
+        key = _key(path)
+        for name in subcommands:
+            transitions.append(f"{key}:{name}")
+        flags = []
+        for action in options:
+            flags += action.option_strings
+            if _takes_value(action):
+                for flag in action.option_strings:
+                    value_options.append(f"{key}:{flag}")
+                value_cases.append(("|".join(f"{key}:{f}" for f in action.option_strings), _bash_reply(_source(action))))
+        option_cases.append((key, " ".join(flags)))
+        if subcommands:
+            positional_cases.append((f"{key}:0", f'COMPREPLY=($(compgen -W "{" ".join(subcommands)}" -- "$cur"))'))
+            continue
+        for n, action in enumerate(positionals):
+            pattern = f"{key}:*" if action.nargs in ("*", "+", argparse.REMAINDER) else f"{key}:{n}"
+            positional_cases.append((pattern, _bash_reply(_source(action))))
+
+    lines = [
+        "# bash completion for jarvis, generated by 'jarvis completion bash'",
+        "# Dynamic values are read from local files refreshed by normal jarvis commands; nothing here touches the network.",
+        "_jarvis_index() {",
+        f'    local f="${{JARVIS_COMPLETE_DIR:-{COMPLETION_DIR}}}/$1"',
+        '    [ -r "$f" ] && cat "$f"',
+        "}",
+        "",
+        "_jarvis() {",
+        '    local cur prev word path="" npos=0 skip="" i',
+        '    cur="${COMP_WORDS[COMP_CWORD]}"',
+        '    prev="${COMP_WORDS[COMP_CWORD-1]}"',
+        "    for ((i = 1; i < COMP_CWORD; i++)); do",
+        '        word="${COMP_WORDS[i]}"',
+        '        if [ -n "$skip" ]; then skip=""; continue; fi',
+        '        case "$path:$word" in',
+        f'            {"|".join(transitions)}) path="${{path:+${{path}}_}}$word"; npos=0; continue ;;',
+        f'            {"|".join(value_options)}) skip=1; continue ;;',
+        "        esac",
+        '        [[ "$word" != -* ]] && npos=$((npos + 1))',
+        "    done",
+        "",
+        '    case "$path:$prev" in',
+    ]
+    lines += [f"        {pattern}) {reply}; return 0 ;;" for pattern, reply in value_cases]
+    lines += [
+        "    esac",
+        "",
+        '    if [[ "$cur" == -* ]]; then',
+        '        case "$path" in',
+    ]
+    lines += [f'            "{key}") COMPREPLY=($(compgen -W "{flags}" -- "$cur")) ;;' for key, flags in option_cases]
+    lines += [
+        "        esac",
+        "        return 0",
+        "    fi",
+        "",
+        '    case "$path:$npos" in',
+    ]
+    lines += [f"        {pattern}) {reply} ;;" for pattern, reply in positional_cases]
+    lines += [
+        "    esac",
+        "}",
+        "complete -F _jarvis jarvis",
+    ]
+    return "\n".join(lines)
+
+def generate_zsh(parser) -> str:
+    """Generates a zsh completion script by loading the bash one through bashcompinit."""
+    return "\n".join([
+        "# zsh completion for jarvis, generated by 'jarvis completion zsh'",
+        "autoload -U +X compinit && compinit",
+        "autoload -U +X bashcompinit && bashcompinit",
+        generate_bash(parser),
+    ])
+
+def _fish_quote(text):
+    return "'" + (text or "").replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+def _fish_values(source):
+    if source is None:
+        return ""
+    if source[0] == "words":
+        return f" -a {_fish_quote(' '.join(source[1]))}"
+    if source[0] == "index":
+        return f" -a '(__jarvis_index {source[1]})'"
+    return " -F"
+
+def generate_fish(parser) -> str:
+    """Generates a fish completion script that reads dynamic values from the local index only."""
+    transitions = []
+    value_options = []
+    completions = []
+    for path, subcommands, options, positionals in _walk(parser):
+        key = _key(path)
+        condition = f"-n \"test (__jarvis_path) = {_fish_quote(key)}\""
+        for name, (_, help_text) in subcommands.items():
+            transitions.append(_fish_quote(f"{key}:{name}"))
+            completions.append(f"complete -c jarvis -f {condition} -a {_fish_quote(name)} -d {_fish_quote(help_text)}")
+        for action in options:
+            flags = ""
+            for flag in action.option_strings:
+                flags += f" -l {flag[2:]}" if flag.startswith("--") else f" -s {flag[1:]}"
+            if _takes_value(action):
+                value_options += [_fish_quote(f"{key}:{f}") for f in action.option_strings]
+                completions.append(f"complete -c jarvis -f {condition}{flags} -r{_fish_values(_source(action))} -d {_fish_quote(action.help)}")
+            else:
+                completions.append(f"complete -c jarvis -f {condition}{flags} -d {_fish_quote(action.help)}")
+        if not subcommands:
+            for action in positionals:
+                values = _fish_values(_source(action))
+                if values:
+                    completions.append(f"complete -c jarvis -f {condition}{values}")
+
+    lines = [
+        "# fish completion for jarvis, generated by 'jarvis completion fish'",
+        "# Dynamic values are read from local files refreshed by normal jarvis commands; nothing here touches the network.",
+        "function __jarvis_index",
+        f"    set -l dir {COMPLETION_DIR}",
+        "    set -q JARVIS_COMPLETE_DIR; and set dir $JARVIS_COMPLETE_DIR",
+        "    test -r $dir/$argv[1]; and cat $dir/$argv[1]",
+        "end",
+        "",
+        "function __jarvis_path",
+        "    set -l path ''",
+        "    set -l skip 0",
+        "    for word in (commandline -opc)[2..-1]",
+        "        if test $skip -eq 1",
+        "            set skip 0",
+        "            continue",
+        "        end",
+        '        switch "$path:$word"',
+        f"            case {' '.join(transitions)}",
+        "                if test -z \"$path\"",
+        "                    set path $word",
+        "                else",
+        "                    set path \"$path\"_$word",
+        "                end",
+        f"            case {' '.join(value_options)}",
+        "                set skip 1",
+        "        end",
+        "    end",
+        "    echo $path",
+        "end",
+        "",
+    ]
+    return "\n".join(lines + completions)
+
+def generate(parser, shell: str) -> str:
+    """Generates the completion script for a shell from the argparse command tree."""
+    generators = {"bash": generate_bash, "zsh": generate_zsh, "fish": generate_fish}
+    return generators[shell](parser)
@@ -0,0 +1,149 @@
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from rich.console import Console
+
+from .jlclient import metrics
+from .jlclient.jarvisclient import User, FileSystem
+from .jlclient.metrics import format_labels, format_value
+
+console = Console()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _gauge(name, documentation, samples):
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+    for labels, value in samples:
+        lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+    return lines
+
+def _number(value):
+    """Returns value as a float, or None if it is missing or not numeric."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def fleet_metrics(instances, balance, filesystems):
+    """Renders fleet state as Prometheus gauges."""
+    counts = {}
+    for instance in instances:
+        key = (instance.status or "Unknown", instance.gpu_type or "Unknown")
+        counts[key] = counts.get(key, 0) + 1
+
+    lines = _gauge("jarvis_instances", "Number of instances by status and GPU type.",
+                   [((("status", s), ("gpu_type", g)), n) for (s, g), n in sorted(counts.items())])
+    per_instance = [
+        (("machine_id", i.machine_id), ("name", i.name), ("gpu_type", i.gpu_type), ("template", i.template))
+        for i in instances
+    ]
+    lines += _gauge("jarvis_instance_up", "1 if the instance is running, 0 otherwise.",
+                    [(labels, 1 if i.status == "Running" else 0) for labels, i in zip(per_instance, instances)])
+    lines += _gauge("jarvis_instance_paused", "1 if the instance is paused, 0 otherwise.",
+                    [(labels, 1 if i.status == "Paused" else 0) for labels, i in zip(per_instance, instances)])
+    lines += _gauge("jarvis_instance_gpus", "Number of GPUs attached to the instance.",
+                    [(labels, i.num_gpus or 0) for labels, i in zip(per_instance, instances)])
+    # A balance that doesn't parse drops only its own gauge, never the rest of the scrape
+    balance = _number(balance)
+    if balance is not None:
+        lines += _gauge("jarvis_account_balance", "Account balance in USD.", [((), balance)])
+    if filesystems is not None:
+        fs_counts = {}
+        for fs in filesystems:
+            status = fs.get('status', 'Unknown')
+            fs_counts[status] = fs_counts.get(status, 0) + 1
+        lines += _gauge("jarvis_filesystems", "Number of filesystems by status.",
+                        [((("status", s),), n) for s, n in sorted(fs_counts.items())])
+    return lines
+
+class FleetCache(object):
+    """Polls the backend on its own schedule so that scrapes never trigger backend requests."""
+
+    def __init__(self, interval: float = 60):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.text = ""
+        self.last_success = 0.0
+        self.last_duration = 0.0
+        self.errors = 0
+        self.stopped = threading.Event()
+
+    def refresh(self):
+        started = time.perf_counter()
+        try:
+            instances = User.get_instances()
+            balance_info = User.get_balance()
+            balance = balance_info.get('balance') if isinstance(balance_info, dict) else None
+            filesystems = FileSystem().list()
+            text = "\n".join(fleet_metrics(instances, balance, filesystems if isinstance(filesystems, list) else None))
+            with self.lock:
+                self.text = text
+                self.last_success = time.time()
+        except Exception as e:
+            with self.lock:
+                self.errors += 1
+            console.print(f"[bold red]Error refreshing fleet metrics: {e}[/]")
+        finally:
+            self.last_duration = time.perf_counter() - started
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.refresh()
+
+    def start(self):
+        thread = threading.Thread(target=self.run, name="jarvis-exporter-refresh", daemon=True)
+        thread.start()
+        return thread
+
+    def render(self):
+        with self.lock:
+            lines = [self.text] if self.text else []
+            lines += _gauge("jarvis_exporter_last_refresh_timestamp_seconds",
+                            "Unix time of the last successful backend refresh.", [((), self.last_success)])
+            lines += _gauge("jarvis_exporter_refresh_duration_seconds",
+                            "Duration of the last backend refresh.", [((), self.last_duration)])
+            lines += [
+                "# HELP jarvis_exporter_refresh_errors_total Backend refreshes that failed.",
+                "# TYPE jarvis_exporter_refresh_errors_total counter",
+                f"jarvis_exporter_refresh_errors_total {self.errors}",
+            ]
+        return "\n".join(lines) + "\n" + metrics.render()
+
+def _handler(cache: FleetCache):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            if self.path == "/":
+                body = b'<html><body><a href="/metrics">Metrics</a></body></html>'
+                content_type = "text/html"
+            else:
+                body = cache.render().encode()
+                content_type = CONTENT_TYPE
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+def serve(host: str = "127.0.0.1", port: int = 9464, interval: float = 60):
+    """Serves fleet, balance and client latency metrics until interrupted."""
+    cache = FleetCache(interval=interval)
+    cache.refresh()
+    cache.start()
+    server = ThreadingHTTPServer((host, port), _handler(cache))
+    console.print(f"📈 [bold]Serving metrics on http://{host}:{port}/metrics (refreshing every {interval:g}s)...[/]")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("[bright_magenta]Exporter stopped.[/]")
+    finally:
+        cache.stopped.set()
+        server.server_close()
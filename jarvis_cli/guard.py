@@ -0,0 +1,215 @@
+import fnmatch
+import json
+import os
+import time
+
+from rich.console import Console
+
+from .jlclient import journal, ops
+from .jlclient.jarvisclient import User, Instance
+from .remote import select_instances
+from .visualisations import show_spinner, display_recoveries_table
+
+console = Console()
+
+# Guarded instances, keyed by name, so a guard can be stopped and restarted (or run from cron with --once)
+GUARD_FILE = os.path.expanduser("~/.jarvislabs/guard.json")
+# One line per recovered preemption, used by 'jarvis guard --report'
+RECOVERY_LOG = os.path.expanduser("~/.jarvislabs/guard.jsonl")
+
+# States a spot instance is left in when the provider reclaims it
+PREEMPTED_STATUSES = ("Paused", "Stopped", "Failed")
+BACKOFF_SECONDS = 30
+MAX_BACKOFF_SECONDS = 900
+
+def load_guards() -> dict:
+    """Loads guarded instance entries from disk."""
+    try:
+        if os.path.exists(GUARD_FILE):
+            with open(GUARD_FILE, 'r') as f:
+                return json.load(f)
+    except Exception:
+        pass
+    return {}
+
+def save_guards(guards: dict):
+    """Saves guarded instance entries to disk."""
+    os.makedirs(os.path.dirname(GUARD_FILE), exist_ok=True)
+    tmp_file = GUARD_FILE + ".tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(guards, f, indent=2)
+    os.replace(tmp_file, GUARD_FILE)
+
+def _key(instance: Instance) -> str:
+    return instance.name or str(instance.machine_id)
+
+def _spec(instance: Instance) -> dict:
+    return {
+        "name": instance.name,
+        "gpu_type": instance.gpu_type,
+        "num_gpus": instance.num_gpus,
+        "num_cpus": instance.num_cpus,
+        "storage": instance.hdd,
+        "template": instance.template,
+        "fs_id": instance.fs_id,
+    }
+
+def _guarded_keys(selector: str, instances: list, guards: dict) -> set:
+    """Returns the guard keys a selector refers to, including instances that have already disappeared."""
+    try:
+        keys = {_key(i) for i in select_instances(instances, selector)}
+    except ValueError:
+        keys = set()
+    tokens = [t.strip() for t in selector.split(",") if t.strip()]
+    for key, entry in guards.items():
+        ids = (str(entry["machine_id"]), str(entry["original_id"]))
+        if any(t == "all" or t in ids or fnmatch.fnmatchcase(key, t) for t in tokens):
+            keys.add(key)
+    return keys
+
+def _paused_by_user(machine_id, since: float) -> bool:
+    """Returns True if this client paused or destroyed the machine since a time, so it wasn't preempted."""
+    for entry in journal.read(since=since):
+        if entry.get("op") in ("pause", "destroy") and str(entry.get("id")) == str(machine_id):
+            return True
+    # Operations submitted with --no-wait are only in the ops ledger until they are reconciled
+    for op in ops.load():
+        if op["op"] in ("pause", "destroy") and str(op["id"]) == str(machine_id) and op["t"] >= since:
+            return True
+    return False
+
+def _recover(entry: dict, instance: Instance, on_demand: bool):
+    """Resumes a reclaimed instance, or recreates it with the same spec if it no longer exists."""
+    spec = entry["spec"]
+    if instance is not None and instance.status in ("Paused", "Stopped"):
+        return "resume", instance.resume(fs_id=spec["fs_id"], is_reserved=True if on_demand else None)
+    return "recreate", Instance.create(
+        instance_type="cpu" if spec["gpu_type"] == "CPU" else "gpu",
+        gpu_type=spec["gpu_type"],
+        num_gpus=spec["num_gpus"],
+        num_cpus=spec["num_cpus"],
+        template=spec["template"],
+        storage=spec["storage"],
+        name=spec["name"],
+        fs_id=spec["fs_id"],
+        is_reserved=on_demand,
+    )
+
+def _log_recovery(record: dict):
+    os.makedirs(os.path.dirname(RECOVERY_LOG), exist_ok=True)
+    with open(RECOVERY_LOG, 'a') as f:
+        f.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+def check(keys: set, guards: dict, instances: list, fallback_on_demand: bool = False, max_spot_attempts: int = 3):
+    """Runs one detection and recovery pass over the guarded instances."""
+    now = time.time()
+    by_id = {str(i.machine_id): i for i in instances}
+    for key in sorted(keys):
+        entry = guards[key]
+        instance = by_id.get(str(entry["machine_id"]))
+        status = instance.status if instance else "Missing"
+
+        if entry.get("incident") is None:
+            if status == "Running":
+                entry["last_running"] = now
+            elif entry.get("last_status") == "Running" and (status in PREEMPTED_STATUSES or status == "Missing"):
+                if _paused_by_user(entry["machine_id"], entry.get("last_running") or 0):
+                    console.print(f"[yellow]'{key}' was {status.lower()} from this machine, not preempted. Leaving it alone.[/]")
+                else:
+                    console.print(f"[bold red]⚠️  '{key}' ({entry['machine_id']}) was preempted: Running → {status}.[/]")
+                    entry["incident"] = {"detected": now, "attempts": 0, "next_attempt": now, "from_id": entry["machine_id"]}
+            entry["last_status"] = status
+
+        incident = entry.get("incident")
+        if incident is None or now < incident["next_attempt"]:
+            continue
+
+        incident["attempts"] += 1
+        on_demand = fallback_on_demand and incident["attempts"] > max_spot_attempts
+        mode = "on-demand" if on_demand else "spot"
+        console.print(f"🔁 [bold]Recovering '{key}' (attempt {incident['attempts']}, {mode})...[/]")
+        action, result = _recover(entry, instance, on_demand)
+        if isinstance(result, Instance) and result.status == "Running":
+            recovered = time.time()
+            downtime = recovered - (entry.get("last_running") or incident["detected"])
+            _log_recovery({"name": key, "from_id": incident["from_id"], "to_id": result.machine_id, "action": action,
+                           "mode": mode, "attempts": incident["attempts"], "detected": round(incident["detected"], 3),
+                           "recovered": round(recovered, 3), "downtime": round(downtime, 3)})
+            console.print(f"[bold green]✅ Recovered '{key}' by {action} as {mode} instance {result.machine_id} after {downtime:.0f}s of downtime.[/]")
+            entry.update(machine_id=result.machine_id, last_status="Running", last_running=recovered, incident=None)
+        else:
+            delay = min(BACKOFF_SECONDS * 2 ** (incident["attempts"] - 1), MAX_BACKOFF_SECONDS)
+            incident["next_attempt"] = time.time() + delay
+            error = result.get('error_message', 'Unknown error') if isinstance(result, dict) else f"status {result.status}"
+            console.print(f"[bold red]❌ Could not {action} '{key}': {error}. Retrying in {delay}s.[/]")
+
+def guard(selector: str, interval: int = 30, once: bool = False, fallback_on_demand: bool = False, max_spot_attempts: int = 3):
+    """Watches spot instances and resumes or recreates them when they are preempted."""
+    guards = load_guards()
+    skipped = set()
+    while True:
+        spinner = show_spinner("Checking guarded instances...")
+        next(spinner)
+        try:
+            instances = User.get_instances()
+        except Exception as e:
+            console.print(f"[bold red]Error fetching instances: {e}[/]")
+            instances = None
+        finally:
+            try:
+                next(spinner)
+            except StopIteration:
+                pass
+
+        if instances is not None:
+            keys = _guarded_keys(selector, instances, guards)
+            for instance in instances:
+                key = _key(instance)
+                if key not in keys or key in guards:
+                    continue
+                if instance.is_reserved:
+                    if key not in skipped:
+                        console.print(f"[yellow]Skipping '{key}': it is an on-demand instance and cannot be preempted.[/]")
+                        skipped.add(key)
+                    keys.discard(key)
+                    continue
+                guards[key] = {"machine_id": instance.machine_id, "original_id": instance.machine_id,
+                               "spec": _spec(instance), "last_status": instance.status,
+                               "last_running": time.time() if instance.status == "Running" else None, "incident": None}
+                console.print(f"🛡️ [bold]Guarding '{key}' ({instance.machine_id}, {instance.gpu_type}).[/]")
+            keys &= set(guards)
+            if not keys:
+                console.print(f"[bold red]Error: No spot instance matches '{selector}'.[/]")
+                return 1
+            check(keys, guards, instances, fallback_on_demand=fallback_on_demand, max_spot_attempts=max_spot_attempts)
+            save_guards(guards)
+
+        if once:
+            return 0
+        try:
+            time.sleep(interval)
+        except KeyboardInterrupt:
+            console.print("[bright_magenta]Guard stopped.[/]")
+            return 0
+
+def load_recoveries() -> list:
+    """Returns every logged recovery, oldest first."""
+    records = []
+    try:
+        with open(RECOVERY_LOG, 'r') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return records
+
+def report():
+    """Shows how often guarded instances were preempted and how long recovery took."""
+    records = load_recoveries()
+    if not records:
+        console.print("[yellow]No preemptions recovered yet. Start a guard with 'jarvis guard <selector>'.[/]")
+        return
+    display_recoveries_table(records)
@@ -0,0 +1,76 @@
+'''
+Named accounts and concurrent fan-out of read-only queries across them.
+
+Tokens are saved under a name in ~/.jarvislabs/accounts.json (readable only by you):
+
+    {"team-a": "<token>", "team-b": "<token>"}
+
+fan_out() runs one function per account on its own thread, each given a JarvisClient for that
+account, so N accounts take about as long as the slowest one. The clients share one connection pool.
+An account that fails is reported with its error and never stops the others.
+'''
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from . import jarvisclient
+
+ACCOUNTS_FILE = os.path.expanduser("~/.jarvislabs/accounts.json")
+
+def load() -> dict:
+    try:
+        with open(ACCOUNTS_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save(accounts: dict):
+    os.makedirs(os.path.dirname(ACCOUNTS_FILE), exist_ok=True)
+    tmp_file = ACCOUNTS_FILE + ".tmp"
+    # Created with owner-only permissions, since the file holds API tokens
+    fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        json.dump(accounts, f, indent=2)
+    os.replace(tmp_file, ACCOUNTS_FILE)
+
+def add(name: str, token: str):
+    """Saves a token under an account name, replacing any token saved under it before."""
+    if not name or "," in name or name == "all":
+        raise ValueError(f"Invalid account name '{name}'. Names can't contain commas or be 'all'.")
+    accounts = load()
+    accounts[name] = token
+    _save(accounts)
+
+def remove(name: str) -> bool:
+    """Forgets an account. Returns False if there was none by that name."""
+    accounts = load()
+    if accounts.pop(name, None) is None:
+        return False
+    _save(accounts)
+    return True
+
+def select(spec: str) -> list:
+    """Returns [(name, token)] for a comma-separated list of account names, or every account for 'all'."""
+    accounts = load()
+    names = list(accounts) if spec.strip() == "all" else list(dict.fromkeys(n.strip() for n in spec.split(",") if n.strip()))
+    unknown = [n for n in names if n not in accounts]
+    if unknown:
+        raise ValueError(f"Unknown account(s): {', '.join(unknown)}. Save them with 'jarvis account add <name>'.")
+    if not names:
+        raise ValueError("No accounts saved yet. Save one with 'jarvis account add <name>'.")
+    return [(name, accounts[name]) for name in names]
+
+def fan_out(selected: list, func, parallel: int = 16) -> list:
+    """
+    Calls func(client) once per account, concurrently, with a JarvisClient acting for that account.
+    Returns [(name, result, error)] in the order the accounts were given; error is None on success.
+    """
+    def run(account):
+        name, token = account
+        try:
+            return name, func(jarvisclient.JarvisClient(token)), None
+        except Exception as e:
+            return name, None, e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(parallel, len(selected)))) as executor:
+        return list(executor.map(run, selected))
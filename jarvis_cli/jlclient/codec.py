@@ -0,0 +1,48 @@
+'''
+JSON codec used for every request and response body.
+
+orjson is used when it is installed (`pip install jarvis-cli[fast]`) and the standard library
+otherwise. Set JARVIS_JSON_CODEC=stdlib to force the fallback.
+
+Both codecs decode straight from the bytes urllib3 hands back, so response bodies are never
+copied into an intermediate str first.
+'''
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _stdlib_loads(data):
+    return json.loads(data)
+
+def _stdlib_dumps(obj) -> bytes:
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+def _orjson_loads(data):
+    return orjson.loads(data)
+
+def _orjson_dumps(obj) -> bytes:
+    return orjson.dumps(obj)
+
+def select(name: str = None):
+    """Selects the codec: 'orjson', 'stdlib' or 'auto' (the fastest one installed). Returns the name in use."""
+    global loads, dumps, name_in_use
+    name = (name or os.environ.get("JARVIS_JSON_CODEC") or "auto").lower()
+    if name not in ("auto", "orjson", "stdlib"):
+        raise ValueError(f"Unknown JSON codec '{name}'. Use auto, orjson or stdlib.")
+    if name == "orjson" and orjson is None:
+        raise ValueError("The orjson codec was requested but orjson is not installed.")
+    if name != "stdlib" and orjson is not None:
+        loads, dumps, name_in_use = _orjson_loads, _orjson_dumps, "orjson"
+    else:
+        loads, dumps, name_in_use = _stdlib_loads, _stdlib_dumps, "stdlib"
+    return name_in_use
+
+loads = dumps = name_in_use = None
+try:
+    select()
+except ValueError:
+    select("auto")
@@ -0,0 +1,64 @@
+import os
+
+# Plain-text files, one value per line, read directly by the generated shell completion scripts
+COMPLETION_DIR = os.path.expanduser("~/.jarvislabs/complete")
+
+# GPU types offered before any instance of that type has been seen
+KNOWN_GPU_TYPES = ["RTX5000", "RTX6000Ada", "A5000", "A6000", "A100", "A100-80GB", "H100", "L4", "V100", "CPU"]
+
+def _path(kind, directory=None):
+    return os.path.join(directory or COMPLETION_DIR, kind)
+
+def read(kind, directory=None):
+    """Returns the values currently indexed for a kind."""
+    try:
+        with open(_path(kind, directory), 'r') as f:
+            return [line.rstrip("\n") for line in f if line.strip()]
+    except OSError:
+        return []
+
+def update(kind, values, merge=False, directory=None):
+    """Replaces (or with merge, extends) the values indexed for a kind in a directory (COMPLETION_DIR by default). Never raises."""
+    try:
+        values = [str(v) for v in values if v is not None and str(v).strip() and "\n" not in str(v)]
+        current = read(kind, directory)
+        if merge:
+            values = current + [v for v in values if v not in current]
+        values = list(dict.fromkeys(values))
+        if values == current:
+            return
+        os.makedirs(directory or COMPLETION_DIR, exist_ok=True)
+        tmp_file = _path(kind, directory) + ".tmp"
+        with open(tmp_file, 'w') as f:
+            f.write("".join(v + "\n" for v in values))
+        os.replace(tmp_file, _path(kind, directory))
+    except Exception:
+        # The index is a best-effort cache and must never break a real command
+        pass
+
+def index_instances(instances, directory=None):
+    """Indexes machine IDs, whitespace-free names and GPU types from a list of Instance objects."""
+    machines = []
+    for instance in instances:
+        machines.append(instance.machine_id)
+        if instance.name and not any(c.isspace() for c in instance.name):
+            machines.append(instance.name)
+    update("machines", machines, directory=directory)
+    update("gpu_types", KNOWN_GPU_TYPES + [i.gpu_type for i in instances], merge=True, directory=directory)
+
+def index_templates(templates, directory=None):
+    """Indexes template IDs from a users templates response."""
+    if isinstance(templates, list):
+        update("templates", [t.get('id') for t in templates if isinstance(t, dict)], directory=directory)
+
+def index_filesystems(filesystems, directory=None):
+    """Indexes filesystem IDs from an fs list response."""
+    if isinstance(filesystems, list):
+        update("fs_ids", [fs.get('id') for fs in filesystems if isinstance(fs, dict)], directory=directory)
+
+def index_scripts(scripts, directory=None):
+    """Indexes script IDs from a users/scripts response."""
+    if isinstance(scripts, dict):
+        scripts = scripts.get('scripts', [])
+    if isinstance(scripts, list):
+        update("script_ids", [s.get('script_id', s.get('id')) for s in scripts if isinstance(s, dict)], directory=directory)
@@ -0,0 +1,181 @@
+'''
+Backend endpoint selection and connection pool settings.
+
+The endpoint comes from the first of these that is set:
+
+    1. the --endpoint option
+    2. the JARVIS_ENDPOINT environment variable
+    3. "endpoint" in ~/.jarvislabs/config.json
+    4. the production backend
+
+A value is either one URL, "auto", or a comma-separated list of URLs. "auto" picks the fastest of
+the "candidates" listed in the config file (plus the production backend). A list picks the fastest
+of the URLs in it. The winner is cached in ~/.jarvislabs/endpoint.json for CACHE_TTL seconds, so
+latency is only probed about once an hour.
+
+Pool settings come from "pool" in the config file and JARVIS_POOL_* environment variables:
+
+    {"endpoint": "auto", "candidates": ["https://mirror.example/"], "pool": {"maxsize": 32, "block": false}}
+'''
+import json
+import os
+import socket
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import certifi
+import urllib3
+
+DEFAULT_URL = "https://backendprod.jarvislabs.net/"
+CONFIG_FILE = os.path.expanduser("~/.jarvislabs/config.json")
+CACHE_FILE = os.path.expanduser("~/.jarvislabs/endpoint.json")
+CACHE_TTL = 3600
+PROBE_SAMPLES = 3
+PROBE_TIMEOUT = 3.0
+
+# Sized for the thread pools used by bulk commands; urllib3's own default keeps a single connection per host
+DEFAULT_POOL = {"num_pools": 10, "maxsize": 16, "block": False, "keepalive": 60}
+
+def load_config() -> dict:
+    try:
+        with open(CONFIG_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _normalise(url: str) -> str:
+    url = url.strip()
+    return url if url.endswith("/") else url + "/"
+
+def candidates(value: str, config: dict) -> list:
+    """Returns the endpoints a value selects between: one URL, or several for 'auto' and lists."""
+    if value == "auto":
+        urls = list(config.get("candidates") or []) + [DEFAULT_URL]
+    else:
+        urls = value.split(",")
+    return list(dict.fromkeys(_normalise(u) for u in urls if u.strip()))
+
+def setting(flag: str = None, config: dict = None) -> tuple:
+    """Returns (value, source) of the endpoint setting by precedence."""
+    config = load_config() if config is None else config
+    if flag:
+        return flag, "--endpoint"
+    if os.environ.get("JARVIS_ENDPOINT"):
+        return os.environ["JARVIS_ENDPOINT"], "JARVIS_ENDPOINT"
+    if config.get("endpoint"):
+        return config["endpoint"], CONFIG_FILE
+    return DEFAULT_URL, "default"
+
+def _load_cache() -> dict:
+    try:
+        with open(CACHE_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_cache(cache: dict):
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        tmp_file = CACHE_FILE + ".tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(cache, f)
+        os.replace(tmp_file, CACHE_FILE)
+    except OSError:
+        pass
+
+def measure(url: str, samples: int = PROBE_SAMPLES, timeout: float = PROBE_TIMEOUT) -> float:
+    """Returns the median time in seconds of a HEAD request to an endpoint over one warm connection, or None if unreachable."""
+    pool = urllib3.PoolManager(cert_reqs="CERT_REQUIRED", ca_certs=certifi.where(), retries=False, maxsize=1)
+    timings = []
+    try:
+        # The first request pays for DNS, TCP and TLS, which every later request on a kept-alive connection avoids
+        pool.request("HEAD", url, timeout=timeout, redirect=False)
+        for _ in range(samples):
+            started = time.perf_counter()
+            pool.request("HEAD", url, timeout=timeout, redirect=False)
+            timings.append(time.perf_counter() - started)
+    except urllib3.exceptions.HTTPError:
+        return None
+    finally:
+        pool.clear()
+    return statistics.median(timings)
+
+def probe(urls: list) -> dict:
+    """Measures every endpoint concurrently and returns {url: seconds or None}."""
+    with ThreadPoolExecutor(max_workers=max(1, len(urls))) as executor:
+        return dict(zip(urls, executor.map(measure, urls)))
+
+def _cache_key(urls: list) -> str:
+    return ",".join(sorted(urls))
+
+def fastest(urls: list, refresh: bool = False) -> tuple:
+    """Returns (url, latencies) for the fastest reachable endpoint, using the cached choice while it is fresh."""
+    key = _cache_key(urls)
+    cache = _load_cache()
+    entry = cache.get(key)
+    if entry and not refresh and time.time() - entry["t"] < CACHE_TTL:
+        return entry["url"], entry["latencies"]
+    latencies = probe(urls)
+    reachable = {u: s for u, s in latencies.items() if s is not None}
+    url = min(reachable, key=reachable.get) if reachable else urls[0]
+    cache[key] = {"url": url, "latencies": latencies, "t": time.time()}
+    _save_cache(cache)
+    return url, latencies
+
+def resolve(flag: str = None, probe_latency: bool = True) -> tuple:
+    """
+    Returns (url, source) of the endpoint to use. When several candidates are configured and probe_latency is
+    False, the cached choice is used if there is one, and the first candidate otherwise.
+    """
+    config = load_config()
+    value, source = setting(flag, config)
+    urls = candidates(value, config)
+    if len(urls) == 1:
+        return urls[0], source
+    if probe_latency:
+        return fastest(urls)[0], f"fastest of {len(urls)} ({source})"
+    entry = _load_cache().get(_cache_key(urls))
+    if entry:
+        return entry["url"], f"cached choice of {len(urls)} ({source})"
+    return urls[0], f"first of {len(urls)}, not probed yet ({source})"
+
+def needs_probe(flag: str = None) -> bool:
+    """Returns True if the endpoint setting selects between several candidates and the cached choice is stale."""
+    config = load_config()
+    urls = candidates(setting(flag, config)[0], config)
+    entry = _load_cache().get(_cache_key(urls))
+    return len(urls) > 1 and (not entry or time.time() - entry["t"] >= CACHE_TTL)
+
+def _env_bool(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+def pool_settings() -> dict:
+    """Returns pool settings: the defaults, overridden by the config file, overridden by the environment."""
+    settings = dict(DEFAULT_POOL)
+    settings.update({k: v for k, v in (load_config().get("pool") or {}).items() if k in DEFAULT_POOL})
+    for key, cast in (("num_pools", int), ("maxsize", int), ("block", _env_bool), ("keepalive", int)):
+        value = os.environ.get(f"JARVIS_POOL_{key.upper()}")
+        if value:
+            try:
+                settings[key] = cast(value)
+            except ValueError:
+                pass
+    return settings
+
+def make_pool(settings: dict = None) -> urllib3.PoolManager:
+    """Builds the shared PoolManager. keepalive enables TCP keep-alive probes after that many idle seconds (0 disables)."""
+    settings = settings or pool_settings()
+    socket_options = list(urllib3.connection.HTTPConnection.default_socket_options)
+    if settings["keepalive"]:
+        socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            socket_options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, int(settings["keepalive"])))
+    return urllib3.PoolManager(
+        num_pools=settings["num_pools"],
+        maxsize=settings["maxsize"],
+        block=settings["block"],
+        socket_options=socket_options,
+        cert_reqs="CERT_REQUIRED",
+        ca_certs=certifi.where(),
+    )
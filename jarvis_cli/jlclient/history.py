@@ -0,0 +1,259 @@
+'''
+Opt-in local history of instance state transitions, for uptime and chargeback.
+
+Only changes are stored, never full snapshots. Every users/fetch response is compared with the
+last known state and a fixed-width record is appended for each machine whose status, GPU type or
+GPU count changed (or which disappeared):
+
+    transitions.bin   <uint32 time><uint64 machine_id><uint16 status><uint16 gpu_type><uint8 gpus><uint8 kind>
+    index.json        interned strings, last known state and the checkpoint time index
+
+Every CHECKPOINT_EVERY transitions a checkpoint block (the full state at that moment) is appended
+and its record offset is added to the time index. A query for time T seeks to the last checkpoint
+before T and replays only from there. Compaction drops everything before the checkpoint that
+precedes the retention cutoff.
+'''
+import bisect
+import json
+import os
+import struct
+import time
+
+HISTORY_DIR = os.path.expanduser("~/.jarvislabs/history")
+DATA_FILE = os.path.join(HISTORY_DIR, "transitions.bin")
+INDEX_FILE = os.path.join(HISTORY_DIR, "index.json")
+LOCK_FILE = os.path.join(HISTORY_DIR, "history.lock")
+
+RECORD = struct.Struct("<IQHHBB")
+KIND_TRANSITION = 0
+KIND_CHECKPOINT = 1
+# Status recorded when a machine no longer appears in users/fetch
+GONE = "Gone"
+
+CHECKPOINT_EVERY = 4096
+COMPACT_BYTES = 16 * 1024 * 1024
+RETENTION_DAYS = 400
+
+def _load_index() -> dict:
+    try:
+        with open(INDEX_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"enabled": False, "strings": [], "last": {}, "checkpoints": [], "since_checkpoint": 0}
+
+def _save_index(index: dict):
+    os.makedirs(HISTORY_DIR, exist_ok=True)
+    tmp_file = INDEX_FILE + ".tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(index, f, separators=(",", ":"))
+    os.replace(tmp_file, INDEX_FILE)
+
+class _Lock(object):
+    """An exclusive lock file shared by every jarvis process recording history."""
+
+    def __init__(self, timeout=2.0):
+        self.timeout = timeout
+        self.acquired = False
+
+    def __enter__(self):
+        os.makedirs(HISTORY_DIR, exist_ok=True)
+        deadline = time.time() + self.timeout
+        while True:
+            try:
+                os.close(os.open(LOCK_FILE, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                self.acquired = True
+                return self
+            except FileExistsError:
+                try:
+                    # A lock older than a minute was left behind by a killed process
+                    if time.time() - os.path.getmtime(LOCK_FILE) > 60:
+                        os.remove(LOCK_FILE)
+                        continue
+                except OSError:
+                    continue
+                if time.time() > deadline:
+                    return self
+                time.sleep(0.05)
+
+    def __exit__(self, *exc):
+        if self.acquired:
+            try:
+                os.remove(LOCK_FILE)
+            except OSError:
+                pass
+        return False
+
+def is_enabled() -> bool:
+    return bool(_load_index().get("enabled"))
+
+def last_state() -> dict:
+    """Returns {machine_id: [status, gpu_type, gpus]} as of the last recorded users/fetch."""
+    return _load_index()["last"]
+
+def set_enabled(enabled: bool):
+    """Turns history recording on or off. Recorded data is kept either way."""
+    with _Lock():
+        index = _load_index()
+        index["enabled"] = enabled
+        _save_index(index)
+
+def _code(index: dict, value) -> int:
+    strings = index["strings"]
+    value = str(value) if value is not None else ""
+    try:
+        return strings.index(value)
+    except ValueError:
+        strings.append(value)
+        return len(strings) - 1
+
+def _state(instance) -> list:
+    return [instance.status or "Unknown", instance.gpu_type or "Unknown", int(instance.num_gpus or 0)]
+
+def _pack(index, t, machine_id, state, kind) -> bytes:
+    return RECORD.pack(int(t), int(machine_id), _code(index, state[0]), _code(index, state[1]), min(state[2], 255), kind)
+
+def _record_count() -> int:
+    try:
+        return os.path.getsize(DATA_FILE) // RECORD.size
+    except OSError:
+        return 0
+
+def record(instances, now: float = None):
+    """Appends a transition for every machine whose state changed since the last call. Never raises."""
+    try:
+        if not is_enabled():
+            return
+        now = now or time.time()
+        with _Lock() as lock:
+            if not lock.acquired:
+                return
+            index = _load_index()
+            last = index["last"]
+            current = {str(i.machine_id): _state(i) for i in instances if i.machine_id is not None}
+            rows = []
+            for machine_id, state in current.items():
+                if last.get(machine_id) != state:
+                    rows.append(_pack(index, now, machine_id, state, KIND_TRANSITION))
+            for machine_id, state in last.items():
+                if machine_id not in current:
+                    rows.append(_pack(index, now, machine_id, [GONE, state[1], state[2]], KIND_TRANSITION))
+            if not rows:
+                return
+            index["last"] = current
+            index["since_checkpoint"] += len(rows)
+            if index["since_checkpoint"] >= CHECKPOINT_EVERY or not index["checkpoints"]:
+                # The checkpoint goes after this batch's transitions and reflects the state they produce
+                offset = _record_count() + len(rows)
+                rows += [_pack(index, now, m, s, KIND_CHECKPOINT) for m, s in current.items()]
+                index["checkpoints"].append([int(now), offset])
+                index["since_checkpoint"] = 0
+            with open(DATA_FILE, 'ab') as f:
+                f.write(b"".join(rows))
+            _save_index(index)
+            if os.path.getsize(DATA_FILE) > COMPACT_BYTES:
+                _compact(index, now - RETENTION_DAYS * 86400)
+    except Exception:
+        # History is a best-effort side effect and must never break a real command
+        pass
+
+def _rows(index: dict, start: int = 0):
+    """Yields (time, machine_id, status, gpu_type, gpus, kind) from a record offset onwards."""
+    strings = index["strings"]
+    try:
+        with open(DATA_FILE, 'rb') as f:
+            f.seek(start * RECORD.size)
+            data = f.read()
+    except OSError:
+        return
+    data = data[:len(data) - len(data) % RECORD.size]
+    for t, machine_id, status, gpu_type, gpus, kind in RECORD.iter_unpack(data):
+        yield t, machine_id, strings[status], strings[gpu_type], gpus, kind
+
+def _checkpoint_before(index: dict, t: float) -> int:
+    """Returns the record offset of the last checkpoint at or before t (0 if there is none)."""
+    checkpoints = index["checkpoints"]
+    position = bisect.bisect_right([c[0] for c in checkpoints], t) - 1
+    return checkpoints[position][1] if position >= 0 else 0
+
+def state_at(t: float) -> dict:
+    """Returns {machine_id: (status, gpu_type, gpus)} as last observed at or before t."""
+    index = _load_index()
+    state = {}
+    for row_t, machine_id, status, gpu_type, gpus, _ in _rows(index, _checkpoint_before(index, t)):
+        if row_t > t:
+            break
+        if status == GONE:
+            state.pop(machine_id, None)
+        else:
+            state[machine_id] = (status, gpu_type, gpus)
+    return state
+
+def machine_history(machine_id, since: float = None) -> list:
+    """Returns [(time, status, gpu_type, gpus)] transitions of one machine."""
+    index = _load_index()
+    start = _checkpoint_before(index, since) if since else 0
+    return [(t, status, gpu_type, gpus) for t, mid, status, gpu_type, gpus, kind in _rows(index, start)
+            if kind == KIND_TRANSITION and mid == int(machine_id) and (since is None or t >= since)]
+
+def _day(t: float) -> str:
+    return time.strftime("%Y-%m-%d", time.localtime(t))
+
+def _next_midnight(t: float) -> float:
+    lt = time.localtime(t)
+    return time.mktime((lt.tm_year, lt.tm_mon, lt.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+
+def running_hours(start: float, end: float) -> dict:
+    """Returns {(day, gpu_type): [instance-hours, gpu-hours]} of Running time between start and end."""
+    index = _load_index()
+    totals = {}
+    state = {}
+
+    def accumulate(t0, t1):
+        for status, gpu_type, gpus in state.values():
+            if status != "Running":
+                continue
+            a = max(t0, start)
+            while a < min(t1, end):
+                b = min(t1, end, _next_midnight(a))
+                hours = (b - a) / 3600
+                entry = totals.setdefault((_day(a), gpu_type), [0.0, 0.0])
+                entry[0] += hours
+                entry[1] += hours * gpus
+                a = b
+
+    previous = None
+    for t, machine_id, status, gpu_type, gpus, _ in _rows(index, _checkpoint_before(index, start)):
+        if t > end:
+            break
+        if previous is not None and t > previous:
+            accumulate(previous, t)
+        previous = t
+        if status == GONE:
+            state.pop(machine_id, None)
+        else:
+            state[machine_id] = (status, gpu_type, gpus)
+    if previous is not None:
+        # The last observed state is assumed to hold until now
+        accumulate(previous, min(end, time.time()))
+    return totals
+
+def compact(keep_days: float = RETENTION_DAYS) -> int:
+    """Drops history older than keep_days and returns the number of records removed."""
+    with _Lock():
+        index = _load_index()
+        return _compact(index, time.time() - keep_days * 86400)
+
+def _compact(index: dict, cutoff: float) -> int:
+    offset = _checkpoint_before(index, cutoff)
+    if offset == 0:
+        return 0
+    with open(DATA_FILE, 'rb') as f:
+        f.seek(offset * RECORD.size)
+        data = f.read()
+    tmp_file = DATA_FILE + ".tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_file, DATA_FILE)
+    index["checkpoints"] = [[t, o - offset] for t, o in index["checkpoints"] if o >= offset]
+    _save_index(index)
+    return offset
@@ -1,49 +1,300 @@
 import requests
 import urllib3
-import certifi
+import hashlib
 import json
+import os
+import sys
+import time
+import types
 import urllib.parse
-url = "https://backendprod.jarvislabs.net/"
+import uuid
+from . import metrics
+from . import codec
+from . import ratelimit
+from . import endpoint
+# Size of the blocks read from file handles while streaming uploads
+UPLOAD_CHUNK_SIZE = 256 * 1024
+# Times a request answered with 429 is retried after the rate limiter has backed off
+THROTTLE_RETRIES = 3
 
-http = urllib3.PoolManager(
-    cert_reqs="CERT_REQUIRED",
-    ca_certs=certifi.where()
-)
+class Transport(object):
+    """
+    A backend endpoint and the connection pool used to reach it. A transport holds no credentials
+    and is safe to share between threads and between clients of different accounts.
+    Rate limits (ratelimit.py) and metrics are process-wide, whichever transport a request uses.
+    """
 
-def post(data, func, token, query_params=None, no_template = None):
-    encoded_body = json.dumps(data)
+    def __init__(self, endpoint_url=None, probe_latency=False, **pool):
+        self.url, self.url_source = endpoint.resolve(endpoint_url, probe_latency=probe_latency)
+        self.http = endpoint.make_pool(dict(endpoint.pool_settings(), **pool) if pool else None)
+
+    def configure(self, endpoint_url=None, probe_latency=True, **pool):
+        """Selects the backend endpoint (see endpoint.py) and rebuilds the pool if pool settings are given."""
+        self.url, self.url_source = endpoint.resolve(endpoint_url, probe_latency=probe_latency)
+        if pool:
+            self.http = endpoint.make_pool(dict(endpoint.pool_settings(), **pool))
+        return self.url
+
+    def request(self, method, full_url, func, **kwargs):
+        """
+        Sends a request through the pool and records its latency and response code.
+        Every attempt first waits for the rate limiter. 429 responses slow the limiter down and are retried,
+        unless the body is a stream that has already been consumed.
+        """
+        label = metrics.endpoint_label(func)
+        bucket = ratelimit.budget_for(method)
+        replayable = isinstance(kwargs.get('body'), (bytes, str, type(None)))
+        for attempt in range(THROTTLE_RETRIES + 1):
+            bucket.acquire()
+            started = time.perf_counter()
+            try:
+                r = self.http.request(method, full_url, **kwargs)
+            except Exception:
+                metrics.requests_total.inc(method=method, endpoint=label, code="error")
+                raise
+            finally:
+                metrics.request_duration.observe(time.perf_counter() - started, method=method, endpoint=label)
+            metrics.requests_total.inc(method=method, endpoint=label, code=r.status)
+            if r.status != 429:
+                bucket.succeeded()
+                return r
+            bucket.throttled(ratelimit.retry_after(r))
+            if not replayable:
+                return r
+        return r
+
+    def post(self, data, func, token, query_params=None, no_template = None):
+        encoded_body = codec.dumps(data)
+        try:
+            full_url = self.url + func
+            if query_params:
+                    full_url += "?" + urllib.parse.urlencode(query_params)
+            r = self.request('POST', full_url, func,
+                             headers = {
+                                        'Authorization': f'Bearer {token}',
+                                        'Content-Type': 'application/json'
+                                       },
+                             body=encoded_body,
+                             # fields={'files': files}
+                             #   timeout=10
+                             )
+        except requests.exceptions.Timeout as e:
+            print(e)
+        return _decode(r, func)
+
+    def get(self, func, token, data=None):
+        try:
+            full_url = self.url+func
+            r = self.request('GET', full_url, func,
+                             headers = {
+                                        'Authorization': f'Bearer {token}',
+                                        'Content-Type': 'application/json'
+                                       },
+                             # fields={'files': files}
+                             #   timeout=10
+                             )
+        except requests.exceptions.Timeout as e:
+            print(e)
+        return _decode(r, func)
+
+    def dedup_key(self, files, token=None):
+        """Returns the upload index key of `files` sent to this endpoint with this token."""
+        token_hash = hashlib.sha256((token or "").encode()).hexdigest()[:16]
+        return f"{self.url}|{token_hash}|{content_hash(files)}"
+
+    def post_files(self, files, func, token=None, fields=None, progress=None, retries=3, dedup_index=None, force=False,
+                   dedup_accept=None):
+        """
+        Streams a multipart upload of `files` to `func`.
+        Failed attempts (connection errors, 429 and 5xx responses) are retried from the start of each file with backoff.
+        `progress(sent, total)` is called after every chunk. When `dedup_index` names a local JSON file, content that
+        was uploaded before to the same endpoint with the same token is not sent again and the stored response text is
+        returned instead; `force` uploads anyway and refreshes the stored response. A response is only stored if it is
+        a 2xx and `dedup_accept(text)`, when given, is true.
+        """
+        key = None
+        if dedup_index:
+            key = self.dedup_key(files, token)
+            index = _load_index(dedup_index)
+            if key in index and not force:
+                return index[key]
+
+        body = MultipartStream(files, fields=fields, progress=progress)
+        headers = {
+            'Content-Type': body.content_type,
+            'Content-Length': str(body.length),
+        }
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+
+        for attempt in range(retries + 1):
+            body.rewind()
+            throttled = False
+            try:
+                r = self.request('POST', self.url + func, func, headers=headers, body=body, retries=False)
+                if r.status != 429 and r.status < 500:
+                    break
+                throttled = r.status == 429
+            except urllib3.exceptions.HTTPError:
+                if attempt == retries:
+                    raise
+            # After a 429 the rate limiter already holds the next attempt back for Retry-After
+            if attempt < retries and not throttled:
+                time.sleep(min(2 ** attempt, 30))
+
+        text = r.data.decode('utf-8', errors='replace')
+        if key is not None and 200 <= r.status < 300 and (dedup_accept is None or dedup_accept(text)):
+            index = _load_index(dedup_index)
+            index[key] = text
+            _save_index(dedup_index, index)
+        return text
+
+def _decode(r, func):
+    """Decodes a JSON response body straight from the response bytes and records how long decoding took."""
+    started = time.perf_counter()
     try:
-        full_url = url + func
-        if query_params:
-                full_url += "?" + urllib.parse.urlencode(query_params)
-        r = http.request('POST', full_url,
-                         headers = {
-                                    'Authorization': f'Bearer {token}',
-                                    'Content-Type': 'application/json'
-                                   },
-                         body=encoded_body,
-                         # fields={'files': files}
-                         #   timeout=10
-                         )
-    except requests.exceptions.Timeout as e:
-        print(e)
-    return json.loads(r.data)
+        return codec.loads(r.data)
+    finally:
+        metrics.decode_duration.observe(time.perf_counter() - started, endpoint=metrics.endpoint_label(func))
+
+def configure(endpoint_url=None, probe_latency=True, **pool):
+    """Configures the default transport, which the module-level functions and the default client use."""
+    return default.configure(endpoint_url, probe_latency=probe_latency, **pool)
+
+def post(data, func, token, query_params=None, no_template = None):
+    return default.post(data, func, token, query_params=query_params, no_template=no_template)
 
 def get(func, token, data=None):
+    return default.get(func, token, data=data)
+
+class MultipartStream(object):
+    """
+    A multipart/form-data request body that reads file parts in fixed-size chunks.
+    Files are never loaded into memory as a whole, so memory use stays flat regardless of their size.
+    `files` takes the same shapes as requests: {field: fileobj} or {field: (filename, fileobj[, content_type])}.
+    """
+
+    def __init__(self, files, fields=None, chunk_size=UPLOAD_CHUNK_SIZE, progress=None):
+        self.boundary = uuid.uuid4().hex
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.parts = []
+        for name, value in (fields or {}).items():
+            self.parts.append(self._header(name) + b"\r\n" + str(value).encode() + b"\r\n")
+        for name, value in files.items():
+            if not isinstance(value, (tuple, list)):
+                value = (os.path.basename(getattr(value, 'name', name)), value)
+            filename, fileobj = value[0], value[1]
+            content_type = value[2] if len(value) > 2 else 'application/octet-stream'
+            self.parts.append(self._header(name, filename, content_type) + b"\r\n")
+            self.parts.append((fileobj, fileobj.tell()))
+            self.parts.append(b"\r\n")
+        self.parts.append(f"--{self.boundary}--\r\n".encode())
+        self.length = sum(len(p) if isinstance(p, bytes) else self._remaining(*p) for p in self.parts)
+        self.rewind()
+
+    def _header(self, name, filename=None, content_type=None):
+        disposition = f'form-data; name="{name}"'
+        if filename is not None:
+            disposition += f'; filename="{filename}"'
+        header = f"--{self.boundary}\r\nContent-Disposition: {disposition}\r\n"
+        if content_type:
+            header += f"Content-Type: {content_type}\r\n"
+        return header.encode()
+
+    @staticmethod
+    def _remaining(fileobj, start):
+        end = fileobj.seek(0, os.SEEK_END)
+        fileobj.seek(start)
+        return end - start
+
+    @property
+    def content_type(self):
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def rewind(self):
+        """Resets the stream to the beginning so a failed upload can be retried."""
+        for part in self.parts:
+            if not isinstance(part, bytes):
+                part[0].seek(part[1])
+        self.index = 0
+        self.offset = 0
+        self.sent = 0
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.chunk_size
+        size = min(size, self.chunk_size)
+        while self.index < len(self.parts):
+            part = self.parts[self.index]
+            if isinstance(part, bytes):
+                data = part[self.offset:self.offset + size]
+                self.offset += len(data)
+            else:
+                data = part[0].read(size)
+            if data:
+                self.sent += len(data)
+                if self.progress is not None:
+                    self.progress(self.sent, self.length)
+                return data
+            self.index += 1
+            self.offset = 0
+        return b""
+
+def content_hash(files):
+    """Returns the SHA-256 of the contents of all files, read in chunks and rewound afterwards."""
+    digest = hashlib.sha256()
+    for name, value in sorted(files.items()):
+        fileobj = value[1] if isinstance(value, (tuple, list)) else value
+        start = fileobj.tell()
+        for chunk in iter(lambda: fileobj.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+        fileobj.seek(start)
+        digest.update(name.encode() + b"\0")
+    return digest.hexdigest()
+
+def _load_index(index_file):
+    try:
+        with open(index_file, 'r') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def _save_index(index_file, index):
     try:
-        full_url = url+func
-        r = http.request('GET', full_url,
-                         headers = {
-                                    'Authorization': f'Bearer {token}',
-                                    'Content-Type': 'application/json'
-                                   },
-                         # fields={'files': files}
-                         #   timeout=10
-                         )
-    except requests.exceptions.Timeout as e:
-        print(e)
-    return json.loads(r.data)
-
-def post_files(files, func):
-    r = requests.post(url+func, files=files)
-    return r.text 
\ No newline at end of file
+        tmp_file = index_file + ".tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_file, index_file)
+    except Exception:
+        pass
+
+def post_files(files, func, token=None, fields=None, progress=None, retries=3, dedup_index=None, force=False,
+               dedup_accept=None):
+    """Uploads through the default transport; see Transport.post_files."""
+    return default.post_files(files, func, token=token, fields=fields, progress=progress, retries=retries,
+                              dedup_index=dedup_index, force=force, dedup_accept=dedup_accept)
+
+# Resolved without probing at import; the CLI calls configure() once it knows --endpoint
+default = Transport()
+
+class _Module(types.ModuleType):
+    """Keeps url and http, the module globals from before Transport, as aliases of the default transport."""
+
+    @property
+    def url(self):
+        return default.url
+
+    @url.setter
+    def url(self, value):
+        default.url = value
+
+    @property
+    def http(self):
+        return default.http
+
+    @http.setter
+    def http(self, value):
+        default.http = value
+
+sys.modules[__name__].__class__ = _Module
@@ -1,57 +1,95 @@
-from .httpclient import post, get
+from . import httpclient
+from . import completion_index
+from . import journal
+from . import ops
+from . import history
+from . import probes
+from . import readiness
+from .resolve import NameIndex
+import threading
 import time
 import os
 import json
+import sys
+import types
+import urllib.parse
 
+# Token of the default client behind the module-level API, set by the CLI
 token = None
+# Seconds to wait for a created or resumed machine to be Running when there is no slower history
+PROVISION_TIMEOUT = 50
 # Path for storing instance name mappings
 INSTANCE_NAMES_FILE = os.path.expanduser("~/.jarvislabs/instance_names.json")
+# Path for the index mapping script content hashes to the backend's upload response
+SCRIPT_INDEX_FILE = os.path.expanduser("~/.jarvislabs/script_index.json")
 
 # Ensure directory exists
 os.makedirs(os.path.dirname(INSTANCE_NAMES_FILE), exist_ok=True)
 
-# Dictionary to store instance ID -> custom name mappings
-instance_names = {}
+class NameStore(object):
+    """Custom instance names (machine ID -> name) kept in a JSON file and cached in memory. Safe to share between threads."""
+
+    def __init__(self, path=INSTANCE_NAMES_FILE):
+        self.path = path
+        self.names = {}
+        self._lock = threading.Lock()
+
+    def _read(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except Exception:
+            # If loading fails, start with empty dict
+            return {}
+
+    def load(self) -> dict:
+        """Reloads the names from the file and returns them."""
+        with self._lock:
+            self.names = self._read()
+            return dict(self.names)
+
+    def get(self, machine_id):
+        """Returns the custom name of an instance, or None."""
+        if not self.names:
+            self.load()
+        return self.names.get(str(machine_id))
+
+    def save(self, machine_id, name):
+        """Saves a custom name, merged into the names other processes may have saved since the last load."""
+        if not machine_id:
+            return
+        with self._lock:
+            names = self._read()
+            names[str(machine_id)] = name
+            self.names = names
+            try:
+                tmp_file = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_file, 'w') as f:
+                    json.dump(names, f)
+                os.replace(tmp_file, self.path)
+            except Exception:
+                # If saving fails, continue without error
+                pass
+
+# Shared by every client, so names saved through one are seen by all of them
+name_store = NameStore()
 
 def load_instance_names():
     """Load saved instance names from file."""
-    global instance_names
-    try:
-        if os.path.exists(INSTANCE_NAMES_FILE):
-            with open(INSTANCE_NAMES_FILE, 'r') as f:
-                instance_names = json.load(f)
-    except Exception:
-        # If loading fails, start with empty dict
-        instance_names = {}
-    return instance_names
+    return default_client.names.load()
 
 def save_instance_name(machine_id, name):
     """Save instance name to persistent storage."""
-    global instance_names
-    if not machine_id:
-        return
-    
-    # Load current names
-    load_instance_names()
-    
-    # Update with new name
-    instance_names[str(machine_id)] = name
-    
-    try:
-        # Save to file
-        with open(INSTANCE_NAMES_FILE, 'w') as f:
-            json.dump(instance_names, f)
-    except Exception:
-        # If saving fails, continue without error
-        pass
+    default_client.names.save(machine_id, name)
 
 def get_instance_name(machine_id):
     """Get custom name for an instance if it exists."""
-    if not instance_names:
-        load_instance_names()
-    return instance_names.get(str(machine_id))
+    return default_client.names.get(machine_id)
 
 class Instance(object):
+    # The JarvisClient this class acts through; each client has its own subclass (see JarvisClient)
+    client = None
+
     def __init__(self,
                  hdd: int,
                  gpu_type: str,
@@ -68,7 +106,8 @@ class Instance(object):
                  duration: str = 'hour',
                  script_args: str = '',
                  http_ports: str = '',
-                 template: str = ''
+                 template: str = '',
+                 fs_id: str = None
                  ):
         
         self.gpu_type = gpu_type
@@ -83,37 +122,94 @@ class Instance(object):
         self.script_args = script_args
         self.http_ports = http_ports
         self.template = template
+        self.fs_id = fs_id
         self.url = url
         self.endpoints = endpoints
         self.ssh_str = ssh_str
         self.status = status
+        # Set when an operation on this instance was submitted without waiting (see ops.py)
+        self.op_id = None
+        # Result of the last readiness probe (see probes.py); None if none has run
+        self.ready = None
+        self.probe_results = {}
+        # Name reported by the API, which a custom name from the name store overrides in `name`
+        self.api_name = None
+        self.account = None
 
-    def pause(self):
+    def pause(self, wait: bool = True):
         '''
         Pause the running machine.
+        Args:
+            wait: If False, the pause is recorded in the ops ledger and confirmed later by `ops.reconcile`.
         Returns:
             status: Returns the pause status of the machine --> success or failed.
         '''
-        pause_response = post({},f'misc/pause', 
-                              token,
-                              query_params={'machine_id':f'{self.machine_id}'})
+        timer = journal.Timer()
+        try:
+            with timer.phase("request"):
+                pause_response = self.client.post({},f'misc/pause',
+                                                  query_params={'machine_id':f'{self.machine_id}'})
+        except Exception as e:
+            self._journal("pause", timer, ok=False, error=e)
+            raise
+        if pause_response['success'] and not wait:
+            self.status = 'Pausing'
+            pause_response['op_id'] = self._submit("pause", timer)
+            return pause_response
         if pause_response['success']:
             self.status = 'Paused'
+        self._journal("pause", timer, ok=pause_response.get('success'), error=pause_response.get('error_message'))
         return pause_response
     
-    def destroy(self):
+    def destroy(self, wait: bool = True):
         '''
         Destroy the running or paused machine. 
+        Args:
+            wait: If False, the destroy is recorded in the ops ledger and confirmed later by `ops.reconcile`.
         Returns:
             status:  Returns the destroy status of the machine --> success or failed.
         '''
-        destroy_response = post({},
-                                f'misc/destroy',
-                                token,
-                                query_params={'machine_id': self.machine_id})
+        timer = journal.Timer()
+        try:
+            with timer.phase("request"):
+                destroy_response = self.client.post({},
+                                                    f'misc/destroy',
+                                                    query_params={'machine_id': self.machine_id})
+        except Exception as e:
+            self._journal("destroy", timer, ok=False, error=e)
+            raise
+        if destroy_response['success'] and not wait:
+            self.status = 'Destroying'
+            destroy_response['op_id'] = self._submit("destroy", timer)
+            return destroy_response
         if destroy_response['success']:
             self.status = 'Destroyed'
+        self._journal("destroy", timer, ok=destroy_response.get('success'), error=destroy_response.get('error_message'))
         return destroy_response
+
+    def _journal(self, operation, timer, ok=True, error=None):
+        """Records a finished operation on this instance in the local journal."""
+        # Observed before journaling, so a model seeded from the journal doesn't count this operation twice
+        if "provision" in timer.phases and self.status == "Running":
+            readiness.observe(operation, self.gpu_type, self.template, timer.phases["provision"])
+        journal.record(operation, machine_id=self.machine_id, gpu_type=self.gpu_type, template=self.template,
+                       phases=timer.phases, duration=timer.elapsed(), ok=ok, error=error)
+
+    def _probe(self, ready, timeout, timer):
+        """Waits for a readiness level after the instance is Running and returns an error message if it never passed."""
+        if ready == "api":
+            return None
+        with timer.phase("ready"):
+            self.ready, self.probe_results = probes.wait_until_ready(self, ready, timeout=timeout)
+        if not self.ready:
+            return f"Instance is Running but not reachable over {ready} after {timeout}s"
+        return None
+
+    def _submit(self, operation, timer):
+        """Records an accepted operation on this instance in the ops ledger and returns its operation ID."""
+        self.op_id = ops.submit(operation, self.machine_id, name=self.name, gpu_type=self.gpu_type,
+                                template=self.template, request_seconds=timer.phases.get("request", 0))
+        return self.op_id
     
     def update_instance_meta(self,req,machine_details):
         self.machine_id = machine_details.get('machine_id')
@@ -130,6 +226,8 @@ class Instance(object):
         self.machine_id=machine_details.get('machine_id')
         self.duration=machine_details.get('frequency')
         self.template=machine_details.get('framework')
+        if req.get('fs_id'):
+            self.fs_id = req.get('fs_id')
 
     def resume(self,
                storage: int=None,
@@ -141,8 +239,21 @@ class Instance(object):
                script_args: str=None,
                is_reserved: bool=None,
                duration: str=None,
-               fs_id: str=None
+               fs_id: str=None,
+               wait: bool=True,
+               ready: str="api",
+               ready_timeout: int=300,
+               on_progress=None
                ):
+        '''
+        Resume the paused machine, optionally with a different spec.
+        Args:
+            wait: If False, returns as soon as the backend accepts the request, with status 'Resuming',
+                  and records the operation in the ops ledger instead of polling until it is Running.
+            ready: Readiness level to wait for once Running: 'api', 'ssh' or 'http' (see probes.py).
+                   `self.ready` is False if the probe did not pass within ready_timeout seconds.
+            on_progress: Called as on_progress(elapsed, status) after every status poll while waiting.
+        '''
         resume_req = {
             'machine_id': self.machine_id,
             'hdd' :  storage or self.hdd,
@@ -174,40 +285,64 @@ class Instance(object):
             resume_req['num_gpus'] = resume_req.get('num_gpus') or self.num_gpus
             resume_req['is_reserved'] = resume_req.get('is_reserved') or self.is_reserved
         
+        timer = journal.Timer()
         try:
             # Filter out keys with None values before sending
             payload = {k: v for k, v in resume_req.items() if v is not None}
-            resume_resp = post(payload,f'templates/{self.template}/resume', token)
+            with timer.phase("request"):
+                resume_resp = self.client.post(payload,f'templates/{self.template}/resume')
             self.machine_id = resume_resp['machine_id']
-            machine_details = Instance.get_instance_details(machine_id=self.machine_id)
+            if not wait:
+                self.status = 'Resuming'
+                self._submit("resume", timer)
+                return self
+            with timer.phase("provision"):
+                machine_details = self.get_instance_details(machine_id=self.machine_id, operation="resume",
+                                                            gpu_type=resume_req.get('gpu_type') or self.gpu_type,
+                                                            template=self.template, on_progress=on_progress)
             self.update_instance_meta(req=resume_req,machine_details=machine_details)
+            error = self._probe(ready, ready_timeout, timer)
+            self._journal("resume", timer, ok=error is None, error=error)
             return self
         
-        except InstanceCreationException:
+        except InstanceCreationException as e:
+            self._journal("resume", timer, ok=False, error=e)
             return {'error_message': 'Failed to create the instance. Please reach to the team.'}
 
         except Exception as e:
+            self._journal("resume", timer, ok=False, error=e)
             return {'error_message' : "Some unexpected error had occured. Please reach to the team."}
 
-    def get_instance_details(machine_id):
-        attempts = 0
-        max_attempts = 5
+    @classmethod
+    def get_instance_details(cls, machine_id, operation="create", gpu_type=None, template=None, on_progress=None):
+        """
+        Polls until a machine is Running, on a schedule shaped by how long this kind of operation usually
+        takes (see readiness.py). `on_progress(elapsed, status)` is called after every poll.
+        """
+        mean, std, _ = readiness.expect(operation, gpu_type, template)
+        started = time.monotonic()
+        # Never give up sooner than the original five polls did, nor well before a slow GPU type is due
+        deadline = started + max(PROVISION_TIMEOUT, mean + 4 * std)
 
-        while attempts < max_attempts:
-            machine_status_response = get('users/fetch',
-                                      token)
-            
-            matching_instances = [instance for instance in machine_status_response['instances'] 
+        # The first poll goes out at once, since a resumed machine may already be Running
+        delay = 0
+        while True:
+            time.sleep(delay)
+            machine_status_response = cls.client.get('users/fetch')
+
+            matching_instances = [instance for instance in machine_status_response['instances']
                                 if instance.get('machine_id') == machine_id]
             machine_details = matching_instances[0] if matching_instances else None
-            if machine_details['status'] == 'Running':
+            status = machine_details.get('status') if machine_details else None
+            if on_progress:
+                on_progress(time.monotonic() - started, status)
+            if status == 'Running':
                 return machine_details
-            else:
-                time.sleep(10)
-                attempts+= 1
-        
-        if attempts == max_attempts and machine_details['status'] != 'Running':
-            raise InstanceCreationException
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise InstanceCreationException
+            # The last wait is cut short so that one final poll lands on the deadline
+            delay = min(readiness.next_poll(time.monotonic() - started, mean, std), remaining)
 
     @classmethod
     def create(cls,
@@ -224,8 +359,22 @@ class Instance(object):
                is_reserved :bool = True,
                duration: str = 'hour',
                http_ports : str = '',
-               fs_id: str = None
+               fs_id: str = None,
+               wait: bool = True,
+               ready: str = "api",
+               ready_timeout: int = 300,
+               on_progress=None
                ):
+        '''
+        Create a new machine.
+        Args:
+            wait: If False, returns as soon as the backend accepts the request, with status 'Creating',
+                  and records the operation in the ops ledger instead of polling until it is Running.
+            ready: Readiness level to wait for once Running: 'api', 'ssh' or 'http' (see probes.py).
+                   `instance.ready` is False if the probe did not pass within ready_timeout seconds.
+            on_progress: Called as on_progress(elapsed, status) after every status poll while waiting.
+        '''
+
         req_data = {'hdd':storage,
                     'name':name,
                     'script_id':script_id,
@@ -247,16 +396,28 @@ class Instance(object):
             instance_params['gpu_type'] = 'CPU'
             instance_params['num_cpus'] = num_cpus
 
+        timer = journal.Timer()
+        machine_id = None
         try:
             payload = {k: v for k, v in req_data.items() if v is not None}
-            resp = post(payload, f'templates/{template}/create', token)
+            with timer.phase("request"):
+                resp = cls.client.post(payload, f'templates/{template}/create')
             machine_id = resp['machine_id']
             
             # Save the custom name
             if name and name != "My-Jarvis-Instance" and name != "Name me":
-                save_instance_name(machine_id, name)
+                cls.client.names.save(machine_id, name)
+
+            if not wait:
+                instance = cls(**instance_params, hdd=storage, name=name, machine_id=machine_id,
+                               status='Creating', template=template, fs_id=fs_id)
+                instance._submit("create", timer)
+                return instance
                 
-            machine_details = Instance.get_instance_details(machine_id=machine_id)
+            with timer.phase("provision"):
+                machine_details = cls.get_instance_details(machine_id=machine_id, operation="create",
+                                                           gpu_type=instance_params['gpu_type'],
+                                                           template=template, on_progress=on_progress)
             instance_params.update({
                 'hdd': storage,
                 'name': name,  # Use the name we provided, not the one from machine_details
@@ -267,15 +428,22 @@ class Instance(object):
                 'machine_id': machine_details.get('machine_id'),
                 'duration': machine_details.get('frequency'),
                 'template': machine_details.get('framework'),
+                'fs_id': fs_id,
         })
 
             instance = cls(**instance_params)
+            error = instance._probe(ready, ready_timeout, timer)
+            instance._journal("create", timer, ok=error is None, error=error)
             return instance
         
-        except InstanceCreationException:
+        except InstanceCreationException as e:
+            journal.record("create", machine_id=machine_id, gpu_type=instance_params.get('gpu_type'), template=template,
+                           phases=timer.phases, duration=timer.elapsed(), ok=False, error=e)
             return {'error_message': 'Failed to create the instance. Please reach to the team.'}
 
         except Exception as e:
+            journal.record("create", machine_id=machine_id, gpu_type=instance_params.get('gpu_type'), template=template,
+                           phases=timer.phases, duration=timer.elapsed(), ok=False, error=e)
             return {'error_message' : "Some unexpected error had occured. Please reach to the team."}
 
     def __str__(self):
@@ -304,19 +472,24 @@ class InstanceCreationException(Exception):
         super().__init__(self.message)
 
 class User(object):
+    client = None
+
     def __init__(self) -> None:
         pass
     
     @classmethod
-    def get_instances(cls)->list[Instance]:
-        resp = get(f"users/fetch", 
-                    token)
+    def get_instances(cls, record: bool = True)->list[Instance]:
+        """
+        Returns every instance of the account. With record, the list is treated as the whole fleet: it is indexed for
+        completion and recorded in the history. Pass record=False for a partial view, such as one of several accounts.
+        """
+        resp = cls.client.get(f"users/fetch")
         instances = []
         for instance in resp['instances']:
             machine_id = instance.get('machine_id')
             
             # First check if we have a stored custom name
-            name = get_instance_name(machine_id)
+            name = cls.client.names.get(machine_id)
             
             # If no custom name, use API name or generate one
             if not name:
@@ -325,20 +498,25 @@ class User(object):
                     gpu_type = instance.get('gpu_type', 'Unknown')
                     name = f"{gpu_type} #{machine_id}"
 
-            inst = Instance(hdd=instance.get('hdd'),
-                            gpu_type=instance.get('gpu_type'),
-                            machine_id=machine_id,
-                            name=name,
-                            is_reserved=instance.get('is_reserved'),
-                            url=instance.get('url'),
-                            status=instance.get('status'),
-                            ssh_str=instance.get('ssh_str'),
-                            num_gpus=instance.get('num_gpus'),
-                            num_cpus=instance.get('num_cpus'),
-                            endpoints=instance.get('endpoints'),
-                            duration=instance.get('frequency'),
-                            template=instance.get('framework'))
+            inst = cls.client.Instance(hdd=instance.get('hdd'),
+                                       gpu_type=instance.get('gpu_type'),
+                                       machine_id=machine_id,
+                                       name=name,
+                                       is_reserved=instance.get('is_reserved'),
+                                       url=instance.get('url'),
+                                       status=instance.get('status'),
+                                       ssh_str=instance.get('ssh_str'),
+                                       num_gpus=instance.get('num_gpus'),
+                                       num_cpus=instance.get('num_cpus'),
+                                       endpoints=instance.get('endpoints'),
+                                       duration=instance.get('frequency'),
+                                       template=instance.get('framework'),
+                                       fs_id=instance.get('fs_id'))
+            inst.api_name = instance.get('name') if instance.get('name') != 'N/A' else None
             instances.append(inst)
+        if record:
+            cls.client.index(completion_index.index_instances, instances)
+            history.record(instances)
         return instances
 
     @classmethod
@@ -349,34 +527,195 @@ class User(object):
                 return instance
         return None
 
+    @classmethod
+    def resolve_instance(cls, reference) -> Instance:
+        """
+        Returns the instance a machine ID, name, ID prefix or close match of a name refers to, from one users/fetch.
+        Raises resolve.ResolveError if nothing or more than one instance matches.
+        """
+        return NameIndex.from_instances(cls.get_instances()).resolve(reference)
+
     @classmethod
     def get_templates(cls):
-        resp = get(f"templates/", 
-                    token)
+        resp = cls.client.get(f"templates/")
+        cls.client.index(completion_index.index_templates, resp)
         return resp
 
     @classmethod
     def get_balance(cls):
-        resp = get("users/balance", token)
+        resp = cls.client.get("users/balance")
         return resp
     
     @classmethod
     def get_scripts(cls):
-        resp = get(f"users/scripts",
-                   token)
+        resp = cls.client.get(f"users/scripts")
+        cls.client.index(completion_index.index_scripts, resp)
         return resp
+
+    @classmethod
+    def add_script(cls, script_path, script_name=None, progress=None, force=False):
+        '''
+        Upload a startup script. Content that was uploaded before is looked up in the local
+        hash index and not sent again unless force is set.
+        Returns:
+            script_id: The ID to pass as script_id to Instance.create or Instance.resume.
+        '''
+        script_name = script_name or os.path.basename(script_path)
+        with open(script_path, 'rb') as f:
+            resp = cls.client.post_files({'file': (script_name, f, 'text/x-shellscript')},
+                                         'scripts/add?' + urllib.parse.urlencode({'script_name': script_name}),
+                                         progress=progress,
+                                         dedup_index=cls.client.script_index,
+                                         force=force,
+                                         # Only responses that carry a script ID are remembered
+                                         dedup_accept=lambda text: _script_id(text) is not None)
+        script_id = _script_id(resp)
+        if script_id is None:
+            try:
+                message = json.loads(resp).get('error_message')
+            except (ValueError, AttributeError):
+                message = None
+            raise ValueError(message or f"Unexpected response: {resp}")
+        return script_id
     
+def _script_id(text):
+    """Returns the script ID in the text of a scripts/add response, or None."""
+    try:
+        resp = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(resp, dict):
+        return None
+    return resp.get('script_id', resp.get('id'))
+
+# Filesystem statuses that end a wait
+FS_READY_STATUSES = ("Ready",)
+FS_FAILED_STATUSES = ("Failed", "Error")
+
 class FileSystem(object):
-    def list(self):
-        return get('fs', token)
+    client = None
+
+    def list(self, index: bool = True):
+        resp = self.client.get('fs')
+        if index:
+            self.client.index(completion_index.index_filesystems, resp)
+        return resp
 
     def create(self, fs_name, storage):
-        return post(dict(fs_name=fs_name,
-                         storage=storage),
-                    'fs',
-                    token)
+        return self.client.post(dict(fs_name=fs_name,
+                                     storage=storage),
+                                'fs')
 
     def delete(self, fs_id):
-        return post(dict(fs_id=fs_id),
-                    'fs/delete',
-                    token)
\ No newline at end of file
+        return self.client.post(dict(fs_id=fs_id),
+                                'fs/delete')
+
+    def attachments(self) -> dict:
+        """Returns {fs_id: [Instance]} for every attached filesystem, built from a single users/fetch."""
+        attached = {}
+        for instance in self.client.User.get_instances():
+            if instance.fs_id:
+                attached.setdefault(str(instance.fs_id), []).append(instance)
+        return attached
+
+    def wait_until_ready(self, fs_ids, timeout=300, on_update=None):
+        """
+        Polls fs until every filesystem in fs_ids is Ready or has failed, and returns {fs_id: status}.
+        A single list request per poll covers all of them, and the interval backs off from 1s to 10s.
+        Filesystems still pending at the timeout keep their last seen status.
+        """
+        statuses = {str(fs_id): None for fs_id in fs_ids}
+        deadline = time.time() + timeout
+        delay = 1.0
+        while True:
+            for fs in self.list() or []:
+                fs_id = str(fs.get('id'))
+                if fs_id in statuses and statuses[fs_id] != fs.get('status'):
+                    statuses[fs_id] = fs.get('status')
+                    if on_update:
+                        on_update(fs_id, statuses[fs_id])
+            waiting = [f for f, status in statuses.items() if status not in FS_READY_STATUSES + FS_FAILED_STATUSES]
+            if not waiting or time.time() + delay > deadline:
+                return statuses
+            time.sleep(delay)
+            delay = min(delay * 1.5, 10.0)
+
+class JarvisClient(object):
+    """
+    An API client for one account. It owns the token, the transport (endpoint and connection pool),
+    the instance name store and its caches, and has its own Instance, User and FileSystem classes bound to it:
+
+        client = JarvisClient(token)
+        client.User.get_instances()
+        client.Instance.create("gpu", gpu_type="A100")
+
+    A client keeps no per-request state, so one client can be shared by any number of threads.
+    Clients of different accounts share the default transport, and its pool, unless given their own.
+    script_index is the upload index of add_script; its entries are keyed by endpoint and token, so
+    clients can share one file. completion_dir is where fetched IDs are indexed for shell completion;
+    only the default client indexes into the CLI's completion files unless another directory is given.
+    """
+
+    def __init__(self, token=None, transport=None, names=None, script_index=SCRIPT_INDEX_FILE, completion_dir=None):
+        self.token = token
+        self.transport = transport or httpclient.default
+        self.names = names or name_store
+        self.script_index = script_index
+        self.completion_dir = completion_dir
+        self.Instance = self._bind(Instance)
+        self.User = self._bind(User)
+        self.FileSystem = self._bind(FileSystem)
+
+    def _bind(self, cls):
+        return type(cls.__name__, (cls,), {"client": self, "__module__": cls.__module__})
+
+    def get(self, func, data=None):
+        return self.transport.get(func, self.token, data=data)
+
+    def post(self, data, func, query_params=None):
+        return self.transport.post(data, func, self.token, query_params=query_params)
+
+    def post_files(self, files, func, **kwargs):
+        return self.transport.post_files(files, func, token=self.token, **kwargs)
+
+    def index(self, indexer, values):
+        """Refreshes this client's completion index with one of the completion_index.index_* functions."""
+        if self.completion_dir:
+            indexer(values, directory=self.completion_dir)
+
+class _DefaultClient(JarvisClient):
+    """
+    The client behind the module-level API. It reads the module's token and httpclient's default
+    transport on every request, so setting jarvisclient.token or calling httpclient.configure() applies to it.
+    """
+
+    def __init__(self):
+        self.names = name_store
+        self.script_index = SCRIPT_INDEX_FILE
+        self.completion_dir = completion_index.COMPLETION_DIR
+        self.Instance, self.User, self.FileSystem = Instance, User, FileSystem
+        for cls in (Instance, User, FileSystem):
+            cls.client = self
+
+    @property
+    def token(self):
+        return token
+
+    @property
+    def transport(self):
+        return httpclient.default
+
+default_client = _DefaultClient()
+
+class _Module(types.ModuleType):
+    """Keeps instance_names, the name cache from before NameStore, as an alias of the shared name store."""
+
+    @property
+    def instance_names(self):
+        return name_store.names
+
+    @instance_names.setter
+    def instance_names(self, value):
+        name_store.names = value
+
+sys.modules[__name__].__class__ = _Module
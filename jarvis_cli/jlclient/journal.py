@@ -0,0 +1,139 @@
+'''
+Local journal of instance mutations (create, resume, pause, destroy).
+
+One compact JSON object per line in ~/.jarvislabs/journal.jsonl:
+
+    {"t": 1760000000.0, "op": "create", "id": 1234, "gpu": "A100", "tpl": "pytorch",
+     "ph": {"request": 1.2, "provision": 48.3}, "dur": 49.5, "ok": true}
+
+The file is rotated to journal.jsonl.1 once it exceeds MAX_JOURNAL_BYTES, so at most
+two files are ever kept.
+'''
+import json
+import os
+import re
+import threading
+import time
+
+JOURNAL_FILE = os.path.expanduser("~/.jarvislabs/journal.jsonl")
+MAX_JOURNAL_BYTES = 1024 * 1024
+
+_lock = threading.Lock()
+
+def _rotate():
+    try:
+        if os.path.getsize(JOURNAL_FILE) >= MAX_JOURNAL_BYTES:
+            os.replace(JOURNAL_FILE, JOURNAL_FILE + ".1")
+    except OSError:
+        pass
+
+def record(operation, machine_id=None, gpu_type=None, template=None, phases=None, duration=None, ok=True, error=None):
+    """Appends an operation to the journal. Never raises."""
+    entry = {"t": round(time.time(), 3), "op": operation, "id": machine_id, "gpu": gpu_type, "tpl": template,
+             "ph": {k: round(v, 3) for k, v in (phases or {}).items()},
+             "dur": round(duration if duration is not None else sum((phases or {}).values()), 3), "ok": bool(ok)}
+    if error:
+        entry["err"] = str(error)[:200]
+    try:
+        with _lock:
+            os.makedirs(os.path.dirname(JOURNAL_FILE), exist_ok=True)
+            _rotate()
+            with open(JOURNAL_FILE, 'a') as f:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+    except Exception:
+        # The journal is diagnostic only and must never break a real command
+        pass
+
+class Timer(object):
+    """Collects named phase durations for one operation.
+
+        timer = Timer()
+        with timer.phase("request"):
+            ...
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+class _Phase(object):
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.phases[self.name] = self.timer.phases.get(self.name, 0) + time.perf_counter() - self.started
+        return False
+
+def read(since=None):
+    """Returns journal entries, oldest first, optionally only those newer than a Unix timestamp."""
+    entries = []
+    for path in (JOURNAL_FILE + ".1", JOURNAL_FILE):
+        try:
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A torn final line from an interrupted write
+                        continue
+                    if since is None or entry.get("t", 0) >= since:
+                        entries.append(entry)
+        except OSError:
+            continue
+    return entries
+
+def parse_window(text):
+    """Converts a window like '30m', '24h', '7d' or 'all' to seconds (None for all)."""
+    if text is None or text.lower() == "all":
+        return None
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([smhdw]?)", text.strip().lower())
+    if not match:
+        raise ValueError(f"Invalid window '{text}'. Use e.g. 30m, 24h, 7d or all.")
+    units = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+    return float(match.group(1)) * units[match.group(2)]
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+def summarise(entries, by_gpu=True, phase=None):
+    """Returns [(operation, gpu_type or 'all', count, failures, p50, p90, p99)] over successful operations' durations."""
+    groups = {}
+    for entry in entries:
+        value = entry.get("ph", {}).get(phase) if phase else entry.get("dur")
+        if value is None and (phase or entry.get("ok")):
+            # Operations that never reached the requested phase (e.g. a pause has no provision phase)
+            continue
+        keys = [(entry.get("op"), "all")]
+        if by_gpu:
+            keys.append((entry.get("op"), entry.get("gpu") or "Unknown"))
+        for key in keys:
+            durations, failures = groups.setdefault(key, ([], [0]))
+            if not entry.get("ok"):
+                failures[0] += 1
+            else:
+                durations.append(value)
+
+    rows = []
+    for (operation, gpu_type), (durations, failures) in groups.items():
+        durations.sort()
+        count = len(durations) + failures[0]
+        rows.append((operation, gpu_type, count, failures[0],
+                     percentile(durations, 50), percentile(durations, 90), percentile(durations, 99)))
+    # Per-operation totals first, then GPU types by volume
+    rows.sort(key=lambda r: (r[0] or "", r[1] != "all", -r[2], r[1]))
+    return rows
@@ -0,0 +1,127 @@
+'''
+In-process client metrics rendered in the Prometheus text exposition format.
+All metric objects are safe to update from several threads.
+'''
+import bisect
+import threading
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REGISTRY = []
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{escape_label(v)}"' for k, v in labels) + "}"
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter(object):
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{format_labels(zip(self.labelnames, key))} {format_value(value)}")
+        return lines
+
+class Histogram(object):
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self.values = {}
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.values.get(key)
+            if series is None:
+                series = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][slot] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self):
+        """Returns {label values: (sum, count)}."""
+        with self.lock:
+            return {key: (series[1], series[2]) for key, series in self.values.items()}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for key, (counts, total, count) in sorted(self.values.items()):
+                labels = list(zip(self.labelnames, key))
+                cumulative = 0
+                for bound, n in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += n
+                    lines.append(f"{self.name}_bucket{format_labels(labels + [('le', format_value(bound))])} {cumulative}")
+                lines.append(f"{self.name}_sum{format_labels(labels)} {format_value(total)}")
+                lines.append(f"{self.name}_count{format_labels(labels)} {count}")
+        return lines
+
+request_duration = Histogram(
+    "jarvis_client_request_duration_seconds",
+    "Latency of requests made by the client to the Jarvislabs backend.",
+    labelnames=("method", "endpoint"),
+)
+requests_total = Counter(
+    "jarvis_client_requests_total",
+    "Requests made by the client to the Jarvislabs backend by response code.",
+    labelnames=("method", "endpoint", "code"),
+)
+decode_duration = Histogram(
+    "jarvis_client_decode_duration_seconds",
+    "Time spent decoding JSON responses from the Jarvislabs backend.",
+    labelnames=("endpoint",),
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0),
+)
+rate_limit_wait = Histogram(
+    "jarvis_client_rate_limit_wait_seconds",
+    "Time requests spent queued by the client-side rate limiter.",
+    labelnames=("budget",),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+throttled_total = Counter(
+    "jarvis_client_throttled_total",
+    "429 responses received from the Jarvislabs backend.",
+    labelnames=("budget",),
+)
+
+def endpoint_label(func):
+    """Normalises an API path into a low-cardinality label, e.g. 'templates/pytorch/create' -> 'templates/:template/create'."""
+    path = func.split("?", 1)[0].strip("/")
+    parts = path.split("/")
+    if len(parts) == 3 and parts[0] == "templates":
+        parts[1] = ":template"
+    return "/".join(parts)
+
+def render():
+    """Renders every registered client metric."""
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
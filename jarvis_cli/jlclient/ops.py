@@ -0,0 +1,131 @@
+'''
+Ledger of operations submitted without waiting for them to finish (--no-wait).
+
+The ledger is an append-only JSON-lines file (~/.jarvislabs/ops.jsonl) of two kinds of events:
+
+    {"ev": "submit", "op_id": "3f2a9c1d", "op": "create", "id": 1234, "target": "Running", "t": ...}
+    {"ev": "finish", "op_id": "3f2a9c1d", "state": "done", "status": "Running", "t": ...}
+
+Appending keeps concurrent launches from different scripts from overwriting each other.
+An operation is reconciled against a single users/fetch response, so checking on any number
+of pending operations costs one request.
+'''
+import json
+import os
+import threading
+import time
+import uuid
+
+from . import journal
+from . import readiness
+
+OPS_FILE = os.path.expanduser("~/.jarvislabs/ops.jsonl")
+
+# Status an instance or filesystem reaches when each operation has finished; None means it disappears
+TARGETS = {"create": "Running", "resume": "Running", "pause": "Paused", "destroy": None,
+           "fs-create": "Ready", "fs-delete": None}
+# Operations on filesystems, reconciled against the fs list instead of the instance list
+FS_OPERATIONS = ("fs-create", "fs-delete")
+FAILED_STATUSES = ("Failed", "Error")
+# A created or resumed machine may not be listed by the backend straight away
+MISSING_GRACE_SECONDS = 120
+
+_lock = threading.Lock()
+
+def _append(entry):
+    with _lock:
+        os.makedirs(os.path.dirname(OPS_FILE), exist_ok=True)
+        with open(OPS_FILE, 'a') as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+def submit(operation, machine_id, name=None, gpu_type=None, template=None, request_seconds=0.0):
+    """Records an accepted operation that has not finished yet and returns its operation ID."""
+    op_id = uuid.uuid4().hex[:8]
+    _append({"ev": "submit", "op_id": op_id, "op": operation, "id": machine_id, "name": name, "gpu": gpu_type,
+             "tpl": template, "target": TARGETS[operation], "req": round(request_seconds, 3), "t": round(time.time(), 3)})
+    return op_id
+
+def load():
+    """Returns every operation in the ledger, oldest first, with finish details merged in."""
+    ops = {}
+    try:
+        with open(OPS_FILE, 'r') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if event.get("ev") == "submit":
+                    ops[event["op_id"]] = dict(event, state="pending", status=None, finished=None)
+                elif event.get("ev") == "finish" and event.get("op_id") in ops:
+                    ops[event["op_id"]].update(state=event["state"], status=event.get("status"), finished=event["t"])
+    except OSError:
+        pass
+    return list(ops.values())
+
+def _outcome(op, statuses, now):
+    """Returns (state, status) for a pending operation given the current status of every listed ID."""
+    if str(op["id"]) not in statuses:
+        if op["target"] is None:
+            return "done", "Deleted" if op["op"] in FS_OPERATIONS else "Destroyed"
+        if now - op["t"] > MISSING_GRACE_SECONDS:
+            return "failed", "Missing"
+        return "pending", None
+    status = statuses[str(op["id"])]
+    if status in FAILED_STATUSES:
+        return "failed", status
+    if op["target"] is not None and status == op["target"]:
+        return "done", status
+    return "pending", status
+
+def reconcile(instances, filesystems=None):
+    """
+    Updates pending operations from a list of Instance objects and returns every operation.
+    Filesystem operations are only updated when an fs list response is given too.
+    """
+    now = time.time()
+    by_id = {str(i.machine_id): i.status for i in instances}
+    fs_by_id = None if filesystems is None else {str(fs.get('id')): fs.get('status') for fs in filesystems}
+    ops = load()
+    for op in ops:
+        if op["state"] != "pending":
+            continue
+        if op["op"] in FS_OPERATIONS:
+            if fs_by_id is None:
+                continue
+            state, status = _outcome(op, fs_by_id, now)
+        else:
+            state, status = _outcome(op, by_id, now)
+        op["status"] = status
+        if state == "pending":
+            continue
+        op.update(state=state, finished=now)
+        _append({"ev": "finish", "op_id": op["op_id"], "state": state, "status": status, "t": round(now, 3)})
+        # The completion time is only known to within one reconcile, so provision is an upper bound.
+        # "t" is recorded once the request has returned, so the request time is not part of it
+        provision = max(0.0, now - op["t"])
+        # Observed before journaling, like Instance._journal, so a model seeded from the journal doesn't count it twice
+        if state == "done":
+            readiness.observe(op["op"], op.get("gpu"), op.get("tpl"), provision)
+        journal.record(op["op"], machine_id=op["id"], gpu_type=op.get("gpu"), template=op.get("tpl"),
+                       phases={"request": op.get("req", 0), "provision": provision},
+                       duration=now - op["t"] + op.get("req", 0), ok=state == "done",
+                       error=None if state == "done" else f"Instance ended in status {status}")
+    return ops
+
+def pending():
+    """Returns the operations that have not finished yet."""
+    return [op for op in load() if op["state"] == "pending"]
+
+def clear():
+    """Drops finished operations from the ledger and returns how many were removed."""
+    ops = load()
+    keep = [op for op in ops if op["state"] == "pending"]
+    with _lock:
+        tmp_file = OPS_FILE + ".tmp"
+        with open(tmp_file, 'w') as f:
+            for op in keep:
+                event = {k: v for k, v in op.items() if k not in ("state", "status", "finished")}
+                f.write(json.dumps(event, separators=(",", ":")) + "\n")
+        os.replace(tmp_file, OPS_FILE)
+    return len(ops) - len(keep)
@@ -0,0 +1,52 @@
+'''
+Speculative work done in the background while the CLI would otherwise sit idle.
+
+start() runs a fetch the next step is likely to need (the instance list after a selection prompt,
+the template catalog during create prompts) while a human is reading, and take() hands over its
+result. The fetch also leaves a warm connection in the shared pool for the request after the prompt.
+
+Everything here is best effort: a failed or unfinished prefetch just means the caller fetches as usual.
+'''
+import threading
+import time
+
+class Prefetch(object):
+    """The result of a function running on a daemon thread, so an abandoned prefetch never delays exit."""
+
+    def __init__(self, func):
+        self.started = time.monotonic()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.thread = threading.Thread(target=self._run, args=(func,), daemon=True)
+        self.thread.start()
+
+    def _run(self, func):
+        try:
+            self.result = func()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+_pending = {}
+_lock = threading.Lock()
+
+def start(key: str, func):
+    """Starts func in the background under a key, unless a prefetch for that key is already running."""
+    with _lock:
+        if key not in _pending:
+            _pending[key] = Prefetch(func)
+
+def take(key: str, timeout: float = None, max_age: float = None):
+    """
+    Returns the result of a prefetch and forgets it. Returns None if there is none, it failed, it is older
+    than max_age seconds, or it has not finished within timeout seconds (None waits for it).
+    """
+    with _lock:
+        prefetch = _pending.pop(key, None)
+    if prefetch is None or not prefetch.done.wait(timeout):
+        return None
+    if prefetch.error is not None or (max_age is not None and time.monotonic() - prefetch.started > max_age):
+        return None
+    return prefetch.result
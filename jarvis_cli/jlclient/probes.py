@@ -0,0 +1,113 @@
+'''
+Readiness probes that check an instance is actually usable, not just reported Running.
+
+    api   the backend reports the instance as Running (no probe)
+    ssh   a TCP connection to the port in ssh_str is answered with an SSH banner
+    http  the instance url and every endpoint answer HTTP with a status below 500
+
+All targets of an instance are probed concurrently, each with its own timeout. Probes talk to the
+instance directly and never send the API token.
+'''
+import shlex
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import certifi
+import urllib3
+
+LEVELS = ("api", "ssh", "http")
+PROBE_TIMEOUT = 5.0
+PROBE_INTERVAL = 2.0
+
+_http = urllib3.PoolManager(cert_reqs="CERT_REQUIRED", ca_certs=certifi.where(), retries=False)
+
+def ssh_address(ssh_str: str) -> tuple:
+    """Returns (host, port) from an ssh_str such as 'ssh -p 2222 root@host'."""
+    parts = shlex.split(ssh_str or "")
+    host, port = None, 22
+    index = 1 if parts and parts[0].endswith("ssh") else 0
+    while index < len(parts):
+        part = parts[index]
+        if part == "-p" and index + 1 < len(parts):
+            port = int(parts[index + 1])
+            index += 2
+            continue
+        if part.startswith("-p") and part[2:].isdigit():
+            port = int(part[2:])
+        elif part.startswith("-") and len(part) == 2 and part[1] in "bcDEeFIiJLlmOoQRSWw":
+            # Options that take a value; skip it so it isn't mistaken for the host
+            index += 1
+        elif not part.startswith("-") and host is None:
+            host = part.rsplit("@", 1)[-1]
+        index += 1
+    if not host:
+        raise ValueError(f"Invalid SSH command: '{ssh_str}'")
+    return host, port
+
+def http_targets(instance) -> list:
+    """Returns the instance url followed by its endpoints, which the API gives as a list or a comma-separated string."""
+    endpoints = instance.endpoints or []
+    if isinstance(endpoints, str):
+        endpoints = endpoints.replace(",", " ").split()
+    targets = [instance.url] if instance.url else []
+    return targets + [e for e in endpoints if e and e not in targets]
+
+def probe_ssh(ssh_str: str, timeout: float = PROBE_TIMEOUT) -> tuple:
+    """Returns (ok, detail) for whether sshd is accepting connections."""
+    try:
+        host, port = ssh_address(ssh_str)
+        with socket.create_connection((host, port), timeout=timeout) as sock:
+            sock.settimeout(timeout)
+            banner = sock.recv(256)
+    except (OSError, ValueError) as e:
+        return False, str(e) or type(e).__name__
+    if banner.startswith(b"SSH-"):
+        return True, banner.split(b"\r\n", 1)[0].decode(errors="replace")
+    return False, "no SSH banner"
+
+def probe_http(target: str, timeout: float = PROBE_TIMEOUT) -> tuple:
+    """Returns (ok, detail) for whether an HTTP endpoint answers. Redirects and auth challenges count as up."""
+    try:
+        r = _http.request("GET", target, timeout=timeout, redirect=False, preload_content=False)
+        r.release_conn()
+    except urllib3.exceptions.HTTPError as e:
+        return False, type(e).__name__
+    return r.status < 500, f"HTTP {r.status}"
+
+def probe(instance, level: str, timeout: float = PROBE_TIMEOUT) -> dict:
+    """Runs the probes for a readiness level concurrently and returns {target: (ok, detail)}."""
+    if level == "api":
+        return {"api": (instance.status == "Running", instance.status)}
+    if level == "ssh":
+        try:
+            host, port = ssh_address(instance.ssh_str)
+        except ValueError:
+            return {"ssh": (False, f"invalid ssh_str '{instance.ssh_str or ''}'")}
+        checks = {f"ssh://{host}:{port}": lambda: probe_ssh(instance.ssh_str, timeout)}
+    elif level == "http":
+        checks = {target: (lambda t=target: probe_http(t, timeout)) for target in http_targets(instance)}
+    else:
+        raise ValueError(f"Unknown readiness level '{level}'. Use one of: {', '.join(LEVELS)}.")
+    if not checks:
+        return {level: (False, f"instance has no {level} address")}
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        futures = {target: executor.submit(check) for target, check in checks.items()}
+        return {target: future.result() for target, future in futures.items()}
+
+def wait_until_ready(instance, level: str, timeout: float = 300, interval: float = PROBE_INTERVAL, on_update=None) -> tuple:
+    """
+    Probes a Running instance until every target of the level passes or the timeout expires.
+    Returns (ready, results). `on_update(results)` is called after every round of probes.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        started = time.monotonic()
+        results = probe(instance, level, timeout=min(PROBE_TIMEOUT, max(0.1, deadline - started)))
+        if on_update:
+            on_update(results)
+        if all(ok for ok, _ in results.values()):
+            return True, results
+        if time.monotonic() + interval > deadline:
+            return False, results
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
@@ -0,0 +1,243 @@
+'''
+Client-side query expressions over instances.
+
+    status=Running and gpu_type in (A100,A6000)
+    not (name ~ 'test-*' or storage >= 100)
+
+Expressions are compiled once into plain Python closures, so evaluating them over thousands
+of instances is a single in-memory scan.
+'''
+import fnmatch
+import operator
+import re
+
+# Query field -> Instance attribute
+FIELDS = {
+    "id": "machine_id",
+    "machine_id": "machine_id",
+    "name": "name",
+    "status": "status",
+    "gpu": "gpu_type",
+    "gpu_type": "gpu_type",
+    "gpus": "num_gpus",
+    "num_gpus": "num_gpus",
+    "cpus": "num_cpus",
+    "num_cpus": "num_cpus",
+    "storage": "hdd",
+    "hdd": "hdd",
+    "template": "template",
+    "ssh": "ssh_str",
+    "ssh_str": "ssh_str",
+    "url": "url",
+    "reserved": "is_reserved",
+    "is_reserved": "is_reserved",
+    "duration": "duration",
+    "account": "account",
+}
+
+COMPARATORS = {
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<string>'[^']*'|"[^"]*")
+      | (?P<op>==|!=|<=|>=|=|<|>|~)
+      | (?P<punct>[(),])
+      | (?P<word>[^\s()',"=!<>~]+)
+    )""", re.VERBOSE)
+
+class QueryError(ValueError):
+    """Raised when a query expression cannot be parsed."""
+
+def tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = TOKEN_RE.match(text, pos)
+        if not match:
+            raise QueryError(f"Unexpected character at position {pos}: '{text[pos:]}'")
+        pos = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "string":
+            tokens.append(("value", value[1:-1]))
+        elif kind == "word" and value.lower() in ("and", "or", "not", "in"):
+            tokens.append(("keyword", value.lower()))
+        else:
+            tokens.append((kind, value))
+    return tokens
+
+def field_getter(name):
+    """Returns a function reading a query field from an Instance."""
+    attribute = FIELDS.get(name.lower())
+    if attribute is None:
+        raise QueryError(f"Unknown field '{name}'. Use one of: {', '.join(sorted(FIELDS))}")
+    return operator.attrgetter(attribute)
+
+def _literal(value):
+    """Converts a literal to int, bool or a case-folded string so comparisons need no work per instance."""
+    if re.fullmatch(r"-?\d+", value):
+        return int(value)
+    if value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    return value.casefold()
+
+def _normalise(value):
+    if isinstance(value, str):
+        if re.fullmatch(r"-?\d+", value):
+            return int(value)
+        return value.casefold()
+    return value
+
+class _Parser(object):
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, kind=None, value=None):
+        token = self.peek()
+        if token[0] is None or (kind and token[0] != kind) or (value and token[1] != value):
+            expected = value or kind or "a token"
+            found = token[1] if token[0] else "end of expression"
+            raise QueryError(f"Expected {expected} but found '{found}'")
+        self.pos += 1
+        return token
+
+    def parse(self):
+        predicate = self.parse_or()
+        if self.pos != len(self.tokens):
+            raise QueryError(f"Unexpected '{self.peek()[1]}'")
+        return predicate
+
+    def parse_or(self):
+        terms = [self.parse_and()]
+        while self.peek() == ("keyword", "or"):
+            self.take()
+            terms.append(self.parse_and())
+        if len(terms) == 1:
+            return terms[0]
+        return lambda instance: any(term(instance) for term in terms)
+
+    def parse_and(self):
+        terms = [self.parse_not()]
+        while self.peek() == ("keyword", "and"):
+            self.take()
+            terms.append(self.parse_not())
+        if len(terms) == 1:
+            return terms[0]
+        return lambda instance: all(term(instance) for term in terms)
+
+    def parse_not(self):
+        if self.peek() == ("keyword", "not"):
+            self.take()
+            term = self.parse_not()
+            return lambda instance: not term(instance)
+        if self.peek() == ("punct", "("):
+            self.take()
+            term = self.parse_or()
+            self.take("punct", ")")
+            return term
+        return self.parse_comparison()
+
+    def value(self):
+        kind, value = self.peek()
+        if kind not in ("word", "value"):
+            raise QueryError(f"Expected a value but found '{value if kind else 'end of expression'}'")
+        self.pos += 1
+        return value
+
+    def parse_comparison(self):
+        getter = field_getter(self.take("word")[1])
+        kind, op = self.peek()
+        negate = False
+        if (kind, op) == ("keyword", "not"):
+            self.take()
+            negate = True
+            kind, op = self.peek()
+        if (kind, op) == ("keyword", "in"):
+            self.take()
+            self.take("punct", "(")
+            values = {_literal(self.value())}
+            while self.peek() == ("punct", ","):
+                self.take()
+                values.add(_literal(self.value()))
+            self.take("punct", ")")
+            return lambda instance: (_normalise(getter(instance)) in values) != negate
+        if negate:
+            raise QueryError("'not' after a field must be followed by 'in'")
+
+        self.take("op")
+        literal = self.value()
+        if op == "~":
+            pattern = re.compile(fnmatch.translate(literal.casefold()))
+            return lambda instance: pattern.match(str(getter(instance) or "").casefold()) is not None
+
+        compare = COMPARATORS[op]
+        expected = _literal(literal)
+
+        def predicate(instance):
+            actual = _normalise(getter(instance))
+            try:
+                return compare(actual, expected)
+            except TypeError:
+                # Missing values or mixed types never match an ordering comparison
+                return False
+        return predicate
+
+def compile_query(text):
+    """Compiles a query expression into a predicate taking an Instance."""
+    if not text or not text.strip():
+        return lambda instance: True
+    return _Parser(text).parse()
+
+def is_query(text):
+    """Returns True if a selector string is a query expression rather than a list of IDs and names."""
+    return bool(re.search(r"[=<>~]|\s(and|or|not|in)\s|^not\s", text or "", re.IGNORECASE))
+
+def filter_instances(instances, where):
+    """Returns the instances matching a query expression."""
+    predicate = compile_query(where)
+    return [i for i in instances if predicate(i)]
+
+def sort_instances(instances, sort):
+    """Sorts instances by comma-separated fields; prefix a field with '-' to sort descending."""
+    for field in reversed([f.strip() for f in (sort or "").split(",") if f.strip()]):
+        descending = field.startswith("-")
+        getter = field_getter(field.lstrip("-"))
+        # Missing values always sort last
+        present = [i for i in instances if getter(i) is not None]
+        missing = [i for i in instances if getter(i) is None]
+        present.sort(key=lambda i: _sort_key(getter(i)), reverse=descending)
+        instances = present + missing
+    return instances
+
+def _sort_key(value):
+    if isinstance(value, (int, float)):
+        return (0, value, "")
+    return (1, 0, str(value).casefold())
+
+def project(instances, columns):
+    """Returns a row of string values per instance for the given comma-separated fields."""
+    getters = [field_getter(c) for c in columns]
+    return [["" if g(i) is None else str(g(i)) for g in getters] for i in instances]
+
+def aggregate(instances, group_by):
+    """Groups instances by a field and returns [(group value, count, total GPUs, total storage)] sorted by count."""
+    getter = field_getter(group_by)
+    groups = {}
+    for instance in instances:
+        key = getter(instance)
+        count, gpus, storage = groups.get(key, (0, 0, 0))
+        groups[key] = (count + 1, gpus + (instance.num_gpus or 0), storage + (instance.hdd or 0))
+    return sorted(((k, *v) for k, v in groups.items()), key=lambda row: (-row[1], str(row[0])))
@@ -0,0 +1,134 @@
+'''
+Client-side rate limiting for requests to the Jarvislabs backend.
+
+Reads (GET: users/fetch, fs, templates/, ...) and mutations (POST: create, resume, pause, destroy,
+fs create/delete, ...) draw from separate token buckets, so a burst of lifecycle calls never starves
+the polling that waits on them. Buckets hand out reservations: a caller is given the next free slot
+immediately and sleeps until it comes round, so waiters are served in arrival order whether they
+are threads or asyncio tasks.
+
+A 429 response halves the bucket's rate and holds it closed for the Retry-After delay. Every other
+response raises the rate back towards its configured value a little at a time.
+
+Rates can be set with JARVIS_READ_RATE and JARVIS_MUTATION_RATE as "<per second>[/<burst>]".
+'''
+import asyncio
+import email.utils
+import os
+import threading
+import time
+
+from . import metrics
+
+READ = "read"
+MUTATION = "mutation"
+
+DEFAULT_RATES = {READ: (10.0, 20), MUTATION: (2.0, 5)}
+# Delay assumed when a 429 response carries no usable Retry-After header
+DEFAULT_RETRY_AFTER = 1.0
+# The adaptive rate never drops below this fraction of the configured rate
+MIN_RATE_FRACTION = 0.05
+# Fraction of the configured rate recovered after each successful response
+RECOVERY_STEP = 0.05
+
+class TokenBucket(object):
+    """
+    A thread-safe token bucket whose rate adapts to 429 responses.
+    It is kept as the time the next token becomes free, so a reservation is a single comparison.
+    """
+
+    def __init__(self, name, rate, burst):
+        self.name = name
+        self.configured_rate = float(rate)
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.next_free = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes the next free token and returns how many seconds the caller must wait before using it."""
+        with self.lock:
+            now = time.monotonic()
+            interval = 1.0 / self.rate
+            # An idle bucket refills up to `burst` tokens; after a 429 it restarts empty
+            start = max(self.next_free, now - (self.burst - 1) * interval, self.paused_until)
+            self.next_free = start + interval
+            return max(0.0, start - now)
+
+    def _paused_for(self) -> float:
+        with self.lock:
+            return self.paused_until - time.monotonic()
+
+    def acquire(self) -> float:
+        """Blocks the calling thread until a token is available and returns the time spent waiting."""
+        started = time.monotonic()
+        delay = self.reserve()
+        while delay > 0:
+            time.sleep(delay)
+            # Tokens reserved before a 429 are held back until the backend is ready again
+            delay = self._paused_for()
+        waited = time.monotonic() - started
+        metrics.rate_limit_wait.observe(waited, budget=self.name)
+        return waited
+
+    async def acquire_async(self) -> float:
+        """Waits without blocking the event loop until a token is available and returns the time spent waiting."""
+        started = time.monotonic()
+        delay = self.reserve()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self._paused_for()
+        waited = time.monotonic() - started
+        metrics.rate_limit_wait.observe(waited, budget=self.name)
+        return waited
+
+    def throttled(self, retry_after: float):
+        """Backs off after a 429: halves the rate and hands out no tokens for retry_after seconds."""
+        with self.lock:
+            self.rate = max(self.configured_rate * MIN_RATE_FRACTION, self.rate / 2)
+            self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+        metrics.throttled_total.inc(budget=self.name)
+
+    def succeeded(self):
+        """Moves the rate back towards the configured rate after a response that was not throttled."""
+        if self.rate < self.configured_rate:
+            with self.lock:
+                self.rate = min(self.configured_rate, self.rate + self.configured_rate * RECOVERY_STEP)
+
+def _parse_rate(value, default):
+    try:
+        rate, _, burst = value.partition("/")
+        rate, burst = float(rate), int(burst) if burst else max(1, int(float(rate)))
+    except (AttributeError, ValueError):
+        return default
+    return (rate, burst) if rate > 0 else default
+
+buckets = {}
+
+def configure(read=None, mutation=None):
+    """Sets (rate per second, burst) for each budget. Unset budgets come from the environment or the defaults."""
+    env = {READ: os.environ.get("JARVIS_READ_RATE"), MUTATION: os.environ.get("JARVIS_MUTATION_RATE")}
+    for name, value in ((READ, read), (MUTATION, mutation)):
+        rate, burst = value or _parse_rate(env[name], DEFAULT_RATES[name])
+        buckets[name] = TokenBucket(name, rate, burst)
+
+def budget_for(method: str) -> TokenBucket:
+    """Returns the bucket a request draws from: reads for GET and HEAD, mutations for everything else."""
+    return buckets[READ if method in ("GET", "HEAD") else MUTATION]
+
+def retry_after(response) -> float:
+    """Returns the delay requested by a 429 response's Retry-After header, in seconds."""
+    value = response.headers.get("Retry-After") if response.headers else None
+    if not value:
+        return DEFAULT_RETRY_AFTER
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+configure()
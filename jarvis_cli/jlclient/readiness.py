@@ -0,0 +1,114 @@
+'''
+Time-to-ready model: how long create and resume take to reach Running, per operation, GPU type and template.
+
+Every key keeps an exponentially weighted mean and variance of observed provision times in
+~/.jarvislabs/readiness.json, so recent behaviour counts most and the file stays a few hundred bytes:
+
+    {"create|A100|pytorch": {"n": 12, "mean": 48.2, "var": 30.1}, "create|A100|*": {...}, "create|*|*": {...}}
+
+A key needs MIN_SAMPLES observations before it is trusted; until then the next broader key is used,
+and a fixed prior when nothing has been observed yet. The first load after upgrading seeds the model
+from the operation journal.
+
+The poll schedule follows the expectation. Before the instance can plausibly be ready, each poll
+halves the remaining gap to the expected window (sparse early polls). Inside the window polls are
+dense. Once the instance is overdue, the interval grows again.
+'''
+import json
+import math
+import os
+import threading
+
+from . import journal
+
+MODEL_FILE = os.path.expanduser("~/.jarvislabs/readiness.json")
+OPERATIONS = ("create", "resume")
+# Weight of the newest observation once a key has 1 / ALPHA samples
+ALPHA = 0.2
+MIN_SAMPLES = 3
+# (mean, standard deviation) in seconds used before anything has been observed
+PRIORS = {"create": (60.0, 30.0), "resume": (30.0, 20.0)}
+MIN_INTERVAL = 1.0
+DENSE_INTERVAL = 5.0
+MAX_INTERVAL = 30.0
+
+_lock = threading.Lock()
+
+def _keys(operation, gpu_type, template):
+    """Returns the keys an observation updates, most specific first."""
+    return [f"{operation}|{gpu_type or '*'}|{template or '*'}", f"{operation}|{gpu_type or '*'}|*", f"{operation}|*|*"]
+
+def _update(model, operation, gpu_type, template, seconds):
+    for key in dict.fromkeys(_keys(operation, gpu_type, template)):
+        stats = model.setdefault(key, {"n": 0, "mean": 0.0, "var": 0.0})
+        stats["n"] += 1
+        # A plain running average for the first samples, so one early outlier doesn't dominate
+        alpha = max(ALPHA, 1.0 / stats["n"])
+        delta = seconds - stats["mean"]
+        stats["mean"] += alpha * delta
+        stats["var"] = (1 - alpha) * (stats["var"] + alpha * delta * delta)
+
+def _seed():
+    """Builds a model from the provision times recorded in the journal."""
+    model = {}
+    for entry in journal.read():
+        seconds = (entry.get("ph") or {}).get("provision")
+        if entry.get("ok") and entry.get("op") in OPERATIONS and seconds is not None:
+            _update(model, entry["op"], entry.get("gpu"), entry.get("tpl"), seconds)
+    return model
+
+def load() -> dict:
+    try:
+        with open(MODEL_FILE, 'r') as f:
+            return json.load(f)
+    except OSError:
+        return _seed()
+    except ValueError:
+        return {}
+
+def _save(model: dict):
+    os.makedirs(os.path.dirname(MODEL_FILE), exist_ok=True)
+    tmp_file = f"{MODEL_FILE}.{os.getpid()}.tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(model, f, separators=(",", ":"))
+    os.replace(tmp_file, MODEL_FILE)
+
+def observe(operation, gpu_type, template, seconds):
+    """Adds an observed time to Running to the model. Never raises."""
+    if operation not in OPERATIONS or seconds is None:
+        return
+    try:
+        with _lock:
+            model = load()
+            _update(model, operation, gpu_type, template, float(seconds))
+            _save(model)
+    except Exception:
+        # The model only tunes polling and must never break a real command
+        pass
+
+def expect(operation, gpu_type=None, template=None, model=None) -> tuple:
+    """Returns (mean, standard deviation, samples) of the time to Running, from the most specific trusted key."""
+    model = load() if model is None else model
+    for key in _keys(operation, gpu_type, template):
+        stats = model.get(key)
+        if stats and stats["n"] >= MIN_SAMPLES:
+            return stats["mean"], math.sqrt(max(0.0, stats["var"])), stats["n"]
+    mean, std = PRIORS.get(operation, PRIORS["create"])
+    return mean, std, 0
+
+def next_poll(elapsed: float, mean: float, std: float) -> float:
+    """Returns how many seconds to wait before the next status poll, given the seconds waited so far."""
+    window_start = max(0.0, mean - 2 * std)
+    window_end = mean + 2 * std
+    if elapsed < window_start:
+        gap = window_start - elapsed
+        delay = gap if gap <= DENSE_INTERVAL else gap / 2
+    elif elapsed <= window_end:
+        return min(max(std / 4, MIN_INTERVAL), DENSE_INTERVAL)
+    else:
+        delay = (elapsed - window_end) / 2
+    return min(max(delay, MIN_INTERVAL), MAX_INTERVAL)
+
+def eta(elapsed: float, mean: float) -> float:
+    """Returns the expected seconds left, or None once the wait has gone past the expected time."""
+    return mean - elapsed if elapsed < mean else None
@@ -0,0 +1,78 @@
+'''
+Resolves what a user typed (a machine ID, a custom or API name, an ID prefix or a misspelt name) to one instance.
+
+The index is built once from a snapshot of instances, so resolving any number of references costs
+no requests beyond the users/fetch that produced the snapshot. Matching stops at the first stage
+that finds anything:
+
+    1. exact machine ID
+    2. exact name, ignoring case (custom names from the name store and names from the API)
+    3. machine ID prefix or name prefix
+    4. close matches of the name
+
+A stage that finds more than one instance is reported as ambiguous instead of guessing.
+'''
+import difflib
+
+class ResolveError(ValueError):
+    """Raised when a reference matches no instance, or more than one."""
+
+    def __init__(self, message, candidates=None):
+        self.candidates = candidates or []
+        super().__init__(message)
+
+class NameIndex(object):
+    def __init__(self):
+        self.by_id = {}
+        self.by_name = {}
+        self.labels = {}
+
+    @classmethod
+    def from_instances(cls, instances):
+        index = cls()
+        for instance in instances:
+            index.add(instance.machine_id, (instance.name, instance.api_name), instance)
+        return index
+
+    def add(self, machine_id, names, item):
+        """Indexes an item under its machine ID and every non-empty name."""
+        key = str(machine_id)
+        self.by_id[key] = item
+        names = [n for n in dict.fromkeys(names) if n]
+        self.labels[key] = names[0] if names else key
+        for name in names:
+            self.by_name.setdefault(name.lower(), {})[key] = item
+
+    def _label(self, key):
+        return f"{self.labels[key]} ({key})" if self.labels[key] != key else key
+
+    def _unique(self, query, matches, how):
+        if len(matches) == 1:
+            return next(iter(matches.values()))
+        candidates = sorted(matches)
+        shown = ", ".join(self._label(k) for k in candidates[:5]) + (", ..." if len(candidates) > 5 else "")
+        raise ResolveError(f"'{query}' {how} {len(candidates)} instances: {shown}. Use a longer name or the machine ID.",
+                           candidates=[matches[k] for k in candidates])
+
+    def resolve(self, query):
+        """Returns the one item a reference points to, or raises ResolveError."""
+        query = str(query).strip()
+        if query in self.by_id:
+            return self.by_id[query]
+        lowered = query.lower()
+        if lowered in self.by_name:
+            return self._unique(query, self.by_name[lowered], "is the name of")
+
+        matches = {k: v for k, v in self.by_id.items() if query.isdigit() and k.startswith(query)}
+        for name, items in self.by_name.items():
+            if name.startswith(lowered):
+                matches.update(items)
+        if matches:
+            return self._unique(query, matches, "is a prefix of")
+
+        matches = {}
+        for name in difflib.get_close_matches(lowered, list(self.by_name), n=5, cutoff=0.75):
+            matches.update(self.by_name[name])
+        if matches:
+            return self._unique(query, matches, "closely matches")
+        raise ResolveError(f"No instance matches '{query}'.")
@@ -0,0 +1,490 @@
+import json
+import os
+import shlex
+import subprocess
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from rich.console import Console
+
+from .jlclient.jarvisclient import User, Instance
+from .jlclient import probes
+from .remote import ssh_command
+from .visualisations import show_spinner, display_jobs_table, display_jobs_stats
+
+console = Console()
+
+JOBS_DIR = os.path.expanduser("~/.jarvislabs/jobs")
+# Submissions and cancellations are appended here by any shell; only the scheduler writes STATE_FILE
+EVENTS_FILE = os.path.join(JOBS_DIR, "events.jsonl")
+STATE_FILE = os.path.join(JOBS_DIR, "state.json")
+PRICES_FILE = os.path.join(JOBS_DIR, "prices.json")
+# Held by the scheduler pass that owns STATE_FILE; holds the PID of that scheduler
+LOCK_FILE = os.path.join(JOBS_DIR, "scheduler.lock")
+# Workers are tagged in the name store with this prefix followed by their GPU type and template
+WORKER_TAG_PREFIX = "jobs:"
+# Directory on the worker holding each job's script, log, pid and exit code
+REMOTE_DIR = "~/.jarvis-jobs"
+
+FINISHED_STATES = ("done", "failed", "cancelled")
+# A job whose worker is reclaimed mid-run is queued again this many times before it is failed
+MAX_ATTEMPTS = 3
+
+def _append(event: dict):
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    with open(EVENTS_FILE, 'a') as f:
+        f.write(json.dumps(event, separators=(",", ":")) + "\n")
+
+def _read_events() -> list:
+    events = []
+    try:
+        with open(EVENTS_FILE, 'r') as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return events
+
+def load_state() -> dict:
+    try:
+        with open(STATE_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"jobs": {}, "workers": {}, "usage": {}, "events_seen": 0, "last_tick": None}
+
+def save_state(state: dict):
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    tmp_file = STATE_FILE + ".tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_file, STATE_FILE)
+
+class _Lock(object):
+    """An exclusive lock file held around a scheduler pass, so two schedulers never launch the same job."""
+
+    def __init__(self):
+        self.acquired = False
+
+    def __enter__(self):
+        os.makedirs(JOBS_DIR, exist_ok=True)
+        # The PID is written before the lock appears, so a lock file is never seen empty
+        tmp_file = f"{LOCK_FILE}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w') as f:
+            f.write(str(os.getpid()))
+        try:
+            for _ in range(2):
+                try:
+                    os.link(tmp_file, LOCK_FILE)
+                    self.acquired = True
+                    return self
+                except FileExistsError:
+                    try:
+                        with open(LOCK_FILE, 'r') as f:
+                            os.kill(int(f.read().strip()), 0)
+                        return self
+                    except ProcessLookupError:
+                        # Left behind by a scheduler that was killed mid-pass
+                        try:
+                            os.remove(LOCK_FILE)
+                        except OSError:
+                            pass
+                    except (OSError, ValueError):
+                        return self
+            return self
+        finally:
+            os.remove(tmp_file)
+
+    def __exit__(self, *exc):
+        if self.acquired:
+            try:
+                os.remove(LOCK_FILE)
+            except OSError:
+                pass
+        return False
+
+def load_prices() -> dict:
+    try:
+        with open(PRICES_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def worker_tag(gpu_type: str, template: str) -> str:
+    return f"{WORKER_TAG_PREFIX}{gpu_type}/{template}"
+
+def _ingest(state: dict):
+    """Applies submissions and cancellations appended since the last tick."""
+    events = _read_events()
+    for event in events[state["events_seen"]:]:
+        if event["ev"] == "submit":
+            job = {k: v for k, v in event.items() if k != "ev"}
+            job.update(state="queued", machine_id=None, gpu_ids=[], started=None, finished=None, exit_code=None, attempts=0)
+            state["jobs"][job["id"]] = job
+        elif event["ev"] == "cancel" and event["id"] in state["jobs"]:
+            state["jobs"][event["id"]]["cancel"] = True
+    state["events_seen"] = len(events)
+
+def all_jobs() -> list:
+    """Returns every job, oldest first, including submissions the scheduler has not picked up yet."""
+    state = load_state()
+    _ingest(state)
+    return sorted(state["jobs"].values(), key=lambda j: j["submitted"])
+
+def resolve_job(jobs: list, job_id: str) -> dict:
+    matches = [j for j in jobs if j["id"].startswith(job_id)]
+    if len(matches) != 1:
+        raise ValueError(f"No job matches '{job_id}'." if not matches else f"'{job_id}' matches {len(matches)} jobs.")
+    return matches[0]
+
+def submit(script: str, args: list, gpus: int = 1, gpu_type: str = "A100", template: str = "pytorch", name: str = None):
+    """Copies a script into the local queue as a new job."""
+    if not os.path.isfile(script):
+        console.print(f"[bold red]Error: Script '{script}' does not exist.[/]")
+        return 1
+    if gpus < 1:
+        console.print("[bold red]Error: A job needs at least one GPU.[/]")
+        return 1
+    job_id = uuid.uuid4().hex[:8]
+    job_dir = os.path.join(JOBS_DIR, job_id)
+    os.makedirs(job_dir, exist_ok=True)
+    with open(script, 'rb') as src, open(os.path.join(job_dir, "script"), 'wb') as dst:
+        dst.write(src.read())
+    _append({"ev": "submit", "id": job_id, "name": name or os.path.basename(script), "args": list(args or []),
+             "gpus": gpus, "gpu_type": gpu_type, "template": template, "submitted": round(time.time(), 3)})
+    console.print(f"📥 [bold green]Queued job {job_id}[/] ({gpus}× {gpu_type}, {template}). Start the scheduler with 'jarvis jobs run'.")
+    return 0
+
+def cancel(job_ids: list):
+    """Marks jobs for cancellation; the scheduler stops running ones on its next tick."""
+    jobs = all_jobs()
+    exit_code = 0
+    for job_id in job_ids:
+        try:
+            job = resolve_job(jobs, job_id)
+        except ValueError as e:
+            console.print(f"[bold red]Error: {e}[/]")
+            exit_code = 1
+            continue
+        if job["state"] in FINISHED_STATES:
+            console.print(f"[yellow]Job {job['id']} has already finished ({job['state']}).[/]")
+            continue
+        _append({"ev": "cancel", "id": job["id"], "t": round(time.time(), 3)})
+        console.print(f"🛑 [bold]Job {job['id']} will be cancelled on the scheduler's next tick.[/]")
+    return exit_code
+
+def _ssh(instance: Instance, command: str, stdin: bytes = None, timeout: float = 60) -> tuple:
+    """Runs a command on a worker and returns (exit code, stdout)."""
+    try:
+        proc = subprocess.run(ssh_command(instance, command), input=stdin or b"", capture_output=True, timeout=timeout)
+    except (OSError, ValueError, subprocess.TimeoutExpired) as e:
+        return None, str(e)
+    return proc.returncode, proc.stdout.decode(errors="replace")
+
+def _launch(job: dict, instance: Instance) -> bool:
+    """Copies a job's script to its worker and starts it detached on the GPUs assigned to it."""
+    with open(os.path.join(JOBS_DIR, job["id"], "script"), 'rb') as f:
+        script = f.read()
+    remote = f"{REMOTE_DIR}/{job['id']}"
+    run = (f"CUDA_VISIBLE_DEVICES={','.join(map(str, job['gpu_ids']))} bash script {shlex.join(job['args'])} > log 2>&1; "
+           f"echo $? > exit_code")
+    command = (f"mkdir -p {remote} && cd {remote} && rm -f exit_code && cat > script && "
+               f"(nohup bash -c {shlex.quote(run)} < /dev/null > /dev/null 2>&1 & echo $! > pid) && cat pid")
+    code, out = _ssh(instance, command, stdin=script)
+    job["pid"] = out.strip() if code == 0 else None
+    return code == 0
+
+def _poll(instance: Instance, jobs: list) -> dict:
+    """Returns {job_id: exit code} for the jobs on a worker that have finished, in one SSH round trip."""
+    ids = " ".join(j["id"] for j in jobs)
+    code, out = _ssh(instance, f"cd {REMOTE_DIR} 2>/dev/null && for j in {ids}; do "
+                               f"[ -f $j/exit_code ] && echo \"$j $(cat $j/exit_code)\"; done; true")
+    finished = {}
+    for line in out.splitlines() if code == 0 else []:
+        parts = line.split()
+        if len(parts) == 2 and parts[1].lstrip("-").isdigit():
+            finished[parts[0]] = int(parts[1])
+    return finished
+
+def _fetch_log(job: dict, instance: Instance):
+    code, out = _ssh(instance, f"cat {REMOTE_DIR}/{job['id']}/log")
+    if code == 0:
+        with open(os.path.join(JOBS_DIR, job["id"], "log"), 'w') as f:
+            f.write(out)
+
+def _free_gpus(worker: Instance, running: list) -> list:
+    busy = {g for j in running for g in j["gpu_ids"]}
+    return [g for g in range(int(worker.num_gpus or 0)) if g not in busy]
+
+def _pack(queued: list, workers: list, running_by_worker: dict) -> list:
+    """
+    Best-fit decreasing bin packing: the largest jobs are placed first, each on the worker it leaves
+    with the fewest free GPUs. Returns [(job, worker, gpu_ids)].
+    """
+    free = {w.machine_id: _free_gpus(w, running_by_worker.get(w.machine_id, [])) for w in workers}
+    placements = []
+    for job in sorted(queued, key=lambda j: (-j["gpus"], j["submitted"])):
+        fits = [w for w in workers if w.gpu_type == job["gpu_type"] and w.template == job["template"]
+                and len(free[w.machine_id]) >= job["gpus"]]
+        if not fits:
+            continue
+        worker = min(fits, key=lambda w: len(free[w.machine_id]) - job["gpus"])
+        gpu_ids, free[worker.machine_id] = free[worker.machine_id][:job["gpus"]], free[worker.machine_id][job["gpus"]:]
+        placements.append((job, worker, gpu_ids))
+    return placements
+
+def _provision(unplaced: list, workers: list, max_workers: int, gpus_per_worker: int, storage: int):
+    """Resumes paused workers, then creates new ones, for queued jobs that fit nowhere. Returns nothing; never waits."""
+    pending = [w for w in workers if w.status in ("Creating", "Resuming")]
+    paused = [w for w in workers if w.status == "Paused"]
+    total = len([w for w in workers if w.status not in ("Pausing", "Destroying")])
+    groups = {}
+    for job in unplaced:
+        groups.setdefault((job["gpu_type"], job["template"]), []).append(job)
+
+    for (gpu_type, template), jobs in groups.items():
+        needed = sum(j["gpus"] for j in jobs)
+        # Capacity that is already on its way counts against the backlog
+        needed -= sum(int(w.num_gpus or 0) for w in pending if w.gpu_type == gpu_type and w.template == template)
+        largest = max(j["gpus"] for j in jobs)
+        for worker in sorted((w for w in paused if w.gpu_type == gpu_type and w.template == template),
+                             key=lambda w: -int(w.num_gpus or 0)):
+            if needed <= 0:
+                break
+            if int(worker.num_gpus or 0) < largest:
+                continue
+            console.print(f"▶️ [bold]Resuming worker {worker.machine_id} for {len(jobs)} queued {gpu_type} job(s)...[/]")
+            if isinstance(worker.resume(wait=False), Instance):
+                needed -= int(worker.num_gpus or 0)
+        while needed > 0 and total < max_workers:
+            size = max(largest, gpus_per_worker)
+            console.print(f"⚡ [bold]Creating a {size}× {gpu_type} worker for queued jobs...[/]")
+            result = Instance.create(instance_type="gpu", gpu_type=gpu_type, num_gpus=size, template=template,
+                                     storage=storage, name=worker_tag(gpu_type, template), wait=False)
+            if not isinstance(result, Instance):
+                console.print(f"[bold red]❌ Could not create a worker: {result.get('error_message', 'Unknown error')}[/]")
+                break
+            total += 1
+            needed -= size
+        if needed > 0 and total >= max_workers:
+            console.print(f"[dim]{len(jobs)} {gpu_type} job(s) wait for capacity: {max_workers} workers is the limit (--max-workers).[/]")
+
+def tick(state: dict, instances: list, max_workers: int = 4, gpus_per_worker: int = 1, idle_pause: int = 600,
+         storage: int = 20, interval: float = 15):
+    """
+    Runs one scheduling pass: collects finished jobs, places queued ones, adds capacity and pauses idle workers.
+    The state is saved after every job started, so a pass that is cut short never starts that job again.
+    """
+    now = time.time()
+    _ingest(state)
+    jobs = state["jobs"]
+    workers = [i for i in instances if (i.name or "").startswith(WORKER_TAG_PREFIX)]
+    by_id = {str(w.machine_id): w for w in workers}
+    running_workers = [w for w in workers if w.status == "Running"]
+
+    # Worker time is what the jobs are paid for; gaps while the scheduler was stopped are not counted
+    if state["last_tick"]:
+        elapsed = min(now - state["last_tick"], interval * 2)
+        for worker in running_workers:
+            usage = state["usage"].setdefault(worker.gpu_type, [0.0, 0.0])
+            usage[0] += elapsed
+            usage[1] += elapsed * int(worker.num_gpus or 0)
+    state["last_tick"] = now
+
+    running = [j for j in jobs.values() if j["state"] == "running"]
+    running_by_worker = {}
+    for job in running:
+        running_by_worker.setdefault(job["machine_id"], []).append(job)
+
+    def collect(worker):
+        return worker, _poll(worker, running_by_worker[worker.machine_id])
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        polled = dict(executor.map(collect, [w for w in running_workers if w.machine_id in running_by_worker]))
+    for job in running:
+        worker = by_id.get(str(job["machine_id"]))
+        if worker is None or worker.status != "Running":
+            job["attempts"] += 1
+            retry = job["attempts"] < MAX_ATTEMPTS
+            job.update(state="queued" if retry else "failed", machine_id=None, gpu_ids=[],
+                       error=f"worker {job['machine_id']} was {worker.status.lower() if worker else 'lost'}")
+            console.print(f"[yellow]Job {job['id']} lost its worker; {'queued again' if retry else 'giving up'}.[/]")
+            continue
+        exit_code = polled.get(worker, {}).get(job["id"])
+        if job.get("cancel") and exit_code is None:
+            _ssh(worker, f"pkill -P {job.get('pid') or 0}; kill {job.get('pid') or 0}; echo 143 > {REMOTE_DIR}/{job['id']}/exit_code")
+            exit_code = 143
+        if exit_code is None:
+            continue
+        _fetch_log(job, worker)
+        state_name = "cancelled" if job.get("cancel") else ("done" if exit_code == 0 else "failed")
+        job.update(state=state_name, exit_code=exit_code, finished=now)
+        icon = {"done": "✅", "failed": "❌", "cancelled": "🛑"}[state_name]
+        console.print(f"{icon} Job {job['id']} ({job['name']}) {state_name} on worker {worker.machine_id} "
+                      f"after {now - job['started']:.0f}s (exit code {exit_code}).")
+
+    for job in jobs.values():
+        if job["state"] == "queued" and job.get("cancel"):
+            job.update(state="cancelled", finished=now)
+
+    running_by_worker = {}
+    for job in jobs.values():
+        if job["state"] == "running":
+            running_by_worker.setdefault(job["machine_id"], []).append(job)
+    queued = [j for j in jobs.values() if j["state"] == "queued"]
+    # A worker only takes jobs once sshd answers, not as soon as the API reports it Running
+    reachable = []
+    if queued and running_workers:
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(lambda w: probes.probe(w, "ssh"), running_workers))
+        reachable = [w for w, result in zip(running_workers, results) if all(ok for ok, _ in result.values())]
+    for job, worker, gpu_ids in _pack(queued, reachable, running_by_worker):
+        job.update(machine_id=worker.machine_id, gpu_ids=gpu_ids)
+        if _launch(job, worker):
+            job.update(state="running", started=time.time())
+            save_state(state)
+            running_by_worker.setdefault(worker.machine_id, []).append(job)
+            console.print(f"🚀 Started job {job['id']} ({job['name']}) on worker {worker.machine_id}, GPUs {gpu_ids}.")
+        else:
+            job.update(machine_id=None, gpu_ids=[])
+            console.print(f"[bold red]❌ Could not start job {job['id']} on worker {worker.machine_id}.[/]")
+
+    unplaced = [j for j in jobs.values() if j["state"] == "queued"]
+    if unplaced:
+        _provision(unplaced, workers, max_workers, gpus_per_worker, storage)
+
+    for worker in running_workers:
+        entry = state["workers"].setdefault(str(worker.machine_id), {"idle_since": None})
+        busy = worker.machine_id in running_by_worker or any(
+            j["gpu_type"] == worker.gpu_type and j["template"] == worker.template for j in unplaced)
+        if busy:
+            entry["idle_since"] = None
+            continue
+        entry["idle_since"] = entry["idle_since"] or now
+        if now - entry["idle_since"] >= idle_pause:
+            console.print(f"⏸️ [bold]Pausing worker {worker.machine_id}: idle for {now - entry['idle_since']:.0f}s.[/]")
+            worker.pause(wait=False)
+            entry["idle_since"] = None
+
+def run(interval: int = 15, once: bool = False, max_workers: int = 4, gpus_per_worker: int = 1,
+        idle_pause: int = 600, storage: int = 20):
+    """Runs the scheduler until interrupted, or for a single pass with once."""
+    while True:
+        spinner = show_spinner("Checking jobs and workers...")
+        next(spinner)
+        try:
+            instances = User.get_instances()
+        except Exception as e:
+            console.print(f"[bold red]Error fetching instances: {e}[/]")
+            instances = None
+        finally:
+            try:
+                next(spinner)
+            except StopIteration:
+                pass
+
+        if instances is not None:
+            with _Lock() as lock:
+                if not lock.acquired:
+                    console.print("[yellow]Another scheduler is running a pass; skipping this one.[/]")
+                    if once:
+                        return 1
+                else:
+                    state = load_state()
+                    try:
+                        tick(state, instances, max_workers=max_workers, gpus_per_worker=gpus_per_worker,
+                             idle_pause=idle_pause, storage=storage, interval=interval)
+                    except KeyboardInterrupt:
+                        save_state(state)
+                        console.print("[bright_magenta]Scheduler stopped. Running jobs keep going on their workers.[/]")
+                        return 0
+                    save_state(state)
+                    if once:
+                        return 0
+                    if not any(j["state"] not in FINISHED_STATES for j in state["jobs"].values()):
+                        console.print("[dim]Queue is empty; waiting for jobs.[/]")
+        elif once:
+            return 1
+        try:
+            time.sleep(interval)
+        except KeyboardInterrupt:
+            console.print("[bright_magenta]Scheduler stopped. Running jobs keep going on their workers.[/]")
+            return 0
+
+def list_jobs(show_all: bool = False):
+    """Shows queued and running jobs, and finished ones with show_all."""
+    jobs = all_jobs()
+    if not show_all:
+        jobs = [j for j in jobs if j["state"] not in FINISHED_STATES]
+    if not jobs:
+        console.print("[yellow]No jobs to show. Queue one with 'jarvis jobs submit <script>'.[/]")
+        return
+    display_jobs_table(jobs)
+
+def logs(job_id: str):
+    """Prints a job's log: the copy fetched when it finished, or the live log from its worker."""
+    try:
+        job = resolve_job(all_jobs(), job_id)
+    except ValueError as e:
+        console.print(f"[bold red]Error: {e}[/]")
+        return 1
+    local = os.path.join(JOBS_DIR, job["id"], "log")
+    if os.path.exists(local):
+        with open(local, 'r') as f:
+            console.out(f.read(), highlight=False, end="")
+        return 0
+    if job["state"] != "running":
+        console.print(f"[yellow]Job {job['id']} is {job['state']} and has no log yet.[/]")
+        return 0
+    worker = User.get_instance(instance_id=job["machine_id"])
+    if worker is None:
+        console.print(f"[bold red]Error: Worker {job['machine_id']} no longer exists.[/]")
+        return 1
+    code, out = _ssh(worker, f"cat {REMOTE_DIR}/{job['id']}/log")
+    console.out(out, highlight=False, end="")
+    return 0 if code == 0 else 1
+
+def set_prices(pairs: list):
+    """Stores hourly prices per GPU (e.g. A100=1.29), used to report jobs per dollar."""
+    prices = load_prices()
+    for pair in pairs:
+        gpu_type, _, value = pair.partition("=")
+        try:
+            prices[gpu_type.strip()] = float(value)
+        except ValueError:
+            console.print(f"[bold red]Error: Expected GPU=PRICE, e.g. A100=1.29, got '{pair}'.[/]")
+            return 1
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    with open(PRICES_FILE, 'w') as f:
+        json.dump(prices, f, indent=2)
+    console.print(f"[bold green]✅ Prices per GPU-hour: {', '.join(f'{k} ${v:.2f}' for k, v in sorted(prices.items()))}[/]")
+    return 0
+
+def stats():
+    """Shows throughput per GPU type: jobs per hour of worker time and, with prices set, jobs per dollar."""
+    state = load_state()
+    prices = load_prices()
+    rows = []
+    for gpu_type in sorted({j["gpu_type"] for j in state["jobs"].values()} | set(state["usage"])):
+        jobs = [j for j in state["jobs"].values() if j["gpu_type"] == gpu_type]
+        done = [j for j in jobs if j["state"] == "done"]
+        seconds, gpu_seconds = state["usage"].get(gpu_type, [0.0, 0.0])
+        busy = sum(j["gpus"] * (j["finished"] - j["started"]) for j in jobs if j["finished"] and j["started"])
+        cost = gpu_seconds / 3600 * prices[gpu_type] if gpu_type in prices else None
+        rows.append({
+            "gpu_type": gpu_type,
+            "done": len(done),
+            "failed": len([j for j in jobs if j["state"] == "failed"]),
+            "worker_hours": seconds / 3600,
+            "utilisation": busy / gpu_seconds if gpu_seconds else None,
+            "jobs_per_hour": len(done) / (seconds / 3600) if seconds else None,
+            "cost": cost,
+            "jobs_per_dollar": len(done) / cost if cost else None,
+        })
+    if not rows:
+        console.print("[yellow]No jobs have run yet.[/]")
+        return
+    display_jobs_stats(rows)
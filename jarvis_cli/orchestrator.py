@@ -1,14 +1,32 @@
+import fnmatch
+import os
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
 from rich.console import Console
 from .jlclient import jarvisclient
-from .jlclient.jarvisclient import User, Instance, FileSystem
+from .jlclient.jarvisclient import User, Instance, FileSystem, FS_READY_STATUSES
 from .visualisations import (
     display_instances_table, display_instances_for_selection, 
     display_templates_table, display_filesystems_table,
-    show_spinner, display_balance, show_operation_progress
+    show_spinner, display_balance, show_operation_progress, get_status_emoji,
+    display_scripts_table, display_script_details,
+    display_query_table, display_aggregate_table, display_stats_table,
+    display_ops_table, display_history_table, display_usage_table, display_state_at_table,
+    display_endpoint_table, provision_progress, display_balances_table, display_accounts_table,
+    upload_progress
 )
+from .jlclient.resolve import NameIndex, ResolveError
+from .jlclient.query import QueryError, filter_instances, sort_instances, project, aggregate
+from .jlclient import journal, ops, history, probes, endpoint, httpclient, prefetch, readiness, accounts
+from .remote import select_instances
 
 console = Console()
 
+# A list prefetched during a selection prompt is only trusted if it was fetched this recently
+PREFETCH_MAX_AGE = 30
+
 def set_token(token: str):
     """Sets the API token for the jarvisclient."""
     if not token:
@@ -16,43 +34,151 @@ def set_token(token: str):
         raise SystemExit(1)
     jarvisclient.token = token
 
-def list_instances():
-    """Fetches and displays all user instances."""
-    spinner = show_spinner("Fetching your instances...")
+def set_endpoint(endpoint_url: str = None):
+    """Applies --endpoint, probing candidate endpoints only when the cached choice is missing or stale."""
+    if endpoint_url or endpoint.needs_probe():
+        httpclient.configure(endpoint_url)
+
+def show_endpoint(endpoint_url: str = None, probe: bool = False):
+    """Shows which backend endpoint is used and why, the pool settings and, with probe, candidate latencies."""
+    config = endpoint.load_config()
+    value, _ = endpoint.setting(endpoint_url, config)
+    urls = endpoint.candidates(value, config)
+    latencies = {}
+    if probe:
+        spinner = show_spinner(f"Measuring {len(urls)} endpoint(s)...")
+        next(spinner)
+        try:
+            if len(urls) > 1:
+                _, latencies = endpoint.fastest(urls, refresh=True)
+            else:
+                latencies = endpoint.probe(urls)
+        finally:
+            try:
+                next(spinner)
+            except StopIteration:
+                pass
+    url, source = endpoint.resolve(endpoint_url, probe_latency=False)
+    display_endpoint_table(url, source, urls, latencies, endpoint.pool_settings())
+    return 0
+
+def fan_out_accounts(account: str, func, what: str):
+    """
+    Runs func(client) once per account of an --account list, concurrently, and reports accounts that failed.
+    Returns [(name, result, error)], or None if the list names an unknown account.
+    """
+    try:
+        selected = accounts.select(account)
+    except ValueError as e:
+        console.print(f"[bold red]Error: {e}[/]")
+        return None
+    spinner = show_spinner(f"Fetching {what} from {len(selected)} account(s)...")
     next(spinner)
     try:
-        instances = User.get_instances()
-        if instances:
-            display_instances_table(instances)
+        results = accounts.fan_out(selected, func)
+    finally:
+        try:
+            next(spinner)
+        except StopIteration:
+            pass
+    for name, _, error in results:
+        if error is not None:
+            console.print(f"[bold red]❌ Account '{name}' failed: {error}[/]")
+    return results
+
+def show_instances(instances: list, where: str = None, sort: str = None, columns: str = None, group_by: str = None,
+                   count: bool = False, plain: bool = False, show_account: bool = False):
+    """Displays instances, optionally filtered, sorted, projected or aggregated."""
+    try:
+        if where:
+            instances = filter_instances(instances, where)
+        if sort:
+            instances = sort_instances(instances, sort)
+        fields = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+        rows = project(instances, fields) if fields else None
+        groups = aggregate(instances, group_by) if group_by else None
+    except QueryError as e:
+        console.print(f"[bold red]Error: Invalid query: {e}[/]")
+        return
+
+    if groups is not None:
+        display_aggregate_table(group_by, groups)
+    elif count:
+        console.print(f"[bold]{len(instances)}[/] instance(s) match.")
+    elif not instances:
+        if where:
+            console.print("[bold yellow]No instances match your query.[/]")
         else:
             console.print("[bold yellow]No instances found yet :) You can create one with 'jarvis create'[/]")
+    elif rows is not None:
+        display_query_table(fields, rows, plain=plain)
+    else:
+        display_instances_table(instances, plain=plain, show_account=show_account)
+
+def list_instances(where: str = None, sort: str = None, columns: str = None, group_by: str = None, count: bool = False, plain: bool = False, account: str = None):
+    """Fetches and displays user instances, optionally filtered, sorted, projected or aggregated, across accounts with account."""
+    if account:
+        # Each account's list is a partial view of the merged one, so it isn't indexed or recorded as a whole fleet
+        results = fan_out_accounts(account, lambda client: client.User.get_instances(record=False), "instances")
+        if results is None:
+            return 1
+        instances = []
+        for name, result, _ in results:
+            for instance in result or []:
+                instance.account = name
+                instances.append(instance)
+        show_instances(instances, where, sort, columns, group_by, count, plain, show_account=True)
+        return 1 if any(error is not None for _, _, error in results) else 0
+
+    spinner = show_spinner("Fetching your instances...")
+    next(spinner)
+    try:
+        instances = User.get_instances()
     except Exception as e:
         console.print(f"[bold red]Error fetching instances: {e}[/]")
         console.print("[yellow]Please ensure your API token is correct and has the necessary permissions.[/]")
+        return
     finally:
         try:
             next(spinner)
         except StopIteration:
             pass
+    # Rendered once the spinner is gone, since large lists are handed to a pager
+    show_instances(instances, where, sort, columns, group_by, count, plain)
+
+def get_balance(account: str = None):
+    """Fetches and displays the user's account balance, or the balance of every account with account."""
+    if account:
+        results = fan_out_accounts(account, lambda client: client.User.get_balance(), "balances")
+        if results is None:
+            return 1
+        rows = []
+        for name, result, error in results:
+            if error is None and not (isinstance(result, dict) and 'balance' in result):
+                console.print(f"[yellow]Could not retrieve balance information for account '{name}'.[/]")
+            elif error is None:
+                rows.append((name, result['balance']))
+        if rows:
+            display_balances_table(rows)
+        return 0 if len(rows) == len(results) else 1
 
-def get_balance():
-    """Fetches and displays the user's account balance."""
     spinner = show_spinner("Fetching your account balance...")
     next(spinner)
     try:
         balance_info = User.get_balance()
-        if balance_info and 'balance' in balance_info:
-            balance = balance_info['balance']
-            display_balance(balance)
-        else:
-            console.print("[yellow]Could not retrieve balance information.[/]")
     except Exception as e:
         console.print(f"[bold red]Error fetching balance: {e}[/]")
+        return
     finally:
         try:
             next(spinner)
         except StopIteration:
             pass
+    if balance_info and 'balance' in balance_info:
+        balance = balance_info['balance']
+        display_balance(balance)
+    else:
+        console.print("[yellow]Could not retrieve balance information.[/]")
 
 def list_templates():
     """Fetches and displays all available framework templates."""
@@ -60,36 +186,43 @@ def list_templates():
     next(spinner)
     try:
         templates = User.get_templates()
-        if templates:
-            display_templates_table(templates)
-        else:
-            console.print("[yellow]No templates found.[/]")
     except Exception as e:
         console.print(f"[bold red]Error fetching templates: {e}[/]")
+        return
     finally:
         try:
             next(spinner)
         except StopIteration:
             pass
+    if templates:
+        display_templates_table(templates)
+    else:
+        console.print("[yellow]No templates found.[/]")
 
-def get_instance_by_id(instance_id: int) -> Instance:
-    """Retrieves a single instance by its machine ID."""
+def get_instance_by_id(instance_id) -> Instance:
+    """Retrieves a single instance by machine ID, name, ID prefix or a close match of its name."""
     spinner = show_spinner(f"Locating instance {instance_id}...")
     next(spinner)
     try:
-        instance = User.get_instance(instance_id=instance_id)
-        if not instance:
-            console.print(f"[bold red]Error: Instance with ID '{instance_id}' not found.[/]")
-            raise SystemExit(1)
-        return instance
+        instances = prefetch.take("instances", max_age=PREFETCH_MAX_AGE)
+        if instances is not None:
+            instance = NameIndex.from_instances(instances).resolve(instance_id)
+        else:
+            instance = User.resolve_instance(instance_id)
+    except ResolveError as e:
+        console.print(f"[bold red]Error: {e}[/]")
+        raise SystemExit(1)
     finally:
         try:
             next(spinner)
         except StopIteration:
             pass
+    if str(instance_id) not in (str(instance.machine_id), instance.name):
+        console.print(f"[dim]'{instance_id}' → {instance.name} ({instance.machine_id})[/]")
+    return instance
 
-def pause_instance(instance_id: int = None):
-    """Pauses a specific instance. If no ID is provided, it shows a selection list."""
+def pause_instance(instance_id: str = None, wait: bool = True):
+    """Pauses an instance given by ID, name or prefix. If none is provided, it shows a selection list."""
     if instance_id is None:
         try:
             spinner = show_spinner("Fetching running instances...")
@@ -106,6 +239,8 @@ def pause_instance(instance_id: int = None):
                 except StopIteration:
                     pass
 
+            # Refresh the instance list while the user reads it, so the lookup after the prompt is already answered
+            prefetch.start("instances", User.get_instances)
             display_instances_for_selection(running_instances)
             selection = console.input(
                 "[bold cyan]Enter the number (1-" + str(len(running_instances)) + ") of the instance to pause (or 'c' to cancel): [/]"
@@ -130,20 +265,24 @@ def pause_instance(instance_id: int = None):
             return
     
     instance = get_instance_by_id(instance_id)
+    instance_id = instance.machine_id
     if instance.status != "Running":
         console.print(f"[yellow]Instance {instance_id} is already in '{instance.status}' state.[/]")
         return
     
     console.print(f"⏸️ [bold]Pausing instance {instance_id}...[/]")
-    show_operation_progress(f"Pausing instance {instance_id}")
+    if wait:
+        show_operation_progress(f"Pausing instance {instance_id}")
     
-    response = instance.pause()
-    if response.get('success'):
+    response = instance.pause(wait=wait)
+    if response.get('success') and not wait:
+        print_submitted("Pause", instance)
+    elif response.get('success'):
         console.print(f"[bold green]✅ Successfully paused instance {instance_id}.[/]")
     else:
         console.print(f"[bold red]❌ Failed to pause instance {instance_id}: {response.get('error_message', 'Unknown error')}[/]")
 
-def resume_instance(instance_id: int = None, gpu_type: str = None, num_gpus: int = None, num_cpus: int = None, storage: int = None, fs_id: str = None):
+def resume_instance(instance_id: str = None, gpu_type: str = None, num_gpus: int = None, num_cpus: int = None, storage: int = None, fs_id: str = None, script: str = None, script_args: str = None, wait: bool = True, ready: str = "api", ready_timeout: int = 300):
     """Resumes a specific instance, with optional modifications. If no ID is provided, it shows a selection list."""
     if instance_id is None:
         try:
@@ -161,6 +300,8 @@ def resume_instance(instance_id: int = None, gpu_type: str = None, num_gpus: int
                 except StopIteration:
                     pass
 
+            # Refresh the instance list while the user reads it, so the lookup after the prompt is already answered
+            prefetch.start("instances", User.get_instances)
             display_instances_for_selection(paused_instances)
             selection = console.input(
                 "[bold cyan]Enter the number (1-" + str(len(paused_instances)) + ") of the instance to resume (or 'c' to cancel): [/]"
@@ -185,6 +326,7 @@ def resume_instance(instance_id: int = None, gpu_type: str = None, num_gpus: int
             return
 
     instance = get_instance_by_id(instance_id)
+    instance_id = instance.machine_id
     if instance.status != "Paused":
         console.print(f"[yellow]Instance {instance_id} is not paused. Current state: '{instance.status}'.[/]")
         return
@@ -195,28 +337,44 @@ def resume_instance(instance_id: int = None, gpu_type: str = None, num_gpus: int
     if num_cpus: changes.append(f"CPU count to {num_cpus}")
     if storage: changes.append(f"Storage to {storage}GB")
     if fs_id: changes.append(f"Attaching filesystem {fs_id}")
+    if script: changes.append(f"Running startup script {script}")
+
+    script_id = None
+    if script:
+        script_id = resolve_script(script)
+        if script_id is None:
+            return
     
     change_msg = ""
     if changes:
         change_msg = f" with changes: {', '.join(changes)}"
         
     console.print(f"▶️ [bold]Resuming instance {instance_id}{change_msg}...[/]")
-    show_operation_progress(f"Resuming instance {instance_id}")
-
-    response = instance.resume(
-        gpu_type=gpu_type,
-        num_gpus=num_gpus,
-        num_cpus=num_cpus,
-        storage=storage,
-        fs_id=fs_id
-    )
-    if isinstance(response, Instance):
+    with waiting_progress(f"Resuming instance {instance_id}", "resume", gpu_type or instance.gpu_type, instance.template, wait) as on_progress:
+        response = instance.resume(
+            gpu_type=gpu_type,
+            num_gpus=num_gpus,
+            num_cpus=num_cpus,
+            storage=storage,
+            fs_id=fs_id,
+            script_id=script_id,
+            script_args=script_args,
+            wait=wait,
+            ready=ready,
+            ready_timeout=ready_timeout,
+            on_progress=on_progress
+        )
+    if isinstance(response, Instance) and not wait:
+        print_submitted("Resume", response)
+    elif isinstance(response, Instance):
         console.print(f"[bold green]✅ Successfully resumed instance {instance_id}. New status: {response.status}[/]")
+        print_readiness(response, ready)
+        return 1 if response.ready is False else 0
     else:
         console.print(f"[bold red]❌ Failed to resume instance {instance_id}: {response.get('error_message', 'Unknown error')}[/]")
 
 
-def destroy_instance(instance_id: int = None):
+def destroy_instance(instance_id: str = None, wait: bool = True):
     """Destroys an instance. If no ID is provided, it shows a selection list."""
     if instance_id is None:
         try:
@@ -233,6 +391,7 @@ def destroy_instance(instance_id: int = None):
                 except StopIteration:
                     pass
 
+            prefetch.start("instances", User.get_instances)
             display_instances_for_selection(instances)
             selection = console.input(
                 "[bold cyan]Enter the number (1-" + str(len(instances)) + ") of a single instance to destroy (or 'c' to cancel): [/]"
@@ -256,29 +415,104 @@ def destroy_instance(instance_id: int = None):
             console.print(f"[bold red]An unexpected error occurred: {e}[/]")
             return
 
+    # Resolve first so that a name or prefix is confirmed as the instance it actually matched
+    instance = get_instance_by_id(instance_id)
+    instance_id = instance.machine_id
+
     console.print(f"[bold red]⚠️  Warning: This action is irreversible! ⚠️[/]")
-    confirmation = console.input(f"[bold bright_white]Are you sure you want to destroy instance {instance_id}? (y/n): [/]")
+    confirmation = console.input(f"[bold bright_white]Are you sure you want to destroy instance {instance_id} ({instance.name})? (y/n): [/]")
     
     if confirmation.lower() != 'y':
         console.print("[bright_magenta]Instance destruction cancelled.[/]")
         return
 
     console.print(f"🗑️ [bold]Destroying instance {instance_id}...[/]")
-    show_operation_progress(f"Destroying instance {instance_id}")
-    
-    instance = get_instance_by_id(instance_id)
-    if not instance:
-        return 
+    if wait:
+        show_operation_progress(f"Destroying instance {instance_id}")
 
-    response = instance.destroy()
+    response = instance.destroy(wait=wait)
     
-    if response.get('success'):
+    if response.get('success') and not wait:
+        print_submitted("Destroy", instance)
+    elif response.get('success'):
         console.print(f"[bold green]✅ Successfully destroyed instance {instance_id}.[/]")
     else:
         console.print(f"[bold red]❌ Failed to destroy instance {instance_id}: {response.get('error_message', 'Unknown error')}[/]")
 
-def create_instance(instance_type, name, storage, template, gpu_type, num_gpus, num_cpus, is_reserved, fs_id):
+@contextmanager
+def waiting_progress(label: str, operation: str, gpu_type: str, template: str, wait: bool = True):
+    """Shows an ETA from the time-to-ready model while a create or resume waits, and yields its on_progress callback."""
+    if not wait:
+        yield None
+        return
+    mean, _, samples = readiness.expect(operation, gpu_type, template)
+    with provision_progress(label, mean, samples) as update:
+        yield update
+
+def print_readiness(instance: Instance, ready: str):
+    """Reports the outcome of a readiness probe run after an instance became Running."""
+    if instance.ready is None:
+        return
+    if instance.ready:
+        console.print(f"[bold green]🔌 Instance {instance.machine_id} is reachable over {ready}.[/]")
+        return
+    console.print(f"[bold red]❌ Instance {instance.machine_id} is Running but not reachable over {ready}:[/]")
+    for target, (ok, detail) in instance.probe_results.items():
+        console.print(f"   {'✅' if ok else '❌'} {target}: {detail}")
+
+def wait_for_instances(selector: str, ready: str = "api", timeout: int = 600, interval: int = 5) -> int:
+    """Waits until every instance matching the selector is Running and passes the readiness probe."""
+    started = time.monotonic()
+    deadline = started + timeout
+    pending = None
+    while True:
+        try:
+            instances = User.get_instances()
+            selected = select_instances(instances, selector) if pending is None else [i for i in instances if i.machine_id in pending]
+        except Exception as e:
+            console.print(f"[bold red]Error: {e}[/]")
+            return 1
+        if pending is None:
+            pending = {i.machine_id for i in selected}
+        failed = [i for i in selected if i.status in ops.FAILED_STATUSES]
+        missing = pending - {i.machine_id for i in selected}
+        for instance in failed:
+            console.print(f"[bold red]❌ {instance.name} ({instance.machine_id}) is {instance.status}.[/]")
+        for machine_id in missing:
+            console.print(f"[bold red]❌ Instance {machine_id} no longer exists.[/]")
+        if failed or missing:
+            return 1
+        if all(i.status == "Running" for i in selected):
+            break
+        if time.monotonic() + interval > deadline:
+            waiting = ", ".join(f"{i.name} ({i.status})" for i in selected if i.status != "Running")
+            console.print(f"[bold red]❌ Timed out waiting for {waiting} to be Running.[/]")
+            return 1
+        time.sleep(interval)
+
+    def probe_one(instance):
+        if ready == "api":
+            return instance, True, {}
+        ok, results = probes.wait_until_ready(instance, ready, timeout=max(1, deadline - time.monotonic()))
+        return instance, ok, results
+
+    exit_code = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(16, len(selected)))) as executor:
+        for instance, ok, results in executor.map(probe_one, selected):
+            if ok:
+                console.print(f"[bold green]✅ {instance.name} ({instance.machine_id}) is ready over {ready} after {time.monotonic() - started:.1f}s.[/]")
+                continue
+            exit_code = 1
+            console.print(f"[bold red]❌ {instance.name} ({instance.machine_id}) is Running but not reachable over {ready}:[/]")
+            for target, (target_ok, detail) in results.items():
+                console.print(f"   {'✅' if target_ok else '❌'} {target}: {detail}")
+    return exit_code
+
+def create_instance(instance_type, name, storage, template, gpu_type, num_gpus, num_cpus, is_reserved, fs_id, script=None, script_args=None, wait=True, ready="api", ready_timeout=300):
     """Creates a new instance, with an interactive prompt if needed."""
+    if instance_type is None or name == "My-Jarvis-Instance":
+        # Fetch the template catalog while the user answers the prompts
+        prefetch.start("templates", User.get_templates)
     if instance_type is None:
         console.print("[bold cyan]Choose the type of instance to create:[/]")
         console.print("  [cyan]1. GPU[/] - For machine learning, deep learning, and GPU-accelerated workloads")
@@ -316,33 +550,59 @@ def create_instance(instance_type, name, storage, template, gpu_type, num_gpus,
     config_details.append(f"Mode: {instance_kind.upper()}")
     if fs_id:
         config_details.append(f"Filesystem: {fs_id}")
+    if script:
+        config_details.append(f"Startup script: {script}")
         
     console.print(f"\n[bold cyan]Creating new instance with configuration:[/]")
     for detail in config_details:
         console.print(f"  [bright_white]• {detail}[/]")
     
+    catalog = prefetch.take("templates", timeout=2)
+    if isinstance(catalog, list):
+        template_ids = [t.get('id') for t in catalog if isinstance(t, dict)]
+        if template_ids and template not in template_ids:
+            # The catalog may lag behind the backend, so leave the final word to the create request
+            console.print(f"[yellow]Warning: Template '{template}' is not in the catalog ({', '.join(template_ids)}). The backend may reject it.[/]")
+
+    script_id = None
+    if script:
+        script_id = resolve_script(script)
+        if script_id is None:
+            return
+
     console.print(f"\n{icon} [bold]Creating your {instance_kind} {instance_type} instance...[/]")
-    show_operation_progress(f"Creating {instance_type} instance '{name}'")
-    
+
     try:
-        instance = Instance.create(
-            instance_type=instance_type,
-            name=name,
-            storage=storage,
-            template=template,
-            gpu_type=gpu_type,
-            num_gpus=num_gpus,
-            num_cpus=num_cpus,
-            is_reserved=is_reserved,
-            fs_id=fs_id
-        )
+        model_gpu = gpu_type if instance_type == "gpu" else "CPU"
+        with waiting_progress(f"Creating {instance_type} instance '{name}'", "create", model_gpu, template, wait) as on_progress:
+            instance = Instance.create(
+                instance_type=instance_type,
+                name=name,
+                storage=storage,
+                template=template,
+                gpu_type=gpu_type,
+                num_gpus=num_gpus,
+                num_cpus=num_cpus,
+                is_reserved=is_reserved,
+                fs_id=fs_id,
+                script_id=script_id,
+                script_args=script_args,
+                wait=wait,
+                ready=ready,
+                ready_timeout=ready_timeout,
+                on_progress=on_progress
+            )
 
-        if isinstance(instance, Instance):
+        if isinstance(instance, Instance) and not wait:
+            print_submitted("Create", instance)
+        elif isinstance(instance, Instance):
             console.print(f"[bold green]✅ Successfully created instance with name '{name}' and ID {instance.machine_id}.[/]")
             console.print(f"[cyan]Status:[/] [bright_white]{instance.status}[/]")
+            print_readiness(instance, ready)
             if instance.ssh_str:
                 console.print("[cyan]Connect using the following SSH command:[/]")
                 console.print(f"[bold black on bright_white] {instance.ssh_str} [/]")
+            return 1 if instance.ready is False else 0
         else:
             error_message = instance.get('error_message', 'Unknown error occurred.')
             console.print(f"[bold red]❌ Failed to create instance: {error_message}[/]")
@@ -350,61 +610,255 @@ def create_instance(instance_type, name, storage, template, gpu_type, num_gpus,
     except Exception as e:
         console.print(f"[bold red]❌ An unexpected error occurred during instance creation: {e}[/]")
 
-def list_filesystems():
-    """Lists all filesystems."""
+def resolve_script(script_path: str):
+    """Returns the script ID for a local startup script, uploading it only if its content is new."""
+    if not os.path.isfile(script_path):
+        console.print(f"[bold red]Error: Script '{script_path}' does not exist.[/]")
+        return None
+    try:
+        with upload_progress(f"Preparing startup script '{script_path}'") as on_progress:
+            return User.add_script(script_path, progress=on_progress)
+    except Exception as e:
+        console.print(f"[bold red]❌ Failed to upload script '{script_path}': {e}[/]")
+        return None
+
+def list_scripts():
+    """Fetches and displays all uploaded startup scripts."""
+    spinner = show_spinner("Fetching your scripts...")
+    next(spinner)
+    try:
+        scripts = User.get_scripts()
+    except Exception as e:
+        console.print(f"[bold red]Error fetching scripts: {e}[/]")
+        return
+    finally:
+        try:
+            next(spinner)
+        except StopIteration:
+            pass
+    if isinstance(scripts, dict):
+        scripts = scripts.get('scripts', [])
+    if scripts:
+        display_scripts_table(scripts)
+    else:
+        console.print("[bold yellow]No scripts found. Upload one using 'jarvis scripts upload'[/]")
+
+def upload_script(script_path: str, name: str = None, force: bool = False):
+    """Uploads a startup script unless the same content was uploaded before."""
+    if not os.path.isfile(script_path):
+        console.print(f"[bold red]Error: Script '{script_path}' does not exist.[/]")
+        return
+    try:
+        with upload_progress(f"Uploading script '{script_path}'") as on_progress:
+            script_id = User.add_script(script_path, script_name=name, progress=on_progress, force=force)
+    except Exception as e:
+        console.print(f"[bold red]❌ Failed to upload script: {e}[/]")
+        console.print("[yellow]If the backend no longer has this script, retry with --force.[/]")
+        return
+    console.print(f"[bold green]✅ Script '{script_path}' is available with ID: {script_id}[/]")
+    console.print(f"[cyan]Use it with:[/] jarvis create --script {script_path}")
+
+def show_script(script_id: str):
+    """Displays the details of one uploaded script."""
+    spinner = show_spinner(f"Fetching script {script_id}...")
+    next(spinner)
+    try:
+        scripts = User.get_scripts()
+        if isinstance(scripts, dict):
+            scripts = scripts.get('scripts', [])
+        matches = [s for s in scripts if str(s.get('script_id', s.get('id'))) == str(script_id)]
+    except Exception as e:
+        console.print(f"[bold red]Error fetching scripts: {e}[/]")
+        return
+    finally:
+        try:
+            next(spinner)
+        except StopIteration:
+            pass
+    if not matches:
+        console.print(f"[bold red]Error: Script with ID '{script_id}' not found.[/]")
+        return
+    display_script_details(matches[0])
+
+def list_filesystems(account: str = None):
+    """Lists all filesystems, across accounts with account."""
+    if account:
+        results = fan_out_accounts(account, lambda client: client.FileSystem().list(index=False), "filesystems")
+        if results is None:
+            return 1
+        filesystems = [dict(fs, account=name) for name, result, _ in results for fs in result or []]
+        if filesystems:
+            display_filesystems_table(filesystems, show_account=True)
+        else:
+            console.print("[bold yellow]No filesystems found in these accounts.[/]")
+        return 1 if any(error is not None for _, _, error in results) else 0
+
     spinner = show_spinner("Fetching your filesystems...")
     next(spinner)
     try:
         fs = FileSystem()
         filesystems = fs.list()
-        if filesystems:
-            display_filesystems_table(filesystems)
-        else:
-            console.print("[bold yellow]No filesystems found. Create one using 'jarvis fs create'[/]")
     except Exception as e:
         console.print(f"[bold red]Error fetching filesystems: {e}[/]")
+        return
     finally:
         try:
             next(spinner)
         except StopIteration:
             pass
+    if filesystems:
+        display_filesystems_table(filesystems)
+    else:
+        console.print("[bold yellow]No filesystems found. Create one using 'jarvis fs create'[/]")
+
+def select_filesystems(filesystems: list, selectors: list) -> list:
+    """Selects filesystems by ID, name or name glob. Each selector may be a comma-separated list."""
+    selected = []
+    seen = set()
+    for token in filter(None, (t.strip() for selector in selectors for t in selector.split(","))):
+        matches = [fs for fs in filesystems if str(fs.get('id')) == token]
+        if not matches:
+            matches = [fs for fs in filesystems if fnmatch.fnmatchcase(fs.get('fs_name') or "", token)]
+        if not matches:
+            raise ValueError(f"No filesystem matches '{token}'.")
+        for fs in matches:
+            if fs.get('id') not in seen:
+                seen.add(fs.get('id'))
+                selected.append(fs)
+    return selected
+
+def print_fs_submitted(operation: str, submitted: list):
+    """Tells the user filesystem operations were accepted and how to follow them up."""
+    console.print(f"[bold green]📨 {operation} request(s) accepted for {len(submitted)} filesystem(s) "
+                  f"(operation(s) {', '.join(submitted)}).[/]")
+    console.print("[cyan]Check on them later with[/] [bold]jarvis ops[/] [cyan]or wait for them with[/] [bold]jarvis ops --watch[/]")
 
-def create_filesystem(name: str, storage: int):
-    """Creates a new filesystem."""
-    console.print(f"💾 [bold]Creating filesystem '{name}' with {storage}GB storage...[/]")
-    show_operation_progress(f"Creating filesystem '{name}'")
+def create_filesystem(names: list, storage: int, wait: bool = False, timeout: int = 300, parallel: int = 8,
+                      no_wait: bool = False) -> int:
+    """
+    Creates one or more filesystems concurrently, optionally waiting until they are Ready.
+    With no_wait, accepted creates are recorded in the ops ledger instead.
+    """
+    names = [n for name in names for n in name.split(",") if n]
+    label = f"filesystem '{names[0]}'" if len(names) == 1 else f"{len(names)} filesystems"
+    console.print(f"💾 [bold]Creating {label} with {storage}GB storage each...[/]")
+    if not no_wait:
+        show_operation_progress(f"Creating {label}")
+
+    def create_one(name):
+        started = time.perf_counter()
+        try:
+            return name, FileSystem().create(fs_name=name, storage=storage), time.perf_counter() - started
+        except Exception as e:
+            return name, {'error_message': str(e)}, time.perf_counter() - started
+
+    created = {}
+    submitted = []
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(parallel, len(names)))) as executor:
+        for name, response, seconds in executor.map(create_one, names):
+            if response and 'id' in response:
+                created[str(response['id'])] = name
+                console.print(f"[bold green]✅ Successfully created filesystem '{name}' with ID: {response['id']}[/]")
+                if no_wait:
+                    submitted.append(ops.submit("fs-create", response['id'], name=name, request_seconds=seconds))
+            else:
+                failed += 1
+                console.print(f"[bold red]❌ Failed to create filesystem '{name}'. Response: {response}[/]")
+    if submitted:
+        print_fs_submitted("Create", submitted)
+
+    if wait and created:
+        def on_update(fs_id, status):
+            console.print(f"   {get_status_emoji(status)} '{created[fs_id]}' ({fs_id}) is {status}")
+
+        console.print(f"⏳ [bold]Waiting for {len(created)} filesystem(s) to become Ready...[/]")
+        try:
+            statuses = FileSystem().wait_until_ready(list(created), timeout=timeout, on_update=on_update)
+        except Exception as e:
+            console.print(f"[bold red]❌ Error waiting for filesystems: {e}[/]")
+            return 1
+        not_ready = [fs_id for fs_id, status in statuses.items() if status not in FS_READY_STATUSES]
+        if not_ready:
+            for fs_id in not_ready:
+                console.print(f"[bold red]❌ '{created[fs_id]}' ({fs_id}) is not Ready: {statuses[fs_id] or 'not listed'}.[/]")
+            failed += len(not_ready)
+        else:
+            console.print(f"[bold green]✅ {label[0].upper() + label[1:]} ready.[/]")
+    return 1 if failed else 0
+
+def delete_filesystem(selectors: list, parallel: int = 8, no_wait: bool = False) -> int:
+    """
+    Deletes every filesystem matching the selectors after one confirmation, refusing attached ones.
+    With no_wait, accepted deletes are recorded in the ops ledger until the filesystems are gone.
+    """
+    spinner = show_spinner("Fetching your filesystems and instances...")
+    next(spinner)
     try:
         fs = FileSystem()
-        response = fs.create(fs_name=name, storage=storage)
-        if response and 'id' in response:
-            console.print(f"[bold green]✅ Successfully created filesystem '{name}' with ID: {response['id']}[/]")
-        else:
-            console.print(f"[bold red]❌ Failed to create filesystem. Response: {response}[/]")
+        # Both lookups are independent, so they go out together
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            listed = executor.submit(fs.list)
+            attached = executor.submit(fs.attachments)
+            filesystems, attached = listed.result() or [], attached.result()
+        selected = select_filesystems(filesystems, selectors)
     except Exception as e:
-        console.print(f"[bold red]❌ Error creating filesystem: {e}[/]")
+        console.print(f"[bold red]Error: {e}[/]")
+        return 1
+    finally:
+        try:
+            next(spinner)
+        except StopIteration:
+            pass
+
+    deletable = []
+    for filesystem in selected:
+        users = attached.get(str(filesystem.get('id')))
+        if users:
+            names = ", ".join(f"{i.name} ({i.machine_id}, {i.status})" for i in users)
+            console.print(f"[bold red]❌ Refusing to delete '{filesystem.get('fs_name')}' ({filesystem.get('id')}): it is attached to {names}.[/]")
+        else:
+            deletable.append(filesystem)
+    if not deletable:
+        return 1
 
-def delete_filesystem(fs_id: str):
-    """Deletes a filesystem."""
+    display_filesystems_table(deletable)
     console.print(f"[bold red]⚠️  Warning: This action is irreversible! ⚠️[/]")
-    confirmation = console.input(f"[bold bright_white]Are you sure you want to delete filesystem {fs_id}? (y/n): [/]")
+    what = f"filesystem {deletable[0].get('id')}" if len(deletable) == 1 else f"these {len(deletable)} filesystems"
+    confirmation = console.input(f"[bold bright_white]Are you sure you want to delete {what}? (y/n): [/]")
     if confirmation.lower() != 'y':
         console.print("[bright_magenta]Deletion cancelled.[/]")
-        return
-        
-    console.print(f"🗑️ [bold]Deleting filesystem {fs_id}...[/]")
-    show_operation_progress(f"Deleting filesystem {fs_id}")
-    
-    try:
-        fs = FileSystem()
-        response = fs.delete(fs_id=fs_id)
-        if response and response.get('status') == 'success':
-            console.print(f"[bold green]✅ Successfully deleted filesystem {fs_id}.[/]")
-        else:
-            console.print(f"[bold red]❌ Failed to delete filesystem {fs_id}. Response: {response}[/]")
-    except Exception as e:
-        console.print(f"[bold red]❌ Error deleting filesystem: {e}[/]")
+        return 0
 
-def rename_instance(instance_id: int = None, new_name: str = None):
+    console.print(f"🗑️ [bold]Deleting {what}...[/]")
+    if not no_wait:
+        show_operation_progress(f"Deleting {what}")
+
+    def delete_one(filesystem):
+        started = time.perf_counter()
+        try:
+            return filesystem, FileSystem().delete(fs_id=filesystem.get('id')), time.perf_counter() - started
+        except Exception as e:
+            return filesystem, {'error_message': str(e)}, time.perf_counter() - started
+
+    failed = len(selected) - len(deletable)
+    submitted = []
+    with ThreadPoolExecutor(max_workers=max(1, min(parallel, len(deletable)))) as executor:
+        for filesystem, response, seconds in executor.map(delete_one, deletable):
+            if response and response.get('status') == 'success':
+                if no_wait:
+                    submitted.append(ops.submit("fs-delete", filesystem.get('id'), name=filesystem.get('fs_name'),
+                                                request_seconds=seconds))
+                else:
+                    console.print(f"[bold green]✅ Successfully deleted filesystem {filesystem.get('id')}.[/]")
+            else:
+                failed += 1
+                console.print(f"[bold red]❌ Failed to delete filesystem {filesystem.get('id')}. Response: {response}[/]")
+    if submitted:
+        print_fs_submitted("Delete", submitted)
+    return 1 if failed else 0
+
+def rename_instance(instance_id: str = None, new_name: str = None):
     """Renames an instance by storing a custom name for it."""
     if instance_id is None:
         try:
@@ -421,6 +875,7 @@ def rename_instance(instance_id: int = None, new_name: str = None):
                 except StopIteration:
                     pass
 
+            prefetch.start("instances", User.get_instances)
             display_instances_for_selection(instances)
             selection = console.input(
                 "[bold cyan]Enter the number (1-" + str(len(instances)) + ") of the instance to rename (or 'c' to cancel): [/]"
@@ -445,8 +900,7 @@ def rename_instance(instance_id: int = None, new_name: str = None):
             return
     
     instance = get_instance_by_id(instance_id)
-    if not instance:
-        return
+    instance_id = instance.machine_id
         
     if not new_name:
         current_name = instance.name
@@ -462,4 +916,197 @@ def rename_instance(instance_id: int = None, new_name: str = None):
         save_instance_name(instance_id, new_name)
         console.print(f"[bold green]✅ Successfully renamed instance {instance_id} to '{new_name}'.[/]")
     except Exception as e:
-        console.print(f"[bold red]❌ Failed to rename instance: {e}[/]") 
\ No newline at end of file
+        console.print(f"[bold red]❌ Failed to rename instance: {e}[/]") 
+
+def show_stats(windows: str = "7d", phase: str = None, by_gpu: bool = True):
+    """Shows p50/p90/p99 durations of past operations from the local journal, one table per window."""
+    now = time.time()
+    for window in [w.strip() for w in windows.split(",") if w.strip()]:
+        try:
+            seconds = journal.parse_window(window)
+        except ValueError as e:
+            console.print(f"[bold red]Error: {e}[/]")
+            return 1
+        entries = journal.read(since=None if seconds is None else now - seconds)
+        if not entries:
+            console.print(f"[yellow]No operations recorded in the {'journal' if seconds is None else 'last ' + window}. Stats appear after you create, resume, pause or destroy instances.[/]")
+            continue
+        display_stats_table(journal.summarise(entries, by_gpu=by_gpu, phase=phase), window, phase)
+    return 0
+
+def print_submitted(operation: str, instance: Instance):
+    """Tells the user an operation was accepted and how to follow it up."""
+    console.print(f"[bold green]📨 {operation} request accepted for instance {instance.machine_id} (operation {instance.op_id}).[/]")
+    console.print("[cyan]Check on it later with[/] [bold]jarvis ops[/] [cyan]or wait for it with[/] [bold]jarvis ops --watch[/]")
+
+def show_ops(watch: bool = False, interval: int = 10, clear: bool = False):
+    """Reconciles operations submitted with --no-wait against one instance listing and shows their state."""
+    if clear:
+        removed = ops.clear()
+        console.print(f"[bold green]🧹 Removed {removed} finished operation(s) from the ledger.[/]")
+        return 0
+    recorded = ops.load()
+    if not recorded:
+        console.print("[yellow]No operations recorded. Use --no-wait with create, resume, pause, destroy, fs create or fs delete to track them here.[/]")
+        return 0
+    # Only operations that were still pending decide the exit code, so old failures don't fail every run
+    watched = {op['op_id'] for op in recorded if op['state'] == "pending"}
+
+    while True:
+        spinner = show_spinner("Checking pending operations...")
+        next(spinner)
+        try:
+            pending = ops.pending()
+            if pending:
+                # Each listing is only fetched when an operation of its kind is still pending
+                instance_pending = any(op['op'] not in ops.FS_OPERATIONS for op in pending)
+                fs_pending = any(op['op'] in ops.FS_OPERATIONS for op in pending)
+                tracked = ops.reconcile(User.get_instances() if instance_pending else [],
+                                        FileSystem().list(index=False) if fs_pending else None)
+            else:
+                tracked = ops.load()
+        except Exception as e:
+            console.print(f"[bold red]Error fetching instances: {e}[/]")
+            return 1
+        finally:
+            try:
+                next(spinner)
+            except StopIteration:
+                pass
+        display_ops_table(tracked)
+        waiting = [op for op in tracked if op['state'] == "pending"]
+        if not watch or not waiting:
+            break
+        console.print(f"[cyan]{len(waiting)} operation(s) still pending. Checking again in {interval}s (Ctrl+C to stop)...[/]")
+        try:
+            time.sleep(interval)
+        except KeyboardInterrupt:
+            console.print("[bright_magenta]Stopped watching.[/]")
+            return 0
+    return 1 if any(op['state'] == "failed" and op['op_id'] in watched for op in tracked) else 0
+
+def parse_time(text: str) -> float:
+    """Parses 'HH:MM' (the most recent such time), 'YYYY-MM-DD HH:MM', 'YYYY-MM-DD' or a Unix timestamp."""
+    text = text.strip()
+    if text.replace(".", "", 1).isdigit() and len(text) > 8:
+        return float(text)
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M", "%Y-%m-%d"):
+        try:
+            return time.mktime(time.strptime(text, fmt))
+        except ValueError:
+            continue
+    try:
+        clock = time.strptime(text, "%H:%M")
+    except ValueError:
+        raise ValueError(f"Invalid time '{text}'. Use HH:MM, 'YYYY-MM-DD HH:MM' or a Unix timestamp.")
+    now = time.localtime()
+    t = time.mktime((now.tm_year, now.tm_mon, now.tm_mday, clock.tm_hour, clock.tm_min, 0, 0, 0, -1))
+    return t - 86400 if t > time.time() else t
+
+def set_history(enabled: bool):
+    """Turns local history recording on or off."""
+    history.set_enabled(enabled)
+    if enabled:
+        console.print("[bold green]✅ History recording enabled.[/] Instance state changes are recorded whenever jarvis fetches your instances.")
+        console.print("[cyan]Run[/] [bold]jarvis history --record --watch[/] [cyan](or the exporter or a guard) to record continuously.[/]")
+    else:
+        console.print("[bold green]✅ History recording disabled.[/] Recorded history is kept.")
+
+def record_history(watch: bool = False, interval: int = 300):
+    """Fetches instances once, or every interval seconds, so their state changes are recorded."""
+    if not history.is_enabled():
+        console.print("[yellow]History recording is disabled. Enable it with 'jarvis history --enable'.[/]")
+        return 1
+    while True:
+        try:
+            instances = User.get_instances()
+            console.print(f"[green]Recorded the state of {len(instances)} instance(s) at {time.strftime('%H:%M:%S')}.[/]")
+        except Exception as e:
+            console.print(f"[bold red]Error fetching instances: {e}[/]")
+        if not watch:
+            return 0
+        try:
+            time.sleep(interval)
+        except KeyboardInterrupt:
+            console.print("[bright_magenta]Stopped recording.[/]")
+            return 0
+
+def show_history(instance_id: str, days: int = None):
+    """Shows the recorded state transitions of one instance, given by machine ID or custom name."""
+    # History works offline, so names are resolved from the local name store and the last recorded state
+    index = NameIndex()
+    names = jarvisclient.load_instance_names()
+    for machine_id in set(names) | set(history.last_state()):
+        index.add(machine_id, (names.get(machine_id),), machine_id)
+    try:
+        instance_id = int(index.resolve(instance_id))
+    except ResolveError as e:
+        if not str(instance_id).isdigit():
+            console.print(f"[bold red]Error: {e}[/]")
+            return 1
+        instance_id = int(instance_id)
+    since = time.time() - days * 86400 if days else None
+    rows = history.machine_history(instance_id, since=since)
+    if not rows:
+        console.print(f"[yellow]No history recorded for instance {instance_id}.{'' if history.is_enabled() else ' Enable recording with jarvis history --enable.'}[/]")
+        return
+    display_history_table(instance_id, rows, name=jarvisclient.get_instance_name(instance_id))
+
+def show_usage(days: int = 7):
+    """Shows running instance-hours and GPU-hours per day and GPU type."""
+    end = time.time()
+    totals = history.running_hours(end - days * 86400, end)
+    if not totals:
+        console.print(f"[yellow]No running time recorded in the last {days} day(s).[/]")
+        return
+    display_usage_table(totals, days)
+
+def show_state_at(when: str):
+    """Shows which instances existed, and in which state, at a point in time."""
+    try:
+        t = parse_time(when)
+    except ValueError as e:
+        console.print(f"[bold red]Error: {e}[/]")
+        return 1
+    state = history.state_at(t)
+    if not state:
+        console.print(f"[yellow]No instances recorded at {time.strftime('%Y-%m-%d %H:%M', time.localtime(t))}.[/]")
+        return 0
+    display_state_at_table(t, state, jarvisclient.load_instance_names())
+    return 0
+
+def compact_history(keep_days: int):
+    """Drops recorded history older than keep_days."""
+    removed = history.compact(keep_days)
+    console.print(f"[bold green]🧹 Removed {removed} record(s) older than {keep_days} days.[/]")
+
+def add_account(name: str, token: str = None):
+    """Saves an API token under an account name, prompting for it (hidden) unless given."""
+    if not token:
+        token = console.input(f"[bold bright_white]API token for account '{name}': [/]", password=True).strip()
+    if not token:
+        console.print("[bold red]Error: No token given.[/]")
+        return 1
+    try:
+        accounts.add(name, token)
+    except ValueError as e:
+        console.print(f"[bold red]Error: {e}[/]")
+        return 1
+    console.print(f"[bold green]✅ Saved account '{name}'.[/] Query it with [bold]jarvis --account {name} list[/].")
+    return 0
+
+def remove_account(name: str):
+    """Forgets a saved account."""
+    if not accounts.remove(name):
+        console.print(f"[yellow]No account named '{name}'.[/]")
+        return 1
+    console.print(f"[bold green]✅ Removed account '{name}'.[/]")
+    return 0
+
+def list_accounts():
+    """Shows saved accounts with the end of their tokens."""
+    saved = accounts.load()
+    if not saved:
+        console.print("[yellow]No accounts saved yet. Save one with 'jarvis account add <name>'.[/]")
+        return
+    display_accounts_table(saved)
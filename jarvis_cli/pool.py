@@ -0,0 +1,417 @@
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+from rich.console import Console
+
+from .jlclient import jarvisclient, httpclient
+from .jlclient.jarvisclient import User, Instance, save_instance_name
+from .jlclient.resolve import ResolveError
+from .visualisations import show_spinner, display_pool_table
+
+console = Console()
+
+# Path for storing warm pool targets, next to the instance name store
+POOL_FILE = os.path.expanduser("~/.jarvislabs/pool.json")
+# Pool members are tagged in the name store with this prefix followed by the spec key
+POOL_TAG_PREFIX = "pool:"
+# Seconds an acquire waits for another acquire to finish claiming a member of the same pool
+CLAIM_TIMEOUT = 30
+
+SPEC_ALIASES = {
+    "gpu": "gpu_type",
+    "gpu_type": "gpu_type",
+    "gpus": "num_gpus",
+    "num_gpus": "num_gpus",
+    "cpus": "num_cpus",
+    "num_cpus": "num_cpus",
+    "template": "template",
+    "storage": "storage",
+    "fs": "fs_id",
+    "fs_id": "fs_id",
+}
+
+def parse_spec(spec: str) -> dict:
+    """Parses a pool spec such as 'A100' or 'gpu=A100,gpus=2,template=pytorch,storage=50,fs=<id>'."""
+    parsed = {"gpu_type": "RTX5000", "num_gpus": 1, "num_cpus": 1, "template": "pytorch", "storage": 20, "fs_id": None}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        if "=" not in part:
+            parsed["gpu_type"] = part
+            continue
+        key, value = (s.strip() for s in part.split("=", 1))
+        field = SPEC_ALIASES.get(key.lower())
+        if field is None:
+            raise ValueError(f"Unknown pool spec field '{key}'. Use one of: {', '.join(sorted(SPEC_ALIASES))}")
+        if field in ("num_gpus", "num_cpus", "storage"):
+            value = int(value)
+        parsed[field] = value or None
+    if parsed["gpu_type"].upper() == "CPU":
+        parsed["gpu_type"] = "CPU"
+    return parsed
+
+def spec_key(spec: dict) -> str:
+    """Returns the canonical key used to identify a pool spec."""
+    if spec["gpu_type"] == "CPU":
+        key = f"CPUx{spec['num_cpus']}/{spec['template']}/{spec['storage']}GB"
+    else:
+        key = f"{spec['gpu_type']}x{spec['num_gpus']}/{spec['template']}/{spec['storage']}GB"
+    if spec.get("fs_id"):
+        key += f"/{spec['fs_id']}"
+    return key
+
+def pool_tag(key: str) -> str:
+    """Returns the name-store tag for members of a pool."""
+    return POOL_TAG_PREFIX + key
+
+def load_pools() -> dict:
+    """Load pool targets from file."""
+    try:
+        if os.path.exists(POOL_FILE):
+            with open(POOL_FILE, 'r') as f:
+                return json.load(f)
+    except Exception:
+        pass
+    return {}
+
+def save_pools(pools: dict):
+    """Save pool targets to persistent storage."""
+    tmp_file = POOL_FILE + ".tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(pools, f, indent=2)
+    os.replace(tmp_file, POOL_FILE)
+
+def resolve_pool(spec: str, pools: dict = None) -> tuple:
+    """Returns (key, spec dict) for a spec string or an existing pool key."""
+    pools = load_pools() if pools is None else pools
+    if spec in pools:
+        return spec, pools[spec]
+    parsed = parse_spec(spec)
+    key = spec_key(parsed)
+    return key, pools.get(key, parsed)
+
+def pool_members(key: str, instances: list) -> list:
+    """Returns the instances currently tagged as members of a pool."""
+    tag = pool_tag(key)
+    return [i for i in instances if jarvisclient.get_instance_name(i.machine_id) == tag]
+
+def matches_spec(instance: Instance, spec: dict) -> bool:
+    """Checks whether an existing instance was provisioned with the given spec."""
+    if instance.gpu_type != spec["gpu_type"] or instance.template != spec["template"]:
+        return False
+    if instance.hdd != spec["storage"] or str(instance.fs_id or "") != str(spec.get("fs_id") or ""):
+        return False
+    if spec["gpu_type"] == "CPU":
+        return instance.num_cpus == spec["num_cpus"]
+    return instance.num_gpus == spec["num_gpus"]
+
+def _create_member(key: str, spec: dict):
+    """Cold-creates one pool member and pauses it once it is running."""
+    instance = Instance.create(
+        instance_type="cpu" if spec["gpu_type"] == "CPU" else "gpu",
+        gpu_type=spec["gpu_type"],
+        num_gpus=spec["num_gpus"],
+        num_cpus=spec["num_cpus"],
+        template=spec["template"],
+        storage=spec["storage"],
+        name=pool_tag(key),
+        fs_id=spec.get("fs_id"),
+    )
+    if not isinstance(instance, Instance):
+        return instance
+    try:
+        response = instance.pause()
+    except Exception as e:
+        response = {'success': False, 'error_message': str(e)}
+    if not response.get('success'):
+        # A Running member would count as warming forever and keep billing, so it leaves the pool
+        save_instance_name(instance.machine_id, f"pool-unpaused-{instance.machine_id}")
+        console.print(f"[bold red]❌ Could not pause new pool member {instance.machine_id}; it was removed from the pool "
+                      f"and is still Running. Pause or destroy it with 'jarvis pause {instance.machine_id}'.[/]")
+    return response
+
+def set_pool(spec: str, size: int):
+    """Sets the target number of paused instances kept for a spec."""
+    if size < 0:
+        console.print("[bold red]Error: Pool size cannot be negative.[/]")
+        return
+    try:
+        pools = load_pools()
+        key, parsed = resolve_pool(spec, pools)
+        parsed["target"] = size
+        pools[key] = parsed
+        save_pools(pools)
+        console.print(f"[bold green]✅ Pool '{key}' will keep {size} paused instance(s).[/]")
+        console.print("[cyan]Run 'jarvis pool fill' to provision it now.[/]")
+    except ValueError as e:
+        console.print(f"[bold red]Error: {e}[/]")
+
+def remove_pool(spec: str):
+    """Stops tracking a pool. Existing members are left untouched."""
+    pools = load_pools()
+    try:
+        key, _ = resolve_pool(spec, pools)
+    except ValueError as e:
+        console.print(f"[bold red]Error: {e}[/]")
+        return
+    if key not in pools:
+        console.print(f"[yellow]No pool named '{key}'.[/]")
+        return
+    del pools[key]
+    save_pools(pools)
+    console.print(f"[bold green]✅ Removed pool '{key}'.[/] [yellow]Its paused instances were kept; destroy them with 'jarvis destroy' if no longer needed.[/]")
+
+def pool_status():
+    """Displays every pool with its target size and current members."""
+    pools = load_pools()
+    if not pools:
+        console.print("[bold yellow]No pools configured yet :) Set one up with 'jarvis pool set <spec> <size>'[/]")
+        return
+
+    spinner = show_spinner("Fetching pool members...")
+    next(spinner)
+    try:
+        instances = User.get_instances()
+    except Exception as e:
+        console.print(f"[bold red]Error fetching instances: {e}[/]")
+        return
+    finally:
+        try:
+            next(spinner)
+        except StopIteration:
+            pass
+
+    rows = []
+    for key, spec in pools.items():
+        members = pool_members(key, instances)
+        paused = sum(1 for i in members if i.status == "Paused")
+        rows.append({
+            "key": key,
+            "target": spec.get("target", 0),
+            "paused": paused,
+            "warming": len(members) - paused,
+            "deficit": max(spec.get("target", 0) - len(members), 0),
+        })
+    display_pool_table(rows)
+
+def _acquire_lock(key: str, purpose: str = "fill"):
+    """
+    Takes a per-pool lock file so that only one process at a time does the same thing to a pool:
+    "fill" is held by a replenisher, "claim" by an acquire while it picks and untags a member.
+    """
+    suffix = "" if purpose == "fill" else f"-{purpose}"
+    lock_file = os.path.join(os.path.dirname(POOL_FILE), f"pool-{hashlib.sha1(key.encode()).hexdigest()[:12]}{suffix}.lock")
+    # The PID is written before the lock appears, so another replenisher never reads an empty lock file
+    tmp_file = f"{lock_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'w') as f:
+        f.write(str(os.getpid()))
+    try:
+        for _ in range(2):
+            try:
+                os.link(tmp_file, lock_file)
+                return lock_file
+            except FileExistsError:
+                try:
+                    with open(lock_file) as f:
+                        os.kill(int(f.read().strip()), 0)
+                    return None
+                except ProcessLookupError:
+                    # Stale lock left behind by a dead replenisher
+                    try:
+                        os.remove(lock_file)
+                    except OSError:
+                        pass
+                except (ValueError, OSError):
+                    return None
+        return None
+    finally:
+        os.remove(tmp_file)
+
+def replenish(key: str, spec: dict) -> int:
+    """Creates and pauses instances until the pool reaches its target size. Returns the number created."""
+    lock_file = _acquire_lock(key)
+    if lock_file is None:
+        console.print(f"[yellow]Pool '{key}' is already being replenished by another process.[/]")
+        return 0
+    try:
+        members = pool_members(key, User.get_instances())
+        deficit = spec.get("target", 0) - len(members)
+        created = 0
+        for n in range(deficit):
+            console.print(f"⚡ [bold]Provisioning pool member {n + 1}/{deficit} for '{key}'...[/]")
+            response = _create_member(key, spec)
+            if response and response.get('success'):
+                created += 1
+            else:
+                console.print(f"[bold red]❌ Failed to provision pool member: {response.get('error_message', 'Unknown error') if response else 'Unknown error'}[/]")
+                break
+        return created
+    finally:
+        os.remove(lock_file)
+
+def fill_pools(spec: str = None, watch: bool = False, interval: int = 60):
+    """Replenishes one or all pools, optionally forever."""
+    while True:
+        pools = load_pools()
+        if spec is not None:
+            try:
+                key, _ = resolve_pool(spec, pools)
+            except ValueError as e:
+                console.print(f"[bold red]Error: {e}[/]")
+                return
+            if key not in pools:
+                console.print(f"[bold red]Error: No pool named '{key}'. Create it with 'jarvis pool set'.[/]")
+                return
+            pools = {key: pools[key]}
+
+        for key, pool_spec in pools.items():
+            try:
+                created = replenish(key, pool_spec)
+                if created:
+                    console.print(f"[bold green]✅ Added {created} paused instance(s) to pool '{key}'.[/]")
+            except Exception as e:
+                console.print(f"[bold red]Error replenishing pool '{key}': {e}[/]")
+
+        if not watch:
+            return
+        time.sleep(interval)
+
+def replenish_in_background(key: str):
+    """Starts a detached 'jarvis pool fill' so the caller does not wait for cold creates."""
+    # The endpoint in use is passed on so the child neither re-probes nor talks to a different backend
+    env = dict(os.environ, JARVISLABS_TOKEN=jarvisclient.token or "", JARVIS_ENDPOINT=httpclient.default.url)
+    subprocess.Popen(
+        [sys.executable, "-m", "jarvis_cli.cli", "pool", "fill", key],
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+def _return_to_pool(machine_id, key: str, name: str):
+    """Tags a member whose resume failed as a pool member again, if it is still Paused and still ours."""
+    try:
+        instance = next((i for i in User.get_instances() if i.machine_id == machine_id), None)
+    except Exception:
+        return
+    if instance is not None and instance.status == "Paused" and jarvisclient.get_instance_name(machine_id) == name:
+        save_instance_name(machine_id, pool_tag(key))
+
+def acquire(spec: str, name: str = None, replenish_after: bool = True):
+    """Resumes a paused pool member, falling back to a cold create when the pool is empty."""
+    pools = load_pools()
+    try:
+        key, pool_spec = resolve_pool(spec, pools)
+    except ValueError as e:
+        console.print(f"[bold red]Error: {e}[/]")
+        return None
+
+    name = name or f"{pool_spec['gpu_type']}-pool"
+    started = time.perf_counter()
+    spinner = show_spinner(f"Looking for a warm instance in '{key}'...")
+    next(spinner)
+    try:
+        # Fetching and untagging happen under the claim lock, so two acquires never pick the same member
+        deadline = time.time() + CLAIM_TIMEOUT
+        lock_file = _acquire_lock(key, "claim")
+        while lock_file is None and time.time() < deadline:
+            time.sleep(0.2)
+            lock_file = _acquire_lock(key, "claim")
+        if lock_file is None:
+            console.print(f"[bold red]Error: Another acquire has held pool '{key}' for over {CLAIM_TIMEOUT}s.[/]")
+            return None
+        try:
+            members = pool_members(key, User.get_instances())
+            paused = sorted((i for i in members if i.status == "Paused"), key=lambda i: i.machine_id)
+            candidate = paused[0] if paused else None
+            if candidate is not None:
+                # Untagged before the lock is released, so no other acquire or replenisher counts it as a member
+                save_instance_name(candidate.machine_id, name)
+        finally:
+            os.remove(lock_file)
+    except Exception as e:
+        console.print(f"[bold red]Error fetching instances: {e}[/]")
+        return None
+    finally:
+        try:
+            next(spinner)
+        except StopIteration:
+            pass
+
+    if candidate is not None:
+        console.print(f"▶️ [bold]Resuming warm instance {candidate.machine_id} from pool '{key}'...[/]")
+        try:
+            response = candidate.resume(name=name)
+        except Exception as e:
+            response = {'error_message': str(e)}
+        if not isinstance(response, Instance):
+            _return_to_pool(candidate.machine_id, key, name)
+            console.print(f"[bold red]❌ Failed to resume pooled instance {candidate.machine_id}: {response.get('error_message', 'Unknown error')}[/]")
+            return None
+        instance = response
+    else:
+        console.print(f"[yellow]Pool '{key}' has no paused instances, falling back to a cold create.[/]")
+        instance = Instance.create(
+            instance_type="cpu" if pool_spec["gpu_type"] == "CPU" else "gpu",
+            gpu_type=pool_spec["gpu_type"],
+            num_gpus=pool_spec["num_gpus"],
+            num_cpus=pool_spec["num_cpus"],
+            template=pool_spec["template"],
+            storage=pool_spec["storage"],
+            name=name,
+            fs_id=pool_spec.get("fs_id"),
+        )
+        if not isinstance(instance, Instance):
+            console.print(f"[bold red]❌ Failed to create instance: {instance.get('error_message', 'Unknown error')}[/]")
+            return None
+
+    # Resume keeps the machine ID stable, but be safe if the backend hands out a new one
+    save_instance_name(instance.machine_id, name)
+    elapsed = time.perf_counter() - started
+    console.print(f"[bold green]✅ Acquired instance '{name}' (ID {instance.machine_id}) in {elapsed:.1f}s.[/]")
+    if instance.ssh_str:
+        console.print("[cyan]Connect using the following SSH command:[/]")
+        console.print(f"[bold black on bright_white] {instance.ssh_str} [/]")
+
+    if replenish_after and key in pools and pools[key].get("target", 0) > 0:
+        replenish_in_background(key)
+    return instance
+
+def release(instance_id: str, spec: str = None):
+    """Pauses an instance, given by ID, name or prefix, and returns it to the pool matching its spec."""
+    pools = load_pools()
+    try:
+        instance = User.resolve_instance(instance_id)
+    except ResolveError as e:
+        console.print(f"[bold red]Error: {e}[/]")
+        return
+    instance_id = instance.machine_id
+
+    if spec is not None:
+        try:
+            key, _ = resolve_pool(spec, pools)
+        except ValueError as e:
+            console.print(f"[bold red]Error: {e}[/]")
+            return
+    else:
+        matching = [k for k, s in pools.items() if matches_spec(instance, s)]
+        if not matching:
+            console.print(f"[bold red]Error: No pool matches instance {instance_id}. Pass --spec to choose one.[/]")
+            return
+        key = matching[0]
+
+    if instance.status == "Running":
+        console.print(f"⏸️ [bold]Pausing instance {instance_id} back into pool '{key}'...[/]")
+        response = instance.pause()
+        if not response.get('success'):
+            console.print(f"[bold red]❌ Failed to pause instance {instance_id}: {response.get('error_message', 'Unknown error')}[/]")
+            return
+    elif instance.status != "Paused":
+        console.print(f"[yellow]Instance {instance_id} is in '{instance.status}' state and cannot be pooled.[/]")
+        return
+
+    save_instance_name(instance_id, pool_tag(key))
+    console.print(f"[bold green]✅ Instance {instance_id} returned to pool '{key}'.[/]")
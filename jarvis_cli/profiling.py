@@ -0,0 +1,238 @@
+'''
+Support for the global --profile option.
+
+A profiled run writes, next to each other:
+    <base>.prof    cProfile data, readable with `python -m pstats` or snakeviz
+    <base>.folded  sampled stacks in flamegraph "folded" format (with --profile-sample)
+    <base>.json    wall-clock breakdown (imports, parsing, network, decode, render) and import times
+and prints a short summary to stderr so the command's own output stays usable.
+'''
+import cProfile
+import json
+import os
+import pstats
+import re
+import subprocess
+import sys
+import threading
+import time
+
+from rich.console import Console
+from rich.table import Table, Column
+from rich import box
+
+from .jlclient import metrics, codec
+
+PROFILE_DIR = os.path.expanduser("~/.jarvislabs/profiles")
+
+console = Console(stderr=True)
+
+class Sampler(threading.Thread):
+    """Samples the main thread's stack at a fixed interval. Cheap enough to leave running through long waits."""
+
+    def __init__(self, interval=0.005, root=None):
+        super().__init__(name="jarvis-profile-sampler", daemon=True)
+        self.interval = interval
+        # Frames from this code object upwards are the profiler's own and are left out of stacks
+        self.root = root
+        self.target = threading.main_thread().ident
+        self.stacks = {}
+        self.samples = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            stack = []
+            while frame is not None and frame.f_code is not self.root:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            key = ";".join(reversed(stack))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def folded(self):
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+    def top(self, n):
+        """Returns [(frame, own samples, total samples)] for the frames most often at the top of the stack."""
+        own = {}
+        inclusive = {}
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] = own.get(frames[-1], 0) + count
+            for frame in set(frames):
+                inclusive[frame] = inclusive.get(frame, 0) + count
+        return [(frame, count, inclusive[frame]) for frame, count in sorted(own.items(), key=lambda item: -item[1])[:n]]
+
+class _RenderTimer(object):
+    """Times everything written through rich consoles while a profile is running."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.depth = 0
+        self.original = None
+
+    def install(self):
+        timer = self
+        original = self.original = Console.print
+
+        def timed_print(console_self, *args, **kwargs):
+            timer.depth += 1
+            started = time.perf_counter()
+            try:
+                return original(console_self, *args, **kwargs)
+            finally:
+                timer.depth -= 1
+                if timer.depth == 0:
+                    timer.seconds += time.perf_counter() - started
+        Console.print = timed_print
+
+    def uninstall(self):
+        if self.original is not None:
+            Console.print = self.original
+
+def _client_seconds():
+    network = sum(total for total, _ in metrics.request_duration.snapshot().values())
+    decode = sum(total for total, _ in metrics.decode_duration.snapshot().values())
+    requests = sum(count for _, count in metrics.request_duration.snapshot().values())
+    return network, decode, requests
+
+def import_breakdown(top=10):
+    """Re-imports the CLI in a fresh interpreter with -X importtime and returns [(package, seconds)] by self time."""
+    try:
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import jarvis_cli.cli"],
+                                capture_output=True, text=True, timeout=60)
+    except (OSError, subprocess.SubprocessError):
+        return []
+    totals = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+)\s+\|\s+\d+\s+\|\s+(.+)$", line)
+        if match:
+            package = match.group(2).strip().split(".")[0]
+            totals[package] = totals.get(package, 0) + int(match.group(1)) / 1e6
+    return sorted(totals.items(), key=lambda item: -item[1])[:top]
+
+def _top_functions(profiler, n):
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        if filename == __file__:
+            continue
+        location = f"{os.path.basename(filename)}:{line}({name})" if line else name
+        rows.append((location, calls, tottime, cumtime))
+    rows.sort(key=lambda row: -row[3])
+    return rows[:n]
+
+def _redacted_argv():
+    """Returns the command line with the API token removed, since profiles get attached to bug reports."""
+    argv = []
+    hide = False
+    for arg in sys.argv[1:]:
+        if hide:
+            argv.append("***")
+            hide = False
+        elif arg == "--token":
+            argv.append(arg)
+            hide = True
+        elif arg.startswith("--token="):
+            argv.append("--token=***")
+        else:
+            argv.append(arg)
+    return argv
+
+def _default_base(command):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    return os.path.join(PROFILE_DIR, f"{command}-{time.strftime('%Y%m%d-%H%M%S')}")
+
+def profile_run(func, command, imports_seconds, parse_seconds, out=None, top=15, sample=False, interval=0.005):
+    """Runs func under the profiler, writes the profile files and prints a summary. Returns func's result."""
+    network_before, decode_before, requests_before = _client_seconds()
+    render = _RenderTimer()
+    render.install()
+    sampler = profiler = None
+    if sample:
+        sampler = Sampler(interval, root=profile_run.__code__)
+        sampler.start()
+    else:
+        profiler = cProfile.Profile()
+    started = time.perf_counter()
+    try:
+        if profiler:
+            return profiler.runcall(func)
+        return func()
+    finally:
+        total = time.perf_counter() - started
+        if sampler:
+            sampler.stop()
+        render.uninstall()
+        network_after, decode_after, requests_after = _client_seconds()
+        network = network_after - network_before
+        decode = decode_after - decode_before
+        breakdown = [
+            ("imports", imports_seconds),
+            ("argument parsing", parse_seconds),
+            ("network wait", network),
+            ("json decode", decode),
+            ("render", render.seconds),
+            ("other", max(0.0, total - network - decode - render.seconds)),
+        ]
+        _write_and_report(command, breakdown, requests_after - requests_before, profiler, sampler, out, top)
+
+def _write_and_report(command, breakdown, requests, profiler, sampler, out, top):
+    base = out or _default_base(command)
+    if base.endswith((".prof", ".json", ".folded")):
+        base = os.path.splitext(base)[0]
+    imports = import_breakdown()
+    written = []
+    if profiler:
+        profiler.dump_stats(base + ".prof")
+        written.append(base + ".prof")
+    if sampler:
+        with open(base + ".folded", 'w') as f:
+            f.write(sampler.folded())
+        written.append(base + ".folded")
+    with open(base + ".json", 'w') as f:
+        json.dump({
+            "command": command,
+            "argv": _redacted_argv(),
+            "breakdown": {name: round(seconds, 6) for name, seconds in breakdown},
+            "requests": requests,
+            "json_codec": codec.name_in_use,
+            "imports": {name: round(seconds, 6) for name, seconds in imports},
+            "samples": sampler.samples if sampler else None,
+        }, f, indent=2)
+    written.append(base + ".json")
+
+    table = Table(Column("Phase", style="cyan"), Column("Time", justify="right", style="green"),
+                  title="[bold]⏱️ Wall-clock Breakdown[/]", box=box.SIMPLE_HEAVY)
+    for name, seconds in breakdown:
+        label = f"{name} ({requests} requests)" if name == "network wait" else name
+        table.add_row(label, f"{seconds * 1000:.1f} ms")
+    console.print(table)
+
+    if profiler:
+        hot = Table(Column("Function", style="cyan", overflow="fold"), Column("Calls", justify="right"),
+                    Column("Own", justify="right"), Column("Cumulative", justify="right", style="green"),
+                    title=f"[bold]🔥 Top {top} Functions by Cumulative Time[/]", box=box.SIMPLE_HEAVY)
+        for location, calls, tottime, cumtime in _top_functions(profiler, top):
+            hot.add_row(location, str(calls), f"{tottime * 1000:.1f} ms", f"{cumtime * 1000:.1f} ms")
+        console.print(hot)
+    if sampler:
+        hot = Table(Column("Frame", style="cyan", overflow="fold"), Column("Own", justify="right", style="green"),
+                    Column("Total", justify="right"),
+                    title=f"[bold]🔥 Top {top} Frames by Samples ({sampler.samples} taken)[/]", box=box.SIMPLE_HEAVY)
+        for frame, count, total in sampler.top(top):
+            samples = max(sampler.samples, 1)
+            hot.add_row(frame, f"{100 * count / samples:.0f}%", f"{100 * total / samples:.0f}%")
+        console.print(hot)
+    if imports:
+        slow = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in imports[:5])
+        console.print(f"[cyan]Slowest imports:[/] {slow}")
+    for path in written:
+        console.print(f"[bold green]📄 Profile written to {path}[/]")
@@ -0,0 +1,180 @@
+import fnmatch
+import os
+import shlex
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from rich.console import Console
+from rich.markup import escape
+from rich.text import Text
+
+from .jlclient.jarvisclient import User, Instance
+from .jlclient.query import is_query, filter_instances
+from .jlclient.resolve import NameIndex
+from .visualisations import show_spinner, display_exec_results
+
+console = Console()
+
+# Directory holding the ssh ControlMaster sockets shared between invocations
+CONTROL_DIR = os.path.expanduser("~/.jarvislabs/ssh")
+PREFIX_STYLES = ["cyan", "magenta", "green", "yellow", "blue", "bright_red", "bright_cyan", "bright_magenta"]
+
+def parse_ssh_str(ssh_str: str) -> list:
+    """Splits an instance's ssh_str (e.g. 'ssh -p 2222 root@host') into ssh arguments without the 'ssh' binary."""
+    parts = shlex.split(ssh_str or "")
+    if parts and os.path.basename(parts[0]) == "ssh":
+        parts = parts[1:]
+    if not parts:
+        raise ValueError(f"Invalid SSH command: '{ssh_str}'")
+    return parts
+
+def ssh_command(instance: Instance, remote_command: str = None, connect_timeout: int = 10, options: list = None) -> list:
+    """Builds the ssh argv for an instance, multiplexed over a persistent control connection."""
+    os.makedirs(CONTROL_DIR, mode=0o700, exist_ok=True)
+    argv = [
+        "ssh",
+        "-o", "BatchMode=yes",
+        "-o", "StrictHostKeyChecking=accept-new",
+        "-o", f"ConnectTimeout={connect_timeout}",
+        "-o", "ControlMaster=auto",
+        "-o", f"ControlPath={os.path.join(CONTROL_DIR, 'cm-%C')}",
+        "-o", "ControlPersist=120",
+    ]
+    for option in options or []:
+        argv += ["-o", option]
+    argv += parse_ssh_str(instance.ssh_str)
+    if remote_command is not None:
+        argv += ["--", remote_command]
+    return argv
+
+def select_instances(instances: list, selector: str) -> list:
+    """
+    Selects instances by a comma-separated list of machine IDs, names or name globs ('all' selects everything),
+    falling back to ID prefixes and close name matches for tokens that match nothing exactly,
+    or by a query expression such as "status=Running and gpu_type in (A100,A6000)".
+    """
+    if is_query(selector):
+        selected = filter_instances(instances, selector)
+        if not selected:
+            raise ValueError(f"No instance matches '{selector}'.")
+        return selected
+    selected = []
+    seen = set()
+    index = None
+    for token in filter(None, (t.strip() for t in selector.split(","))):
+        if token == "all":
+            matches = instances
+        elif token.isdigit():
+            matches = [i for i in instances if str(i.machine_id) == token]
+        else:
+            matches = [i for i in instances if fnmatch.fnmatchcase(i.name or "", token)]
+        if not matches and not any(c in token for c in "*?["):
+            # Plain tokens fall back to ID prefixes and close name matches; ambiguity raises ResolveError
+            index = index or NameIndex.from_instances(instances)
+            matches = [index.resolve(token)]
+        if not matches:
+            raise ValueError(f"No instance matches '{token}'.")
+        for instance in matches:
+            if instance.machine_id not in seen:
+                seen.add(instance.machine_id)
+                selected.append(instance)
+    return selected
+
+def _host_label(instance: Instance) -> str:
+    return instance.name or str(instance.machine_id)
+
+def run_on_instance(instance: Instance, remote_command: str, on_line=None, timeout: float = None,
+                    connect_timeout: int = 10, options: list = None) -> dict:
+    """Runs a command on one instance, calling on_line for each output line. Returns exit code and timing."""
+    started = time.perf_counter()
+    result = {"instance": instance, "exit_code": None, "duration": 0.0, "error": None}
+    try:
+        proc = subprocess.Popen(
+            ssh_command(instance, remote_command, connect_timeout=connect_timeout, options=options),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+    except (OSError, ValueError) as e:
+        result["error"] = str(e)
+        return result
+
+    timer = None
+    if timeout:
+        timer = threading.Timer(timeout, proc.kill)
+        timer.start()
+    try:
+        for raw in proc.stdout:
+            if on_line is not None:
+                on_line(instance, raw.decode(errors="replace").rstrip("\r\n"))
+        result["exit_code"] = proc.wait()
+    finally:
+        if timer is not None:
+            if not timer.is_alive():
+                result["error"] = f"Timed out after {timeout}s"
+            timer.cancel()
+    result["duration"] = time.perf_counter() - started
+    return result
+
+def run_on_instances(instances: list, remote_command: str, parallel: int = 16, on_line=None,
+                     timeout: float = None, connect_timeout: int = 10, options: list = None) -> list:
+    """Runs a command on many instances with at most `parallel` concurrent SSH sessions."""
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as executor:
+        futures = [
+            executor.submit(run_on_instance, instance, remote_command, on_line, timeout, connect_timeout, options)
+            for instance in instances
+        ]
+        return [f.result() for f in futures]
+
+def exec_command(selector: str, command: list, parallel: int = 16, timeout: float = None,
+                 connect_timeout: int = 10, options: list = None) -> int:
+    """Runs a command over SSH on every running instance matching the selector and prints prefixed output."""
+    if not command:
+        console.print("[bold red]Error: No command given. Usage: jarvis exec <selector> -- <command>[/]")
+        return 2
+    # A single argument is passed through untouched so that shell syntax like pipes keeps working
+    remote_command = command[0] if len(command) == 1 else shlex.join(command)
+
+    spinner = show_spinner("Fetching your instances...")
+    next(spinner)
+    try:
+        instances = User.get_instances()
+    except Exception as e:
+        console.print(f"[bold red]Error fetching instances: {e}[/]")
+        return 1
+    finally:
+        try:
+            next(spinner)
+        except StopIteration:
+            pass
+
+    try:
+        selected = select_instances(instances, selector)
+    except ValueError as e:
+        console.print(f"[bold red]Error: {e}[/]")
+        return 2
+
+    targets = [i for i in selected if i.status == "Running" and i.ssh_str]
+    for instance in selected:
+        if instance not in targets:
+            console.print(f"[yellow]Skipping {_host_label(instance)}: instance is '{instance.status}'.[/]")
+    if not targets:
+        console.print("[yellow]No running instances to run the command on.[/]")
+        return 1
+
+    width = max(len(_host_label(i)) for i in targets)
+    styles = {i.machine_id: PREFIX_STYLES[n % len(PREFIX_STYLES)] for n, i in enumerate(targets)}
+    print_lock = threading.Lock()
+
+    def on_line(instance, line):
+        prefix = Text(f"{_host_label(instance):<{width}} | ", style=styles[instance.machine_id])
+        with print_lock:
+            console.print(prefix + Text(line), soft_wrap=True)
+
+    console.print(f"🚀 [bold]Running '{escape(remote_command)}' on {len(targets)} instance(s)...[/]")
+    results = run_on_instances(targets, remote_command, parallel=parallel, on_line=on_line,
+                               timeout=timeout, connect_timeout=connect_timeout, options=options)
+    display_exec_results(results)
+    return 0 if all(r["exit_code"] == 0 and not r["error"] for r in results) else 1
@@ -0,0 +1,379 @@
+import gzip
+import hashlib
+import json
+import os
+import shlex
+import subprocess
+import tarfile
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from rich.console import Console
+from rich.markup import escape
+from rich.progress import Progress, TextColumn, BarColumn, DownloadColumn, TransferSpeedColumn, TimeRemainingColumn
+
+from .jlclient.jarvisclient import User
+from .remote import ssh_command, select_instances
+from .visualisations import show_spinner, display_sync_results, format_bytes
+
+console = Console()
+
+# Cache of local file hashes keyed by absolute path, reused while size and mtime are unchanged
+HASH_CACHE_FILE = os.path.expanduser("~/.jarvislabs/hash_cache.json")
+READ_CHUNK = 1024 * 1024
+
+def _load_hash_cache() -> dict:
+    try:
+        with open(HASH_CACHE_FILE, 'r') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def _save_hash_cache(cache: dict):
+    try:
+        tmp_file = HASH_CACHE_FILE + ".tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(cache, f)
+        os.replace(tmp_file, HASH_CACHE_FILE)
+    except Exception:
+        pass
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def local_manifest(root: str) -> dict:
+    """Returns {relative path: (absolute path, size, sha256)} for every regular file under root."""
+    root = os.path.abspath(root)
+    if os.path.isfile(root):
+        paths = {os.path.basename(root): root}
+    else:
+        paths = {}
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if os.path.isfile(path) and not os.path.islink(path):
+                    paths[os.path.relpath(path, root).replace(os.sep, "/")] = path
+
+    cache = _load_hash_cache()
+    stats = {rel: os.stat(path) for rel, path in paths.items()}
+    stale = [rel for rel, path in paths.items()
+             if cache.get(path, [None, None])[:2] != [stats[rel].st_size, stats[rel].st_mtime_ns]]
+
+    # hashlib releases the GIL on large buffers, so threads hash files in parallel
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+        for rel, digest in zip(stale, executor.map(lambda r: _sha256(paths[r]), stale)):
+            cache[paths[rel]] = [stats[rel].st_size, stats[rel].st_mtime_ns, digest]
+    if stale:
+        _save_hash_cache(cache)
+
+    return {rel: (path, stats[rel].st_size, cache[path][2]) for rel, path in paths.items()}
+
+def remote_path(path: str) -> str:
+    """Quotes a remote path for the shell while keeping a leading '~/' expandable."""
+    if path == "~":
+        return '"$HOME"'
+    if path.startswith("~/"):
+        return '"$HOME"/' + shlex.quote(path[2:])
+    return shlex.quote(path)
+
+def remote_manifest(instance, path: str, options: list = None) -> dict:
+    """Returns {relative path: sha256} for every file under a directory on the instance."""
+    command = f"cd {remote_path(path)} 2>/dev/null && find . -type f -print0 | xargs -0 -r sha256sum"
+    proc = subprocess.run(ssh_command(instance, command, options=options),
+                          stdin=subprocess.DEVNULL, capture_output=True)
+    # A missing directory is an empty manifest; ssh itself failing is exit code 255
+    if proc.returncode == 255:
+        raise RuntimeError(proc.stderr.decode(errors="replace").strip() or "SSH connection failed")
+    manifest = {}
+    for line in proc.stdout.decode(errors="replace").splitlines():
+        digest, _, rel = line.partition("  ")
+        if rel.startswith("./"):
+            manifest[rel[2:]] = digest
+    return manifest
+
+def split_streams(files: list, sizes: dict, streams: int) -> list:
+    """Partitions files into at most `streams` batches of roughly equal total size."""
+    batches = [[] for _ in range(max(1, min(streams, len(files))))]
+    totals = [0] * len(batches)
+    for rel in sorted(files, key=lambda r: sizes[r], reverse=True):
+        slot = totals.index(min(totals))
+        batches[slot].append(rel)
+        totals[slot] += sizes[rel]
+    return [b for b in batches if b]
+
+class _TeeWriter(object):
+    """File-like sink that writes one stream to the stdin of several ssh processes."""
+
+    def __init__(self, targets: dict):
+        self.targets = dict(targets)
+        self.failed = {}
+        self.bytes_written = 0
+
+    def write(self, data):
+        for key, proc in list(self.targets.items()):
+            try:
+                proc.stdin.write(data)
+            except (BrokenPipeError, OSError) as e:
+                self.failed[key] = str(e) or "Connection closed"
+                del self.targets[key]
+        self.bytes_written += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+class _ProgressReader(object):
+    """Wraps a file so that reads advance a progress task."""
+
+    def __init__(self, f, progress, task):
+        self.f, self.progress, self.task = f, progress, task
+
+    def read(self, size=-1):
+        data = self.f.read(size)
+        self.progress.update(self.task, advance=len(data))
+        return data
+
+def _error_text(stderr, returncode) -> str:
+    """Returns what a finished process wrote to its stderr temp file, or its exit code if that was nothing."""
+    stderr.seek(0)
+    return stderr.read().decode(errors="replace").strip() or f"exit code {returncode}"
+
+def _push_stream(batch, manifest, instances, dest, compress, progress, task, options, compress_level=6):
+    """Sends one tar stream to every instance at once, reading each local file a single time."""
+    extract = f"mkdir -p {remote_path(dest)} && tar -x{'z' if compress else ''}f - -C {remote_path(dest)}"
+    # stderr goes to temp files rather than pipes: a pipe nobody reads until the end fills up on a
+    # warning per file, and then tar and ssh block forever
+    stderrs = {i.machine_id: tempfile.TemporaryFile() for i in instances}
+    procs = {
+        i.machine_id: subprocess.Popen(ssh_command(i, extract, options=options),
+                                       stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderrs[i.machine_id])
+        for i in instances
+    }
+    tee = _TeeWriter(procs)
+    local_error = None
+    try:
+        # tarfile's own gzip stream always uses level 9, which is too slow for large pushes
+        sink = gzip.GzipFile(fileobj=tee, mode='wb', compresslevel=compress_level) if compress else tee
+        with tarfile.open(fileobj=sink, mode="w|") as tar:
+            for rel in batch:
+                path = manifest[rel][0]
+                progress.update(task, description=f"[cyan]{escape(rel)}")
+                info = tar.gettarinfo(path, arcname=rel)
+                with open(path, 'rb') as f:
+                    tar.addfile(info, _ProgressReader(f, progress, task))
+        if compress:
+            sink.close()
+    except Exception as e:
+        # A local file that vanished or can't be read fails this stream on every receiver; the truncated
+        # archive makes the remote tar exit with an error once its stdin is closed below
+        local_error = f"Reading local files failed: {e}"
+    finally:
+        errors = dict(tee.failed)
+        for machine_id, proc in procs.items():
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+            if local_error is not None:
+                errors.setdefault(machine_id, local_error)
+            if proc.wait() != 0 and machine_id not in errors:
+                errors[machine_id] = _error_text(stderrs[machine_id], proc.returncode)
+            stderrs[machine_id].close()
+    return tee.bytes_written, errors
+
+def _pull_stream(batch, instance, src, dest, compress, progress, task, options):
+    """Receives one tar stream of the given files from an instance and unpacks it into dest."""
+    pack = f"cd {remote_path(src)} && tar -c{'z' if compress else ''}f - --null -T -"
+    stderr = tempfile.TemporaryFile()
+    proc = subprocess.Popen(ssh_command(instance, pack, options=options),
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr)
+    # The file list is small, so writing it up front can't deadlock against the tar output
+    proc.stdin.write(b"".join(rel.encode() + b"\0" for rel in batch))
+    proc.stdin.close()
+
+    received = 0
+    dest_root = os.path.abspath(dest)
+    try:
+        with tarfile.open(fileobj=proc.stdout, mode="r|gz" if compress else "r|") as tar:
+            for member in tar:
+                target = os.path.abspath(os.path.join(dest_root, member.name))
+                if not member.isfile() or os.path.commonpath([dest_root, target]) != dest_root:
+                    continue
+                progress.update(task, description=f"[cyan]{escape(member.name)}")
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                source = tar.extractfile(member)
+                with open(target + ".jarvis-part", 'wb') as f:
+                    for chunk in iter(lambda: source.read(READ_CHUNK), b""):
+                        f.write(chunk)
+                        progress.update(task, advance=len(chunk))
+                os.replace(target + ".jarvis-part", target)
+                received += member.size
+    except Exception:
+        # Don't leave ssh running behind a stream that failed locally
+        proc.kill()
+        proc.wait()
+        stderr.close()
+        raise
+
+    with stderr:
+        if proc.wait() != 0:
+            return received, _error_text(stderr, proc.returncode)
+    return received, None
+
+def _transfer_progress() -> Progress:
+    return Progress(
+        TextColumn("{task.description}", justify="left"),
+        BarColumn(bar_width=30),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        TimeRemainingColumn(),
+        console=console,
+        transient=True,
+    )
+
+def _fetch_targets(selector: str) -> list:
+    spinner = show_spinner("Fetching your instances...")
+    next(spinner)
+    try:
+        instances = User.get_instances()
+    finally:
+        try:
+            next(spinner)
+        except StopIteration:
+            pass
+    selected = select_instances(instances, selector)
+    for instance in selected:
+        if instance.status != "Running" or not instance.ssh_str:
+            console.print(f"[yellow]Skipping {instance.name}: instance is '{instance.status}'.[/]")
+    return [i for i in selected if i.status == "Running" and i.ssh_str]
+
+def push(selector: str, src: str, dest: str, streams: int = 4, compress: bool = True, options: list = None) -> int:
+    """Pushes a local file or directory to every running instance matching the selector, sending only changed files."""
+    if not os.path.exists(src):
+        console.print(f"[bold red]Error: Local path '{src}' does not exist.[/]")
+        return 2
+    try:
+        targets = _fetch_targets(selector)
+    except ValueError as e:
+        console.print(f"[bold red]Error: {e}[/]")
+        return 2
+    if not targets:
+        console.print("[yellow]No running instances to push to.[/]")
+        return 1
+
+    started = time.perf_counter()
+    spinner = show_spinner(f"Comparing '{src}' with {len(targets)} instance(s)...")
+    next(spinner)
+    try:
+        manifest = local_manifest(src)
+        with ThreadPoolExecutor(max_workers=min(16, len(targets))) as executor:
+            remote = list(executor.map(lambda i: _safe(remote_manifest, i, dest, options), targets))
+    finally:
+        try:
+            next(spinner)
+        except StopIteration:
+            pass
+
+    results = {}
+    needed = set()
+    for instance, (remote_files, error) in zip(targets, remote):
+        if error:
+            results[instance.machine_id] = {"instance": instance, "files": 0, "bytes": 0, "error": error}
+            continue
+        changed = [rel for rel, (_, _, digest) in manifest.items() if remote_files.get(rel) != digest]
+        results[instance.machine_id] = {"instance": instance, "files": len(changed),
+                                        "bytes": sum(manifest[r][1] for r in changed), "error": None}
+        needed.update(changed)
+
+    receivers = [i for i in targets if results[i.machine_id]["files"]]
+    sent = 0
+    if receivers:
+        sizes = {rel: manifest[rel][1] for rel in needed}
+        batches = split_streams(sorted(needed), sizes, streams)
+        console.print(f"📤 [bold]Pushing {len(needed)} changed file(s) ({format_bytes(sum(sizes.values()))}) "
+                      f"to {len(receivers)} instance(s) over {len(batches)} stream(s)...[/]")
+        # Every receiver gets the union of changed files so that each file is read and compressed once
+        for instance in receivers:
+            results[instance.machine_id]["files"] = len(needed)
+            results[instance.machine_id]["bytes"] = sum(sizes.values())
+        with _transfer_progress() as progress:
+            tasks = [progress.add_task("[cyan]waiting", total=sum(sizes[r] for r in b)) for b in batches]
+            with ThreadPoolExecutor(max_workers=len(batches)) as executor:
+                outcomes = list(executor.map(
+                    lambda bt: _push_stream(bt[0], manifest, receivers, dest, compress, progress, bt[1], options),
+                    zip(batches, tasks)))
+        for written, errors in outcomes:
+            sent += written
+            for machine_id, error in errors.items():
+                results[machine_id]["error"] = error
+    else:
+        console.print("[bold green]✅ Everything is already up to date.[/]")
+
+    elapsed = time.perf_counter() - started
+    display_sync_results(list(results.values()), elapsed, sent)
+    return 0 if all(not r["error"] for r in results.values()) else 1
+
+def pull(selector: str, src: str, dest: str, streams: int = 4, compress: bool = True, options: list = None) -> int:
+    """Pulls a remote directory from one instance into a local directory, fetching only changed files."""
+    try:
+        targets = _fetch_targets(selector)
+    except ValueError as e:
+        console.print(f"[bold red]Error: {e}[/]")
+        return 2
+    if len(targets) != 1:
+        console.print(f"[bold red]Error: 'pull' needs exactly one running instance, but '{selector}' matched {len(targets)}.[/]")
+        return 2
+    instance = targets[0]
+
+    started = time.perf_counter()
+    spinner = show_spinner(f"Comparing '{src}' on {instance.name} with '{dest}'...")
+    next(spinner)
+    try:
+        remote, error = _safe(remote_manifest, instance, src, options)
+        manifest = local_manifest(dest) if os.path.isdir(dest) else {}
+    finally:
+        try:
+            next(spinner)
+        except StopIteration:
+            pass
+    if error:
+        display_sync_results([{"instance": instance, "files": 0, "bytes": 0, "error": error}], time.perf_counter() - started, 0)
+        return 1
+
+    changed = sorted(rel for rel, digest in remote.items() if manifest.get(rel, (None, None, None))[2] != digest)
+    result = {"instance": instance, "files": len(changed), "bytes": 0, "error": None}
+    if changed:
+        os.makedirs(dest, exist_ok=True)
+        # Remote sizes aren't known up front, so streams are balanced by file count
+        batches = split_streams(changed, {rel: 1 for rel in changed}, streams)
+        console.print(f"📥 [bold]Pulling {len(changed)} changed file(s) from {instance.name} over {len(batches)} stream(s)...[/]")
+        with _transfer_progress() as progress:
+            tasks = [progress.add_task("[cyan]waiting", total=None) for _ in batches]
+            with ThreadPoolExecutor(max_workers=len(batches)) as executor:
+                outcomes = list(executor.map(
+                    lambda bt: _safe(_pull_stream, bt[0], instance, src, dest, compress, progress, bt[1], options),
+                    zip(batches, tasks)))
+        for outcome, error in outcomes:
+            if error:
+                result["error"] = error
+                continue
+            received, stream_error = outcome
+            result["bytes"] += received
+            result["error"] = result["error"] or stream_error
+    else:
+        console.print("[bold green]✅ Everything is already up to date.[/]")
+
+    display_sync_results([result], time.perf_counter() - started, result["bytes"])
+    return 0 if not result["error"] else 1
+
+def _safe(func, *args):
+    """Runs func, returning (result, None) or (None, error message) so one host can't abort the others."""
+    try:
+        return func(*args), None
+    except Exception as e:
+        return None, str(e) or e.__class__.__name__
@@ -2,13 +2,25 @@ from rich.console import Console
 from rich.table import Table, Column
 from rich import box
 from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
+from rich.progress import (
+    Progress, ProgressColumn, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn,
+    DownloadColumn, TransferSpeedColumn, TimeRemainingColumn
+)
+from rich.progress_bar import ProgressBar
 from rich.live import Live
 from rich.align import Align
 from rich.text import Text
+from rich.markup import escape
+from contextlib import contextmanager
+import itertools
+import os
+import shlex
+import subprocess
+import sys
 import time
 
 from .jlclient.jarvisclient import Instance
+from .jlclient import readiness
 
 console = Console()
 
@@ -19,7 +31,12 @@ STATUS_EMOJIS = {
     "Stopped": "🔴",
     "Failed": "❌",
     "Creating": "⏳",
+    "Resuming": "⏳",
+    "Pausing": "⏳",
+    "Ready": "🟢",
     "Destroying": "🗑️",
+    "Destroyed": "🗑️",
+    "Deleted": "🗑️",
     "Unknown": "❓"
 }
 
@@ -33,6 +50,12 @@ GPU_EMOJIS = {
     "RTX4090": "🎯"
 }
 
+# Above this many rows tables are written by the plain streaming renderer instead of rich
+RICH_ROW_LIMIT = 200
+# The plain renderer sizes its columns from this many leading rows only
+WIDTH_SAMPLE_SIZE = 100
+MAX_COLUMN_WIDTH = 40
+
 def get_status_emoji(status):
     """Get an emoji for a given status."""
     return STATUS_EMOJIS.get(status, STATUS_EMOJIS["Unknown"])
@@ -54,8 +77,64 @@ def show_spinner(message="Processing..."):
         finally:
             progress.remove_task(task)
 
-def display_instances_table(instances: list[Instance]):
-    """Displays a list of instances in a rich table."""
+@contextmanager
+def output_stream():
+    """Yields a text stream for plain output, piped through $PAGER when writing to a terminal."""
+    if not console.is_terminal:
+        yield sys.stdout
+        return
+    try:
+        pager = subprocess.Popen(shlex.split(os.environ.get("PAGER") or "less -FRSX"),
+                                 stdin=subprocess.PIPE, encoding="utf-8", errors="replace")
+    except OSError:
+        yield sys.stdout
+        return
+    try:
+        yield pager.stdin
+        pager.stdin.close()
+    except BrokenPipeError:
+        # The user quit the pager before reading everything
+        pass
+    finally:
+        pager.wait()
+
+def render_plain(headers: list, rows, out):
+    """
+    Writes rows of strings as aligned plain text. Column widths come from a bounded sample of
+    leading rows, so the first row is written after constant work however many rows follow.
+    """
+    rows = iter(rows)
+    sample = list(itertools.islice(rows, WIDTH_SAMPLE_SIZE))
+    widths = [
+        min(max([len(header)] + [len(row[n]) for row in sample]), MAX_COLUMN_WIDTH)
+        for n, header in enumerate(headers)
+    ]
+    # Every column but the last is padded and truncated to its width; the last one is written as is
+    line = "  ".join(f"{{:<{w}.{w}}}" for w in widths[:-1]) + "  {}\n"
+    out.write(line.format(*headers))
+    for row in itertools.chain(sample, rows):
+        out.write(line.format(*row))
+
+def _plain_instance_row(instance):
+    return (
+        str(instance.name),
+        str(instance.status),
+        str(instance.machine_id),
+        str(instance.gpu_type),
+        str(instance.num_gpus),
+        f"{instance.hdd} GB",
+        str(instance.ssh_str or ""),
+    )
+
+def use_plain(rows: int, plain: bool = False) -> bool:
+    """Returns True when output should use the plain renderer instead of a rich table."""
+    return plain or rows > RICH_ROW_LIMIT or not console.is_terminal
+
+def display_instances_table(instances: list[Instance], plain: bool = False, show_account: bool = False):
+    """
+    Displays a list of instances in a rich table, or as plain streamed rows for large or non-terminal output.
+    show_account adds a column with the account each instance belongs to.
+    """
     if not instances:
         console.print(Panel(
             Align.center("[bold yellow]No instances found yet :) Try 'jarvis create' to launch one![/]"),
@@ -63,6 +142,16 @@ def display_instances_table(instances: list[Instance]):
             border_style="red"
         ))
         return
+
+    if use_plain(len(instances), plain):
+        with output_stream() as out:
+            if show_account:
+                render_plain(["ACCOUNT", "NAME", "STATUS", "ID", "GPU", "#GPUS", "STORAGE", "SSH COMMAND"],
+                             ((str(i.account),) + _plain_instance_row(i) for i in instances), out)
+            else:
+                render_plain(["NAME", "STATUS", "ID", "GPU", "#GPUS", "STORAGE", "SSH COMMAND"],
+                             map(_plain_instance_row, instances), out)
+        return
         
     table = Table(
         Column("Name", justify="left", style="cyan", no_wrap=True),
@@ -80,6 +169,8 @@ def display_instances_table(instances: list[Instance]):
         collapse_padding=True,
         min_width=80
     )
+    if show_account:
+        table.columns.insert(0, Column("Account", justify="left", style="bright_white", no_wrap=True))
 
     for instance in instances:
         status = instance.status
@@ -94,6 +185,7 @@ def display_instances_table(instances: list[Instance]):
         status_emoji = get_status_emoji(status)
         
         table.add_row(
+            *([escape(instance.account or "")] if show_account else []),
             f"{instance.name}",
             f"[{style}]{status_emoji} {status}[/]",
             str(instance.machine_id),
@@ -116,6 +208,13 @@ def display_instances_for_selection(instances: list[Instance]):
             border_style="red"
         ))
         return
+
+    if use_plain(len(instances)):
+        with output_stream() as out:
+            render_plain(["#", "NAME", "STATUS", "ID", "GPU TYPE"],
+                         ((str(n), str(i.name), str(i.status), str(i.machine_id), str(i.gpu_type))
+                          for n, i in enumerate(instances, 1)), out)
+        return
         
     table = Table(
         Column("#", justify="right", style="bold yellow"),
@@ -184,8 +283,8 @@ def display_templates_table(templates: list):
     console.print(Align.center(table))
     console.print("\n")
 
-def display_filesystems_table(filesystems: list):
-    """Displays a list of filesystems in a rich table."""
+def display_filesystems_table(filesystems: list, show_account: bool = False):
+    """Displays a list of filesystems in a rich table, with the account of each one if show_account is set."""
     if not filesystems:
         console.print(Panel(
             Align.center("[bold yellow]No filesystems found[/]"),
@@ -204,6 +303,8 @@ def display_filesystems_table(filesystems: list):
         border_style="bright_cyan",
         header_style="bold bright_white on dark_cyan"
     )
+    if show_account:
+        table.columns.insert(0, Column("Account", justify="left", style="bright_white", no_wrap=True))
 
     for fs in filesystems:
         status = fs.get('status', 'Unknown')
@@ -217,6 +318,7 @@ def display_filesystems_table(filesystems: list):
         status_emoji = get_status_emoji(status)
         
         table.add_row(
+            *([escape(fs.get('account', ''))] if show_account else []),
             fs.get('id', 'N/A'),
             fs.get('fs_name', 'N/A'),
             f"{fs.get('storage', 'N/A')} GB",
@@ -252,6 +354,44 @@ def display_balance(balance: float, currency: str = "USD"):
     console.print(Align.center(panel))
     console.print("\n")
 
+def display_balances_table(balances: list, currency: str = "USD"):
+    """Displays the balance of several accounts, given as [(account, balance)], with their total."""
+    table = Table(
+        Column("Account", justify="left", style="cyan", no_wrap=True),
+        Column("Balance", justify="right"),
+        title="[bold]💰 Account Balances 💰[/]",
+        box=box.HEAVY_EDGE,
+        border_style="bright_green",
+        header_style="bold bright_white on dark_green",
+        show_footer=len(balances) > 1
+    )
+    for name, balance in balances:
+        style = "bold bright_green" if balance > 50 else "bold bright_yellow" if balance > 20 else "bold bright_red"
+        table.add_row(escape(name), f"[{style}]${balance:.2f} {currency}[/]")
+    table.columns[0].footer = "Total"
+    table.columns[1].footer = f"${sum(b for _, b in balances):.2f} {currency}"
+
+    console.print("\n")
+    console.print(Align.center(table))
+    console.print("\n")
+
+def display_accounts_table(accounts: dict):
+    """Displays saved accounts with the last characters of their tokens."""
+    table = Table(
+        Column("Account", justify="left", style="cyan", no_wrap=True),
+        Column("Token", justify="left", style="dim"),
+        title="[bold]👥 Saved Accounts[/]",
+        box=box.HEAVY_EDGE,
+        border_style="bright_cyan",
+        header_style="bold bright_white on dark_cyan"
+    )
+    for name, token in sorted(accounts.items()):
+        table.add_row(escape(name), f"…{token[-4:]}" if len(token) > 8 else "…")
+
+    console.print("\n")
+    console.print(Align.center(table))
+    console.print("\n")
+
 def show_operation_progress(operation: str, total_steps: int = 10):
     """Shows a progress bar for operations."""
     with Progress(
@@ -265,4 +405,561 @@ def show_operation_progress(operation: str, total_steps: int = 10):
         
         for _ in range(total_steps):
             time.sleep(0.1)  # Simulate work
-            progress.update(task, advance=1) 
\ No newline at end of file
+            progress.update(task, advance=1) 
+
+
+class _ExpectedBarColumn(ProgressColumn):
+    """A bar that fills over the expected duration of a task, so it moves between status polls."""
+
+    def render(self, task):
+        expected = task.fields["expected"]
+        done = task.fields.get("done", False)
+        return ProgressBar(total=expected, completed=expected if done else min(task.elapsed or 0, expected * 0.99), width=40)
+
+class _EtaColumn(ProgressColumn):
+    """The expected time left, or how long the task usually takes once it has gone past that."""
+
+    def render(self, task):
+        expected = task.fields["expected"]
+        elapsed = task.elapsed or 0
+        if task.fields.get("done"):
+            return Text("")
+        if elapsed < expected:
+            return Text(f"~{_format_duration(expected - elapsed)} left", style="bold green")
+        return Text(f"slower than usual (~{_format_duration(expected)})", style="yellow")
+
+@contextmanager
+def provision_progress(operation: str, expected: float, samples: int = 0):
+    """
+    Shows progress towards the expected time for an operation to reach Running and yields
+    update(elapsed, status), to be called after every status poll.
+    """
+    basis = f"{samples} past runs" if samples else "no history yet"
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[bold blue]{task.description}"),
+        _ExpectedBarColumn(),
+        _EtaColumn(),
+        TimeElapsedColumn(),
+    ) as progress:
+        task = progress.add_task(f"[cyan]{operation}...", total=None, expected=max(expected, 1.0))
+
+        def update(elapsed, status):
+            progress.update(task, description=f"[cyan]{operation}[/] [dim]({status or 'pending'})[/]",
+                            done=status == "Running")
+
+        console.print(f"[dim]Usually ready in ~{_format_duration(expected)} ({basis}).[/]")
+        yield update
+
+@contextmanager
+def upload_progress(description: str):
+    """Shows an upload's bytes, speed and remaining time, and yields progress(sent, total) for post_files."""
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[bold blue]{task.description}"),
+        BarColumn(bar_width=30),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        TimeRemainingColumn(),
+        transient=True,
+    ) as progress:
+        task = progress.add_task(f"[cyan]{description}", total=None)
+
+        def update(sent, total):
+            # A retried upload starts over, so sent can go back down
+            progress.update(task, completed=sent, total=total)
+
+        yield update
+
+def display_pool_table(pools: list):
+    """Displays warm pools with their target size and current members."""
+    table = Table(
+        Column("Pool", justify="left", style="cyan", no_wrap=True),
+        Column("Target", justify="right", style="magenta"),
+        Column("Paused", justify="right", style="green"),
+        Column("Warming", justify="right", style="yellow"),
+        Column("Deficit", justify="right"),
+        title="[bold]🔥 Warm Pools 🔥[/]",
+        box=box.HEAVY_EDGE,
+        border_style="bright_yellow",
+        header_style="bold bright_white on dark_orange"
+    )
+
+    for pool in pools:
+        deficit = pool['deficit']
+        table.add_row(
+            pool['key'],
+            str(pool['target']),
+            str(pool['paused']),
+            str(pool['warming']),
+            f"[bold red]{deficit}[/]" if deficit else "[bold green]0[/]"
+        )
+
+    console.print("\n")
+    console.print(Align.center(table))
+    console.print("\n")
+
+def display_exec_results(results: list):
+    """Displays per-instance exit codes and timings of a remote command."""
+    table = Table(
+        Column("Name", justify="left", style="cyan", no_wrap=True),
+        Column("ID", justify="right", style="magenta"),
+        Column("Exit Code", justify="center"),
+        Column("Duration", justify="right", style="green"),
+        title="[bold]🚀 Remote Command Results 🚀[/]",
+        box=box.HEAVY_EDGE,
+        border_style="blue",
+        header_style="bold bright_white on dark_blue"
+    )
+
+    for result in results:
+        instance = result['instance']
+        if result['error']:
+            exit_code = f"[bold red]❌ {result['error']}[/]"
+        elif result['exit_code'] == 0:
+            exit_code = "[bold green]✅ 0[/]"
+        else:
+            exit_code = f"[bold red]❌ {result['exit_code']}[/]"
+        table.add_row(
+            instance.name,
+            str(instance.machine_id),
+            exit_code,
+            f"{result['duration']:.2f}s"
+        )
+
+    console.print("\n")
+    console.print(Align.center(table))
+    console.print("\n")
+
+def format_bytes(num_bytes: float) -> str:
+    """Formats a byte count with a human readable unit."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TB"
+
+def display_sync_results(results: list, elapsed: float, transferred: int):
+    """Displays per-instance results of a push or pull along with overall throughput."""
+    table = Table(
+        Column("Name", justify="left", style="cyan", no_wrap=True),
+        Column("ID", justify="right", style="magenta"),
+        Column("Files", justify="right"),
+        Column("Size", justify="right", style="green"),
+        Column("Status", justify="left"),
+        title="[bold]📦 Sync Results 📦[/]",
+        box=box.HEAVY_EDGE,
+        border_style="blue",
+        header_style="bold bright_white on dark_blue"
+    )
+
+    for result in results:
+        instance = result['instance']
+        if result['error']:
+            status = f"[bold red]❌ {result['error']}[/]"
+        elif result['files']:
+            status = "[bold green]✅ Synced[/]"
+        else:
+            status = "[bold green]✅ Up to date[/]"
+        table.add_row(
+            instance.name,
+            str(instance.machine_id),
+            str(result['files']),
+            format_bytes(result['bytes']),
+            status
+        )
+
+    console.print("\n")
+    console.print(Align.center(table))
+    throughput = transferred / elapsed if elapsed > 0 else 0
+    console.print(Align.center(f"[bold]Transferred {format_bytes(transferred)} in {elapsed:.1f}s ({format_bytes(throughput)}/s)[/]"))
+    console.print("\n")
+
+def display_scripts_table(scripts: list):
+    """Displays uploaded startup scripts in a rich table."""
+    table = Table(
+        Column("ID", justify="left", style="cyan", no_wrap=True),
+        Column("Name", justify="left", style="magenta"),
+        title="[bold]📜 Your Startup Scripts 📜[/]",
+        box=box.HEAVY_EDGE,
+        border_style="bright_cyan",
+        header_style="bold bright_white on dark_cyan"
+    )
+
+    for script in scripts:
+        table.add_row(
+            str(script.get('script_id', script.get('id', 'N/A'))),
+            str(script.get('script_name', script.get('name', 'N/A')))
+        )
+
+    console.print("\n")
+    console.print(Align.center(table))
+    console.print("\n")
+
+def display_script_details(script: dict):
+    """Displays every field of an uploaded script in a panel."""
+    details = Text()
+    for key, value in script.items():
+        details.append(f"{key}: ", style="bold cyan")
+        details.append(f"{value}\n", style="bright_white")
+    details.rstrip()
+
+    console.print("\n")
+    console.print(Align.center(Panel(
+        details,
+        title="[bold]📜 Script Details 📜[/]",
+        border_style="bright_cyan",
+        box=box.HEAVY_EDGE
+    )))
+    console.print("\n")
+
+def display_query_table(columns: list, rows: list, plain: bool = False):
+    """Displays projected instance fields in a rich table, or as plain streamed rows for large or non-terminal output."""
+    if use_plain(len(rows), plain):
+        with output_stream() as out:
+            render_plain([c.upper() for c in columns], rows, out)
+        return
+
+    table = Table(
+        *[Column(c, justify="left", no_wrap=True) for c in columns],
+        title="[bold]🖥️ JarvisLabs Instances 🖥️[/]",
+        box=box.HEAVY_EDGE,
+        border_style="blue",
+        header_style="bold bright_white on dark_blue"
+    )
+
+    for row in rows:
+        table.add_row(*[escape(value) for value in row])
+
+    console.print("\n")
+    console.print(Align.center(table))
+    console.print("\n")
+
+def display_aggregate_table(group_by: str, groups: list):
+    """Displays instance counts and totals per group."""
+    table = Table(
+        Column(group_by, justify="left", style="cyan", no_wrap=True),
+        Column("Instances", justify="right", style="magenta"),
+        Column("GPUs", justify="right", style="green"),
+        Column("Storage", justify="right"),
+        title=f"[bold]📊 Instances by {escape(group_by)} 📊[/]",
+        box=box.HEAVY_EDGE,
+        border_style="blue",
+        header_style="bold bright_white on dark_blue"
+    )
+
+    for value, count, gpus, storage in groups:
+        table.add_row(escape(str(value)), str(count), str(gpus), f"{storage} GB")
+    table.add_section()
+    table.add_row("[bold]Total[/]", str(sum(g[1] for g in groups)), str(sum(g[2] for g in groups)),
+                  f"{sum(g[3] for g in groups)} GB")
+
+    console.print("\n")
+    console.print(Align.center(table))
+    console.print("\n")
+
+def _format_duration(seconds):
+    if seconds is None:
+        return "-"
+    if seconds < 1:
+        return f"{seconds * 1000:.0f}ms"
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}m {int(seconds % 60):02d}s"
+    return f"{int(seconds // 3600)}h {int(seconds % 3600 // 60):02d}m"
+
+def display_stats_table(rows: list, window: str, phase: str = None):
+    """Displays operation latency percentiles from the local journal."""
+    title = f"[bold]⏱️ Operation Latency ({'all time' if window == 'all' else 'last ' + window}"
+    title += f", {phase} phase)[/]" if phase else ")[/]"
+    table = Table(
+        Column("Operation", justify="left", style="cyan", no_wrap=True),
+        Column("GPU Type", justify="left", style="magenta"),
+        Column("Count", justify="right"),
+        Column("Failed", justify="right"),
+        Column("p50", justify="right", style="green"),
+        Column("p90", justify="right", style="yellow"),
+        Column("p99", justify="right", style="red"),
+        title=title,
+        box=box.HEAVY_EDGE,
+        border_style="blue",
+        header_style="bold bright_white on dark_blue"
+    )
+
+    previous = None
+    for operation, gpu_type, count, failures, p50, p90, p99 in rows:
+        if previous is not None and operation != previous:
+            table.add_section()
+        previous = operation
+        table.add_row(
+            operation if gpu_type == "all" else "",
+            "[bold]all[/]" if gpu_type == "all" else f"{get_gpu_emoji(gpu_type)} {gpu_type}",
+            str(count),
+            f"[bold red]{failures}[/]" if failures else "0",
+            _format_duration(p50),
+            _format_duration(p90),
+            _format_duration(p99)
+        )
+
+    console.print("\n")
+    console.print(Align.center(table))
+    console.print("\n")
+
+def display_ops_table(ops: list):
+    """Displays operations submitted with --no-wait and whether they have finished."""
+    table = Table(
+        Column("Op ID", justify="left", style="dim", no_wrap=True),
+        Column("Operation", justify="left", style="cyan"),
+        Column("ID", justify="right", style="magenta"),
+        Column("Name", justify="left", style="bright_white"),
+        Column("State", justify="center"),
+        Column("Status", justify="left"),
+        Column("Took", justify="right", style="green"),
+        Column("ETA", justify="right"),
+        title="[bold]📨 Tracked Operations[/]",
+        box=box.HEAVY_EDGE,
+        border_style="blue",
+        header_style="bold bright_white on dark_blue"
+    )
+
+    now = time.time()
+    model = readiness.load()
+    states = {"pending": "[bold yellow]⏳ pending[/]", "done": "[bold green]✅ done[/]", "failed": "[bold red]❌ failed[/]"}
+    for op in ops:
+        took = (op['finished'] or now) - op['t']
+        eta = "-"
+        if not op['finished'] and op['op'] in readiness.OPERATIONS:
+            left = readiness.eta(took, readiness.expect(op['op'], op.get('gpu'), op.get('tpl'), model)[0])
+            eta = f"[green]~{_format_duration(left)}[/]" if left is not None else "[yellow]overdue[/]"
+        table.add_row(
+            op['op_id'],
+            op['op'],
+            str(op['id']),
+            escape(op.get('name') or ""),
+            states.get(op['state'], op['state']),
+            f"{get_status_emoji(op['status'])} {op['status']}" if op['status'] else "-",
+            _format_duration(took) + ("" if op['finished'] else " so far"),
+            eta
+        )
+
+    console.print("\n")
+    console.print(Align.center(table))
+    console.print("\n")
+
+def display_recoveries_table(records: list):
+    """Displays preemption recoveries per guarded instance with their downtime."""
+    table = Table(
+        Column("Name", justify="left", style="cyan", no_wrap=True),
+        Column("Preempted", justify="right"),
+        Column("Resumed", justify="right"),
+        Column("Recreated", justify="right"),
+        Column("On-demand", justify="right", style="yellow"),
+        Column("p50 Down", justify="right", style="green"),
+        Column("Max Down", justify="right", style="red"),
+        Column("Total Down", justify="right", style="bold"),
+        title="[bold]🛡️ Spot Preemption Recoveries[/]",
+        box=box.HEAVY_EDGE,
+        border_style="blue",
+        header_style="bold bright_white on dark_blue"
+    )
+
+    groups = {}
+    for record in records:
+        groups.setdefault(record['name'], []).append(record)
+    for name, group in sorted(groups.items(), key=lambda item: -len(item[1])):
+        downtimes = sorted(r['downtime'] for r in group)
+        table.add_row(
+            escape(name),
+            str(len(group)),
+            str(sum(1 for r in group if r['action'] == "resume")),
+            str(sum(1 for r in group if r['action'] == "recreate")),
+            str(sum(1 for r in group if r['mode'] == "on-demand")),
+            _format_duration(downtimes[(len(downtimes) - 1) // 2]),
+            _format_duration(downtimes[-1]),
+            _format_duration(sum(downtimes))
+        )
+
+    console.print("\n")
+    console.print(Align.center(table))
+    console.print("\n")
+
+def display_history_table(machine_id, rows: list, name: str = None):
+    """Displays the recorded state transitions of one instance."""
+    table = Table(
+        Column("Time", justify="left", style="cyan", no_wrap=True),
+        Column("Status", justify="left"),
+        Column("GPU", justify="left", style="magenta"),
+        Column("#GPUs", justify="right"),
+        Column("Lasted", justify="right", style="green"),
+        title=f"[bold]🕰️ History of {escape(name) + ' ' if name else ''}({machine_id})[/]",
+        box=box.HEAVY_EDGE,
+        border_style="blue",
+        header_style="bold bright_white on dark_blue"
+    )
+
+    for n, (t, status, gpu_type, gpus) in enumerate(rows):
+        until = rows[n + 1][0] if n + 1 < len(rows) else None
+        table.add_row(
+            time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t)),
+            f"{get_status_emoji(status)} {status}",
+            f"{get_gpu_emoji(gpu_type)} {gpu_type}",
+            str(gpus),
+            _format_duration(until - t) if until else ("-" if status == "Gone" else "ongoing")
+        )
+
+    console.print("\n")
+    console.print(Align.center(table))
+    console.print("\n")
+
+def display_usage_table(totals: dict, days: int):
+    """Displays running instance-hours and GPU-hours per day and GPU type."""
+    table = Table(
+        Column("Day", justify="left", style="cyan", no_wrap=True),
+        Column("GPU Type", justify="left", style="magenta"),
+        Column("Instance Hours", justify="right", style="green"),
+        Column("GPU Hours", justify="right", style="bold green"),
+        title=f"[bold]📊 Running Hours (last {days} day{'s' if days != 1 else ''})[/]",
+        box=box.HEAVY_EDGE,
+        border_style="blue",
+        header_style="bold bright_white on dark_blue"
+    )
+
+    instance_total = gpu_total = 0.0
+    for (day, gpu_type), (instance_hours, gpu_hours) in sorted(totals.items()):
+        instance_total += instance_hours
+        gpu_total += gpu_hours
+        table.add_row(day, f"{get_gpu_emoji(gpu_type)} {gpu_type}", f"{instance_hours:.2f}", f"{gpu_hours:.2f}")
+    table.add_section()
+    table.add_row("[bold]Total[/]", "", f"[bold]{instance_total:.2f}[/]", f"[bold]{gpu_total:.2f}[/]")
+
+    console.print("\n")
+    console.print(Align.center(table))
+    console.print("\n")
+
+def display_state_at_table(t: float, state: dict, names: dict):
+    """Displays the instances recorded as existing at a point in time."""
+    table = Table(
+        Column("ID", justify="right", style="magenta"),
+        Column("Name", justify="left", style="cyan"),
+        Column("Status", justify="left"),
+        Column("GPU", justify="left"),
+        Column("#GPUs", justify="right"),
+        title=f"[bold]🕰️ Instances at {time.strftime('%Y-%m-%d %H:%M', time.localtime(t))}[/]",
+        box=box.HEAVY_EDGE,
+        border_style="blue",
+        header_style="bold bright_white on dark_blue"
+    )
+
+    for machine_id, (status, gpu_type, gpus) in sorted(state.items(), key=lambda item: (item[1][0] != "Running", item[0])):
+        table.add_row(
+            str(machine_id),
+            escape(names.get(str(machine_id)) or ""),
+            f"{get_status_emoji(status)} {status}",
+            f"{get_gpu_emoji(gpu_type)} {gpu_type}",
+            str(gpus)
+        )
+
+    console.print("\n")
+    console.print(Align.center(table))
+    console.print("\n")
+
+def display_endpoint_table(url: str, source: str, candidates: list, latencies: dict, pool: dict):
+    """Displays the selected backend endpoint, its candidates with measured latency, and the pool settings."""
+    table = Table(
+        Column("Endpoint", justify="left", style="cyan", no_wrap=True),
+        Column("Latency", justify="right", style="green"),
+        Column("In Use", justify="center"),
+        title="[bold]🌐 Backend Endpoint[/]",
+        box=box.HEAVY_EDGE,
+        border_style="bright_cyan",
+        header_style="bold bright_white on dark_cyan"
+    )
+    for candidate in candidates:
+        if candidate not in latencies:
+            latency = "-"
+        elif latencies[candidate] is None:
+            latency = "[bold red]unreachable[/]"
+        else:
+            latency = _format_duration(latencies[candidate])
+        table.add_row(escape(candidate), latency, "✅" if candidate == url else "")
+
+    console.print("\n")
+    console.print(Align.center(table))
+    console.print(Align.center(f"[dim]Selected by {escape(source)}[/]"))
+    console.print(Align.center(
+        f"[dim]Pool: {pool['num_pools']} hosts × {pool['maxsize']} connections, "
+        f"{'blocking' if pool['block'] else 'non-blocking'}, TCP keep-alive {pool['keepalive'] or 'off'}"
+        f"{'s' if pool['keepalive'] else ''}[/]"
+    ))
+    console.print("\n")
+
+JOB_STATE_STYLES = {"queued": "yellow", "running": "bold cyan", "done": "bold green", "failed": "bold red", "cancelled": "dim"}
+
+def display_jobs_table(jobs: list):
+    """Displays queued, running and finished jobs with their placement."""
+    table = Table(
+        Column("Job", justify="left", style="magenta", no_wrap=True),
+        Column("Name", justify="left", style="cyan"),
+        Column("GPUs", justify="right"),
+        Column("State", justify="center"),
+        Column("Worker", justify="right", no_wrap=True),
+        Column("Runtime", justify="right", style="green"),
+        Column("Exit Code", justify="center"),
+        title="[bold]🧮 GPU Jobs[/]",
+        box=box.HEAVY_EDGE,
+        border_style="bright_magenta",
+        header_style="bold bright_white on dark_magenta"
+    )
+    now = time.time()
+    for job in jobs:
+        runtime = (job["finished"] or now) - job["started"] if job["started"] else None
+        state = job["state"] + (" (cancelling)" if job.get("cancel") and job["state"] == "running" else "")
+        worker = f"{job['machine_id']} {job['gpu_ids']}" if job["machine_id"] else "-"
+        table.add_row(
+            job["id"],
+            escape(job["name"]),
+            f"{job['gpus']}× {job['gpu_type']}",
+            f"[{JOB_STATE_STYLES[job['state']]}]{state}[/]",
+            worker,
+            _format_duration(runtime),
+            "-" if job["exit_code"] is None else str(job["exit_code"])
+        )
+
+    console.print("\n")
+    console.print(Align.center(table))
+    console.print("\n")
+
+def display_jobs_stats(rows: list):
+    """Displays job throughput and cost per GPU type."""
+    table = Table(
+        Column("GPU", justify="left", style="cyan", no_wrap=True),
+        Column("Done", justify="right", style="green"),
+        Column("Failed", justify="right", style="red"),
+        Column("Worker Hours", justify="right"),
+        Column("Utilisation", justify="right"),
+        Column("Jobs/Hour", justify="right", style="magenta"),
+        Column("Cost", justify="right"),
+        Column("Jobs/$", justify="right", style="magenta"),
+        title="[bold]📈 Job Throughput[/]",
+        box=box.HEAVY_EDGE,
+        border_style="bright_magenta",
+        header_style="bold bright_white on dark_magenta"
+    )
+    for row in rows:
+        table.add_row(
+            f"{get_gpu_emoji(row['gpu_type'])} {row['gpu_type']}",
+            str(row["done"]),
+            str(row["failed"]),
+            f"{row['worker_hours']:.2f}",
+            "-" if row["utilisation"] is None else f"{row['utilisation']:.0%}",
+            "-" if row["jobs_per_hour"] is None else f"{row['jobs_per_hour']:.1f}",
+            "-" if row["cost"] is None else f"${row['cost']:.2f}",
+            "-" if row["jobs_per_dollar"] is None else f"{row['jobs_per_dollar']:.2f}"
+        )
+
+    console.print("\n")
+    console.print(Align.center(table))
+    if any(row["cost"] is None for row in rows):
+        console.print(Align.center("[dim]Set prices with 'jarvis jobs price A100=1.29' to see cost and jobs per dollar.[/]"))
+    console.print("\n")